@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+# Python API for BittyTax
+# (c) Nano Nano Ltd 2026
+
+from .bittytax import TaxReports, calculate, load_records, price_demand
+from .conv.bittytax_conv import convert
+from .session import Session
+
+__all__ = ["Session", "TaxReports", "calculate", "convert", "load_records", "price_demand"]
@@ -49,9 +49,14 @@ class ComparePoolFail(TypedDict):  # pylint: disable=too-few-public-methods
 
 
 class AuditRecords:
-    def __init__(self, transaction_records: List[TransactionRecord]) -> None:
+    def __init__(
+        self, transaction_records: List[TransactionRecord], with_audit_log: bool = False
+    ) -> None:
         self.wallets: Dict[Wallet, Dict[AssetSymbol, AuditWallet]] = {}
         self.totals: Dict[AssetSymbol, AuditTotals] = {}
+        # The audit log is only kept if it's going to be written out, it holds an entry (and a
+        # reference to the transaction record) for every buy, sell and fee
+        self.with_audit_log = with_audit_log
         self.audit_log: Dict[AssetSymbol, List[AuditLogEntry]] = {}
         self.failures: List[ComparePoolFail] = []
 
@@ -202,6 +207,9 @@ class AuditRecords:
         tr_part: TrRecordPart,
         tr: TransactionRecord,
     ) -> None:
+        if not self.with_audit_log:
+            return
+
         audit_log_entry = AuditLogEntry(
             quantity,
             fee,
@@ -227,6 +235,7 @@ class AuditRecords:
                 self.wallets.pop(wallet)
 
     def compare_pools(self, holdings: Dict[AssetSymbol, Holdings]) -> bool:
+        self.failures = []
         passed = True
         for asset in sorted(self.totals):
             if asset in config.fiat_list:
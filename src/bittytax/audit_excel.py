@@ -8,7 +8,7 @@ import sys
 from datetime import datetime
 from decimal import Decimal
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 
 import xlsxwriter
 from colorama import Fore
@@ -58,7 +58,13 @@ class AuditLogExcel:  # pylint: disable=too-few-public-methods, too-many-instanc
     def __init__(self, progname: str, audit_log: Dict[AssetSymbol, List[AuditLogEntry]]) -> None:
         self.audit_log = audit_log
         self.filename = self._get_output_filename()
-        self.workbook = xlsxwriter.Workbook(self.filename)
+        self.sheet_names: Dict[str, int] = {}
+        self.table_names: Dict[str, int] = {}
+        # Rows are written out as they are added, only one row at a time is kept in memory
+        self.constant_memory = config.large_data
+        self.workbook = xlsxwriter.Workbook(
+            self.filename, {"constant_memory": self.constant_memory}
+        )
         self.workbook.set_size(1800, 1200)
         self.workbook.formats[0].set_font_size(FONT_SIZE)
         self.workbook.set_properties(
@@ -154,14 +160,26 @@ class AuditLogExcel:  # pylint: disable=too-few-public-methods, too-many-instanc
         with ProgressSpinner(f"{Fore.CYAN}generating EXCEL audit log{Fore.GREEN}: "):
             for asset in sorted(self.audit_log):
                 worksheet = Worksheet(self, asset)
+                if self.constant_memory:
+                    # Rows must be written in order, so headings first instead of a table
+                    worksheet.add_headings(asset)
+
                 for audit_log_entry in self.audit_log[asset]:
                     worksheet.add_row(asset, audit_log_entry)
 
-                worksheet.make_table(asset)
+                if self.constant_memory:
+                    # Tables, and autofit using the cell data, are not supported
+                    worksheet.worksheet.autofilter(
+                        0, 0, worksheet.row_num - 1, len(self.AUDIT_HEADER) - 1
+                    )
+                    worksheet.autofit()
+                else:
+                    worksheet.make_table(asset)
+                    worksheet.worksheet.autofit()
+
                 if not config.large_data:
                     # Lots of conditional formatting can slow down Excel
                     worksheet.conditional_formatting()
-                worksheet.worksheet.autofit()
                 worksheet.worksheet.set_column(
                     self.AUDIT_HEADER.index("Timestamp"), self.AUDIT_HEADER.index("Timestamp"), 23
                 )
@@ -177,9 +195,7 @@ class AuditLogExcel:  # pylint: disable=too-few-public-methods, too-many-instanc
 class Worksheet:
     SHEETNAME_MAX_LEN = 31
     MAX_COL_WIDTH = 30
-
-    sheet_names: Dict[str, int] = {}
-    table_names: Dict[str, int] = {}
+    FILTER_BUTTON_WIDTH = 3
 
     def __init__(self, output: AuditLogExcel, asset: AssetSymbol) -> None:
         self.output = output
@@ -222,6 +238,8 @@ class Worksheet:
         self.row_num += 1
 
     def _xl_balance(self, balance: Decimal, row_num: int, col_num: int) -> None:
+        self._autofit_calc(col_num, balance)
+
         if len(balance.normalize().as_tuple().digits) > EXCEL_PRECISION:
             if balance < 0:
                 wb_format = self.output.format_num_string_unsigned_red
@@ -239,6 +257,7 @@ class Worksheet:
 
     def _xl_change(self, change: Optional[Decimal], row_num: int, col_num: int) -> None:
         if change is not None:
+            self._autofit_calc(col_num, change)
             if len(change.normalize().as_tuple().digits) > EXCEL_PRECISION:
                 if change > 0:
                     change_str = f"+{change.normalize():0,f}"
@@ -258,9 +277,11 @@ class Worksheet:
 
     def _xl_text_black(self, text: str, row_num: int, col_num: int) -> None:
         self.worksheet.write_string(row_num, col_num, text)
+        self._autofit_calc(col_num, text)
 
     def _xl_text_grey(self, text: str, row_num: int, col_num: int) -> None:
         self.worksheet.write_string(row_num, col_num, text, self.output.format_text_grey)
+        self._autofit_calc(col_num, text)
 
     def _xl_timestamp(self, timestamp: datetime, row_num: int, col_num: int) -> None:
         utc_timestamp = timestamp.astimezone(TZ_UTC)
@@ -298,6 +319,24 @@ class Worksheet:
             self.output.format_text_grey_link,
             string=link_name,
         )
+        self._autofit_calc(col_num, link_name)
+
+    def _autofit_calc(self, col_num: int, value: Union[str, Decimal], padding: int = 0) -> None:
+        # Only needed in constant memory mode, otherwise the worksheet autofit is used
+        if not self.output.constant_memory:
+            return
+
+        if isinstance(value, Decimal):
+            width = min(len(f"+{value.normalize():0,f}") + padding, self.MAX_COL_WIDTH)
+        else:
+            width = min(len(value) + padding, self.MAX_COL_WIDTH)
+
+        if width > self.col_width.get(col_num, 0):
+            self.col_width[col_num] = width
+
+    def autofit(self) -> None:
+        for col_num, col_width in self.col_width.items():
+            self.worksheet.set_column(col_num, col_num, col_width)
 
     def _make_linkname(self, t_type: TrType, tr_part: TrRecordPart) -> str:
         if t_type is TrType.TRADE:
@@ -345,6 +384,11 @@ class Worksheet:
             },
         )
 
+    def add_headings(self, asset: AssetSymbol) -> None:
+        for col_num, column in enumerate(self._get_columns(asset)):
+            self.worksheet.write(0, col_num, column["header"], column["header_format"])
+            self._autofit_calc(col_num, column["header"], padding=self.FILTER_BUTTON_WIDTH)
+
     def _get_columns(self, asset: AssetSymbol) -> List[Dict[str, str]]:
         return [
             {
@@ -357,16 +401,16 @@ class Worksheet:
     def _sheet_name(self, name: str) -> str:
         name = self._sheet_name_validate(name)
 
-        if name.lower() not in self.sheet_names:
-            self.sheet_names[name.lower()] = 1
+        if name.lower() not in self.output.sheet_names:
+            self.output.sheet_names[name.lower()] = 1
             sheet_name = name
         else:
-            self.sheet_names[name.lower()] += 1
-            sheet_name = f"{name}({self.sheet_names[name.lower()]})"
+            self.output.sheet_names[name.lower()] += 1
+            sheet_name = f"{name}({self.output.sheet_names[name.lower()]})"
             if len(sheet_name) > self.SHEETNAME_MAX_LEN:
                 sheet_name = (
                     f"{name[: len(name) - (len(sheet_name) - self.SHEETNAME_MAX_LEN)]}"
-                    f"({self.sheet_names[name.lower()]})"
+                    f"({self.output.sheet_names[name.lower()]})"
                 )
 
         return sheet_name
@@ -386,10 +430,10 @@ class Worksheet:
         # Add backslash to prevent xlsxwriter warnings
         name = f"\\{name}"
 
-        if name.lower() not in self.table_names:
-            self.table_names[name.lower()] = 1
+        if name.lower() not in self.output.table_names:
+            self.output.table_names[name.lower()] = 1
         else:
-            self.table_names[name.lower()] += 1
-            name += str(self.table_names[name.lower()])
+            self.output.table_names[name.lower()] += 1
+            name += str(self.output.table_names[name.lower()])
 
         return name
@@ -4,31 +4,46 @@
 
 import argparse
 import builtins
+import copy
 import io
 import os
 import platform
 import sys
-from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from typing import Dict, List, Optional, Tuple, Union
 
 import colorama
 from colorama import Fore
 
 from .audit import AuditRecords
-from .audit_excel import AuditLogExcel
-from .bt_types import TAX_RULES_UK_COMPANY, AssetSymbol, DisposalType, TaxRules, Year
+from .bt_types import (
+    TAX_RULES_UK_COMPANY,
+    AssetSymbol,
+    Date,
+    DisposalType,
+    TaxRules,
+    Timestamp,
+    Year,
+)
 from .config import config
 from .constants import ERROR, TERMINAL_POWERSHELL_GUI, WARNING
-from .exceptions import ImportFailureError
+from .exceptions import ImportFailureError, IntegrityCheckError
 from .export_records import ExportRecords
 from .holdings import Holdings
 from .import_records import ImportRecords
 from .price.exceptions import DataSourceApiError, DataSourceError
-from .price.valueasset import ValueAsset
+from .price.pricedata import PriceDataRecord
+from .price.valueasset import PriceDemand, ValueAsset
 from .report import ReportLog, ReportPdf
+from .report_data import ReportCsv, ReportJson
+from .result_cache import CachedResult, ResultCache
+from .session import Session
 from .t_record import TransactionRecord
 from .tax import CalculateCapitalGains as CCG
-from .tax import TaxCalculator
-from .transactions import TransactionHistory
+from .tax import HoldingsReportRecord, TaxCalculator, TaxReportRecord
+from .transactions import Buy, Sell, TransactionHistory
 from .utils import bt_print, is_compiled
 from .version import __version__
 
@@ -36,6 +51,14 @@ if sys.stdout.encoding != "UTF-8":
     sys.stdout.reconfigure(encoding="utf-8")  # type: ignore[union-attr]
 
 
+@dataclass
+class TaxReports:
+    audit: AuditRecords
+    tax_report: Dict[Year, TaxReportRecord]
+    price_report: Dict[Year, Dict[AssetSymbol, Dict[Date, PriceDataRecord]]]
+    holdings_report: Optional[HoldingsReportRecord]
+
+
 def _build_version_str() -> str:
     compiled_suffix = " - compiled" if is_compiled() else ""
     return f"v{__version__}{compiled_suffix}"
@@ -70,13 +93,13 @@ def _create_arg_parser(version_str: str) -> argparse.ArgumentParser:
     )
     parser.add_argument(
         "--taxrules",
-        choices=[tax_rules.name for tax_rules in TaxRules],
         metavar="{UK_INDIVIDUAL, UK_COMPANY_XXX} "
         "where XXX is the month which starts the financial year, i.e. JAN, FEB, etc.",
         default=TaxRules.UK_INDIVIDUAL.name,
-        type=str.upper,
+        type=_validate_tax_rules,
         dest="tax_rules",
-        help="specify tax rules to use, default: UK_INDIVIDUAL",
+        help="specify tax rules to use, or a comma separated list of tax rules to compare, "
+        "default: UK_INDIVIDUAL",
     )
     parser.add_argument(
         "--audit",
@@ -100,18 +123,47 @@ def _create_arg_parser(version_str: str) -> argparse.ArgumentParser:
         "-o",
         dest="output_filename",
         type=str,
-        help="specify the output filename for the PDF report",
+        help="specify the output filename for the report",
     )
     parser.add_argument(
         "--nopdf",
         action="store_true",
         help="don't output PDF report, output report to terminal only",
     )
+    parser.add_argument(
+        "--report-format",
+        choices=["pdf", "json", "csv"],
+        default="pdf",
+        type=str.lower,
+        dest="report_format",
+        help="specify the format of the report, default: pdf",
+    )
     parser.add_argument(
         "--export",
         action="store_true",
         help="populate transaction records with price data in CSV format",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="number of processes used to parse the transaction records, to calculate each of the "
+        "tax rules, and to create the PDF report, default: 1",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="reuse the result of a previous run if the transaction records, config, arguments "
+        "and prices used are unchanged",
+    )
+    parser.add_argument(
+        "--refresh-holdings",
+        dest="refresh_holdings",
+        action="store_true",
+        help="revalue the holdings at the latest prices when reusing a previous result",
+    )
     return parser
 
 
@@ -135,17 +187,42 @@ def _print_debug_info(prog: str, version_str: str, args: argparse.Namespace) ->
 
 
 def _run(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
-    try:
-        args.tax_rules = TaxRules[args.tax_rules]
-    except KeyError as e:
-        raise RuntimeError(f"Unrecognised args.tax_rules: {args.tax_rules}") from e
+    if args.jobs < 1:
+        parser.error("the [--jobs] option must be at least 1")
 
-    if args.tax_rules in TAX_RULES_UK_COMPANY:
-        config.start_of_year_month = TAX_RULES_UK_COMPANY.index(args.tax_rules) + 1
-        config.start_of_year_day = 1
+    if args.nopdf and args.report_format != "pdf":
+        parser.error("the [--nopdf] option cannot be used with [--report-format]")
+
+    tax_rules_list = args.tax_rules
+    if len(tax_rules_list) > 1 and (args.audit_only or args.export):
+        parser.error("the [--audit] and [--export] options cannot be used when comparing tax rules")
+
+    if args.cache and (not args.filename or len(tax_rules_list) > 1):
+        parser.error(
+            "the [--cache] option requires a filename, and cannot be used when comparing tax rules"
+        )
+
+    if args.cache and (args.audit_only or args.export):
+        parser.error("the [--cache] option cannot be used with [--audit] or [--export]")
+
+    if args.refresh_holdings and not args.cache:
+        parser.error("the [--refresh-holdings] option can only be used with [--cache]")
+
+    args.tax_rules = tax_rules_list[0]
+    _set_start_of_year(args.tax_rules)
+
+    result_cache = None
+    if args.cache:
+        try:
+            result_cache = ResultCache(args)
+        except IOError:
+            parser.exit(message=f"{ERROR} File could not be read: {args.filename}\n")
+
+        if _do_cached_report(parser, args, result_cache):
+            return
 
     try:
-        transaction_records = _do_import(args.filename)
+        transaction_records = _do_import(args.filename, args.jobs)
     except IOError:
         parser.exit(message=f"{ERROR} File could not be read: {args.filename}\n")
     except ImportFailureError:
@@ -155,28 +232,40 @@ def _run(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
         _do_export(transaction_records)
         parser.exit()
 
-    audit = AuditRecords(transaction_records)
+    if len(tax_rules_list) > 1:
+        _do_scenarios(parser, args, transaction_records, tax_rules_list)
+        return
+
+    audit = AuditRecords(transaction_records, with_audit_log=args.audit_only)
 
     if args.audit_only:
         if audit.audit_log:
+            from .audit_excel import AuditLogExcel  # pylint: disable=import-outside-toplevel
+
             audit_log_excel = AuditLogExcel(parser.prog, audit.audit_log)
             audit_log_excel.write_excel()
 
         if args.nopdf:
             ReportLog(args, audit)
+        elif args.report_format == "json":
+            ReportJson(parser.prog, args, audit).write_json()
+        elif args.report_format == "csv":
+            ReportCsv(parser.prog, args, audit).write_csv()
         else:
             ReportPdf(parser.prog, args, audit)
     else:
         try:
-            tax, value_asset = _do_tax(transaction_records, args.tax_rules, args.skip_integrity)
+            tax, value_asset = _do_tax(
+                transaction_records, args.tax_rules, args.skip_integrity, args.tax_year
+            )
             if not args.skip_integrity:
                 int_passed = _do_integrity_check(audit, tax.holdings)
                 if not int_passed:
                     parser.exit()
 
             if not args.summary_only:
-                tax.process_income()
-                tax.process_margin_trades()
+                tax.process_income(args.tax_year)
+                tax.process_margin_trades(args.tax_year)
 
             _do_each_tax_year(tax, args.tax_year, args.summary_only, value_asset)
 
@@ -185,17 +274,193 @@ def _run(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
         except DataSourceError as e:
             parser.exit(message=f"{ERROR} {e}\n")
 
-        if args.nopdf:
-            ReportLog(args, audit, tax.tax_report, value_asset.price_report, tax.holdings_report)
-        else:
-            ReportPdf(
-                parser.prog,
-                args,
-                audit,
-                tax.tax_report,
-                value_asset.price_report,
-                tax.holdings_report,
+        reports = TaxReports(audit, tax.tax_report, value_asset.price_report, tax.holdings_report)
+        _do_report(parser.prog, args, reports)
+
+        if result_cache:
+            result_cache.save(
+                CachedResult(
+                    audit,
+                    tax.tax_report,
+                    value_asset.price_report,
+                    tax.holdings_report,
+                    value_asset.price_data.prices_used,
+                )
+            )
+
+
+def _do_report(prog: str, args: argparse.Namespace, reports: TaxReports) -> None:
+    if args.nopdf:
+        ReportLog(
+            args,
+            reports.audit,
+            reports.tax_report,
+            reports.price_report,
+            reports.holdings_report,
+        )
+    elif args.report_format == "json":
+        ReportJson(
+            prog,
+            args,
+            reports.audit,
+            reports.tax_report,
+            reports.price_report,
+            reports.holdings_report,
+        ).write_json()
+    elif args.report_format == "csv":
+        ReportCsv(
+            prog,
+            args,
+            reports.audit,
+            reports.tax_report,
+            reports.price_report,
+            reports.holdings_report,
+        ).write_csv()
+    else:
+        ReportPdf(
+            prog,
+            args,
+            reports.audit,
+            reports.tax_report,
+            reports.price_report,
+            reports.holdings_report,
+        )
+
+
+def _do_cached_report(
+    parser: argparse.ArgumentParser, args: argparse.Namespace, result_cache: ResultCache
+) -> bool:
+    result = result_cache.load()
+    if result is None:
+        return False
+
+    print(f"{Fore.CYAN}using cached result")
+    if args.refresh_holdings and result.holdings_report:
+        try:
+            result.holdings_report = TaxCalculator.value_holdings(
+                {
+                    asset: (holding["quantity"], holding["cost"])
+                    for asset, holding in result.holdings_report["holdings"].items()
+                },
+                ValueAsset(),
+            )
+        except DataSourceApiError as e:
+            parser.exit(message=f"{ERROR} {e} - please wait and try again\n")
+        except DataSourceError as e:
+            parser.exit(message=f"{ERROR} {e}\n")
+
+    # The report, and its creation date, is created again from the cached result
+    _do_report(
+        parser.prog,
+        args,
+        TaxReports(result.audit, result.tax_report, result.price_report, result.holdings_report),
+    )
+    return True
+
+
+def _do_scenarios(
+    parser: argparse.ArgumentParser,
+    args: argparse.Namespace,
+    transaction_records: List[TransactionRecord],
+    tax_rules_list: List[TaxRules],
+) -> None:
+    # The transactions are imported and valued once, only the tax calculation is repeated for
+    #  each of the tax rules
+    audit = AuditRecords(transaction_records)
+    try:
+        value_asset = ValueAsset(leave_bar=True)
+        transactions = TransactionHistory(
+            transaction_records, value_asset, TaxCalculator.value_needed
+        ).transactions
+    except DataSourceApiError as e:
+        parser.exit(message=f"{ERROR} {e} - please wait and try again\n")
+    except DataSourceError as e:
+        parser.exit(message=f"{ERROR} {e}\n")
+
+    # Reports to the terminal are not calculated in parallel, so they are not interleaved
+    parallel = args.jobs > 1 and not args.nopdf
+    scenario_args = [_scenario_args(args, tax_rules, parallel) for tax_rules in tax_rules_list]
+
+    if parallel:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(tax_rules_list))) as executor:
+            errors = list(
+                executor.map(
+                    _do_scenario,
+                    repeat(parser.prog),
+                    scenario_args,
+                    repeat(audit),
+                    repeat(transactions),
+                    repeat(value_asset.price_report),
+                )
             )
+    else:
+        errors = [
+            _do_scenario(parser.prog, s_args, audit, transactions, value_asset.price_report)
+            for s_args in scenario_args
+        ]
+
+    if any(errors):
+        parser.exit(message="".join(f"{error}\n" for error in errors if error))
+
+
+def _scenario_args(
+    args: argparse.Namespace, tax_rules: TaxRules, parallel: bool
+) -> argparse.Namespace:
+    scenario_args = copy.copy(args)
+    scenario_args.tax_rules = tax_rules
+
+    if args.summary_only:
+        filepath, file_extension = os.path.splitext(
+            args.output_filename or ReportPdf.TAX_SUMMARY_FILENAME
+        )
+    else:
+        filepath, file_extension = os.path.splitext(
+            args.output_filename or ReportPdf.TAX_FULL_FILENAME
+        )
+    scenario_args.output_filename = f"{filepath}_{tax_rules.name}{file_extension}"
+
+    if parallel:
+        # Already running in parallel for each of the tax rules
+        scenario_args.jobs = 1
+    return scenario_args
+
+
+def _do_scenario(
+    prog: str,
+    args: argparse.Namespace,
+    audit: AuditRecords,
+    transactions: List[Union[Buy, Sell]],
+    price_report: Dict[Year, Dict[AssetSymbol, Dict[Date, PriceDataRecord]]],
+) -> Optional[str]:
+    with Session():
+        _set_start_of_year(args.tax_rules)
+        print(f"{Fore.CYAN}tax rules: {Fore.YELLOW}{args.tax_rules.name}")
+
+        value_asset = ValueAsset()
+        value_asset.price_report = price_report
+        value_asset.rebuild_price_report()
+
+        try:
+            tax = _do_tax_calculation(transactions, args.tax_rules, args.skip_integrity)
+            if not args.skip_integrity and not _do_integrity_check(audit, tax.holdings):
+                return f"{ERROR} Integrity check failed for {args.tax_rules.name}"
+
+            if not args.summary_only:
+                tax.process_income(args.tax_year)
+                tax.process_margin_trades(args.tax_year)
+
+            _do_each_tax_year(tax, args.tax_year, args.summary_only, value_asset)
+        except DataSourceApiError as e:
+            return f"{ERROR} {e} - please wait and try again"
+        except DataSourceError as e:
+            return f"{ERROR} {e}"
+
+        _do_report(
+            prog,
+            args,
+            TaxReports(audit, tax.tax_report, value_asset.price_report, tax.holdings_report),
+        )
+    return None
 
 
 def main() -> None:
@@ -207,6 +472,71 @@ def main() -> None:
     _run(parser, args)
 
 
+def load_records(
+    filename: str, jobs: int = 1, session: Optional[Session] = None
+) -> List[TransactionRecord]:
+    with session or Session():
+        return _do_import(filename, jobs)
+
+
+def calculate(
+    transaction_records: List[TransactionRecord],
+    tax_rules: TaxRules = TaxRules.UK_INDIVIDUAL,
+    tax_year: Optional[Year] = None,
+    summary_only: bool = False,
+    skip_integrity: bool = False,
+    session: Optional[Session] = None,
+) -> TaxReports:
+    # The transaction records are updated by the calculation, so can only be used once
+    with session or Session():
+        _set_start_of_year(tax_rules)
+        audit = AuditRecords(transaction_records)
+        tax, value_asset = _do_tax(transaction_records, tax_rules, skip_integrity, tax_year)
+        if not skip_integrity and not _do_integrity_check(audit, tax.holdings):
+            raise IntegrityCheckError
+
+        if not summary_only:
+            tax.process_income(tax_year)
+            tax.process_margin_trades(tax_year)
+
+        _do_each_tax_year(tax, tax_year, summary_only, value_asset)
+        return TaxReports(audit, tax.tax_report, value_asset.price_report, tax.holdings_report)
+
+
+def price_demand(
+    transaction_records: List[TransactionRecord], session: Optional[Session] = None
+) -> Dict[Tuple[AssetSymbol, Date], Timestamp]:
+    # The historic prices which the calculation would look up, the transaction records are
+    #  updated in the same way, so can only be used once
+    with session or Session():
+        demand = PriceDemand()
+        TransactionHistory(transaction_records, demand, TaxCalculator.value_needed)
+        return demand.demand
+
+
+def _set_start_of_year(tax_rules: TaxRules) -> None:
+    if tax_rules in TAX_RULES_UK_COMPANY:
+        config.start_of_year_month = TAX_RULES_UK_COMPANY.index(tax_rules) + 1
+        config.start_of_year_day = 1
+
+
+def _validate_tax_rules(value: str) -> List[TaxRules]:
+    tax_rules_list = []
+    for name in value.upper().split(","):
+        try:
+            tax_rules = TaxRules[name.strip()]
+        except KeyError as e:
+            raise argparse.ArgumentTypeError(
+                f"invalid choice: '{name.strip()}' "
+                f"(choose from {', '.join(tax_rules.name for tax_rules in TaxRules)})"
+            ) from e
+
+        if tax_rules not in tax_rules_list:
+            tax_rules_list.append(tax_rules)
+
+    return tax_rules_list
+
+
 def _validate_year(value: str) -> int:
     year = int(value)
     if year not in CCG.CG_DATA_INDIVIDUAL:
@@ -218,8 +548,8 @@ def _validate_year(value: str) -> int:
     return year
 
 
-def _do_import(filename: str) -> List[TransactionRecord]:
-    import_records = ImportRecords()
+def _do_import(filename: str, jobs: int = 1) -> List[TransactionRecord]:
+    import_records = ImportRecords(jobs)
 
     if filename:
         _, file_extension = os.path.splitext(filename)
@@ -245,12 +575,26 @@ def _do_import(filename: str) -> List[TransactionRecord]:
 
 
 def _do_tax(
-    transaction_records: List[TransactionRecord], tax_rules: TaxRules, skip_integrity_check: bool
+    transaction_records: List[TransactionRecord],
+    tax_rules: TaxRules,
+    skip_integrity_check: bool,
+    tax_year: Optional[Year] = None,
 ) -> Tuple[TaxCalculator, ValueAsset]:
-    value_asset = ValueAsset(leave_bar=True)
-    transaction_history = TransactionHistory(transaction_records, value_asset)
+    # For a single tax year, transactions long after it are not valued
+    value_asset = ValueAsset(leave_bar=True, tax_year=tax_year)
+    transaction_history = TransactionHistory(
+        transaction_records, value_asset, TaxCalculator.value_needed
+    )
+    return (
+        _do_tax_calculation(transaction_history.transactions, tax_rules, skip_integrity_check),
+        value_asset,
+    )
+
 
-    tax = TaxCalculator(transaction_history.transactions, tax_rules)
+def _do_tax_calculation(
+    transactions: List[Union[Buy, Sell]], tax_rules: TaxRules, skip_integrity_check: bool
+) -> TaxCalculator:
+    tax = TaxCalculator(transactions, tax_rules)
     tax.pool_same_day()
     tax.match_sell(DisposalType.SAME_DAY)
 
@@ -260,7 +604,7 @@ def _do_tax(
         tax.match_sell(DisposalType.TEN_DAY)
 
     tax.process_section104(skip_integrity_check)
-    return tax, value_asset
+    return tax
 
 
 def _do_integrity_check(audit: AuditRecords, holdings: Dict[AssetSymbol, Holdings]) -> bool:
@@ -300,7 +644,7 @@ def _transfer_mismatches(holdings: Dict[AssetSymbol, Holdings]) -> bool:
 
 
 def _do_each_tax_year(
-    tax: TaxCalculator, tax_year: Year, summary_only: bool, value_asset: ValueAsset
+    tax: TaxCalculator, tax_year: Optional[Year], summary_only: bool, value_asset: ValueAsset
 ) -> None:
     if tax_year:
         print(f"{Fore.CYAN}calculating tax year {config.format_tax_year(tax_year)}")
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+# Batch mode for the accounting tool, runs many clients sharing their price data
+# (c) Nano Nano Ltd 2026
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import colorama
+from colorama import Fore
+from tqdm import tqdm
+
+from . import bittytax
+from .bt_types import AssetSymbol, Date, Timestamp
+from .config import config
+from .constants import ERROR, WARNING
+from .exceptions import ImportFailureError
+from .price.exceptions import DataSourceError
+from .price.pricedata import PriceData
+from .price.valueasset import ValueAsset
+from .session import Session
+from .utils import disable_tqdm, is_compiled
+from .version import __version__
+
+PriceDemandDict = Dict[Tuple[AssetSymbol, Date], Timestamp]
+
+if sys.stdout.encoding != "UTF-8":
+    sys.stdout.reconfigure(encoding="utf-8")  # type: ignore[union-attr]
+
+
+@dataclass
+class BatchClient:
+    filename: str
+    output: str
+    args: List[str] = field(default_factory=list)
+
+
+@dataclass
+class BatchResult:
+    client: BatchClient
+    success: bool
+    output: str
+
+    def reason(self) -> str:
+        lines = [line for line in self.output.splitlines() if line.strip()]
+        return lines[-1] if lines else ""
+
+
+def read_manifest(filename: str) -> List[BatchClient]:
+    with open(filename, "r", encoding="utf-8") as manifest_file:
+        manifest = json.load(manifest_file)
+
+    if not isinstance(manifest, list):
+        raise ValueError("manifest must be a JSON list of clients")
+
+    clients = []
+    for i, client in enumerate(manifest, start=1):
+        if not isinstance(client, dict):
+            raise ValueError(f"client {i} must be a JSON object")
+
+        for key in ("filename", "output"):
+            if not isinstance(client.get(key), str) or not client[key]:
+                raise ValueError(f"client {i} is missing the {key}")
+
+        args = client.get("args", [])
+        if not isinstance(args, list) or not all(isinstance(arg, str) for arg in args):
+            raise ValueError(f"client {i} args must be a list of strings")
+
+        if "--export" in args:
+            raise ValueError(f"client {i} args cannot include --export")
+
+        clients.append(BatchClient(client["filename"], client["output"], args))
+    return clients
+
+
+def run_batch(clients: List[BatchClient], jobs: int = 1) -> List[BatchResult]:
+    # Forked workers share the prices already fetched, otherwise they load them from the cache
+    if "fork" in multiprocessing.get_all_start_methods():
+        mp_context = multiprocessing.get_context("fork")
+    else:
+        mp_context = None
+
+    print(f"{Fore.CYAN}planning prices for {len(clients)} client(s)")
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=mp_context) as executor:
+        plans = list(executor.map(_plan_client, clients))
+
+    results: Dict[int, BatchResult] = {}
+    demand: PriceDemandDict = {}
+    for i, (client_demand, output) in enumerate(plans):
+        if client_demand is None:
+            results[i] = BatchResult(clients[i], False, output)
+        else:
+            for key, timestamp in client_demand.items():
+                demand.setdefault(key, timestamp)
+
+    if demand:
+        _fetch_prices(demand)
+
+    pending = [i for i in range(len(clients)) if i not in results]
+    print(f"{Fore.CYAN}running {len(pending)} client(s)")
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=mp_context) as executor:
+        for i, (success, output) in zip(
+            pending, executor.map(_run_client, [clients[i] for i in pending])
+        ):
+            results[i] = BatchResult(clients[i], success, output)
+
+    return [results[i] for i in range(len(clients))]
+
+
+def _plan_client(client: BatchClient) -> Tuple[Optional[PriceDemandDict], str]:
+    output = io.StringIO()
+    with Session() as session, contextlib.redirect_stdout(output), contextlib.redirect_stderr(
+        output
+    ):
+        try:
+            transaction_records = bittytax.load_records(client.filename, session=session)
+        except IOError:
+            print(f"{ERROR} File could not be read: {client.filename}")
+            return None, output.getvalue()
+        except ImportFailureError:
+            return None, output.getvalue()
+
+        if "--audit" in client.args:
+            return {}, output.getvalue()
+
+        try:
+            demand = bittytax.price_demand(transaction_records, session=session)
+        except Exception:  # pylint: disable=broad-exception-caught
+            traceback.print_exc()
+            return None, output.getvalue()
+
+    return demand, output.getvalue()
+
+
+def _fetch_prices(demand: PriceDemandDict) -> None:
+    # Each price is only fetched once for all the clients, in date order for each asset, so data
+    #  sources which return a range of dates need fewer requests
+    value_asset = ValueAsset(leave_bar=True)
+    with tqdm(
+        sorted(demand.items()),
+        unit="price",
+        desc=f"{Fore.CYAN}fetching prices{Fore.GREEN}",
+        disable=disable_tqdm(),
+    ) as progress_bar:
+        value_asset.price_data.progress_bar = progress_bar
+        for (asset, _), timestamp in progress_bar:
+            try:
+                value_asset.get_historical_price(asset, timestamp)
+            except DataSourceError as e:
+                tqdm.write(f"{WARNING} {e}")
+
+    for data_source in PriceData.shared_data_sources():
+        data_source.save_prices()
+
+
+def _run_client(client: BatchClient) -> Tuple[bool, str]:
+    output = io.StringIO()
+    sys.argv = ["bittytax", client.filename, "-o", client.output] + client.args
+
+    with Session(), contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        try:
+            bittytax.main()
+            success = True
+        except SystemExit as e:
+            if isinstance(e.code, str):
+                print(e.code)
+            success = False
+        except Exception:  # pylint: disable=broad-exception-caught
+            traceback.print_exc()
+            success = False
+
+        # The worker exits without running atexit. Workers can save at the same time, each save
+        #  is merged with the prices already saved, so none are lost
+        for data_source in PriceData.shared_data_sources():
+            data_source.save_prices()
+
+    return success, output.getvalue()
+
+
+def main() -> None:
+    colorama.init()
+    parser = argparse.ArgumentParser(
+        description="Run the accounting tool for a batch of clients, the prices needed by all "
+        "the clients are fetched once, and shared by each of them."
+    )
+
+    if is_compiled():
+        version_str = f"{parser.prog} v{__version__} - compiled"
+    else:
+        version_str = f"{parser.prog} v{__version__}"
+
+    parser.add_argument(
+        "manifest",
+        type=str,
+        help="JSON file listing each client's transaction records filename, report output "
+        "filename, and any other arguments for the accounting tool",
+    )
+    parser.add_argument(
+        "-v",
+        "--version",
+        action="version",
+        version=version_str,
+    )
+    parser.add_argument("-d", "--debug", action="store_true", help="enable debug logging")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="number of clients to run at the same time, default: 1",
+    )
+
+    args = parser.parse_args()
+    config.debug = args.debug
+
+    if args.jobs < 1:
+        parser.error("the [--jobs] option must be at least 1")
+
+    try:
+        clients = read_manifest(args.manifest)
+    except IOError:
+        parser.exit(message=f"{ERROR} File could not be read: {args.manifest}\n")
+    except ValueError as e:
+        parser.exit(message=f"{ERROR} Manifest is not valid: {e}\n")
+
+    results = run_batch(clients, args.jobs)
+
+    for result in results:
+        if result.success:
+            print(f"{Fore.WHITE}{result.client.filename}: {Fore.GREEN}success")
+        else:
+            print(
+                f"{Fore.WHITE}{result.client.filename}: {Fore.RED}failure "
+                f"{Fore.WHITE}{result.reason()}"
+            )
+
+        if config.debug:
+            print(result.output)
+
+    failure_cnt = sum(1 for result in results if not result.success)
+    print(
+        f"{Fore.WHITE}batch {'successful' if failure_cnt <= 0 else 'failure'} "
+        f"(success={len(results) - failure_cnt}, failure={failure_cnt})"
+    )
+
+    if failure_cnt:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+# Worker service for the BittyTax tools
+# (c) Nano Nano Ltd 2026
+
+import argparse
+import functools
+import hmac
+import http.server
+import importlib
+import json
+import multiprocessing
+import os
+import secrets
+import socketserver
+import stat
+import sys
+import tempfile
+import threading
+import traceback
+import warnings
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import colorama
+from colorama import Fore
+
+from . import bittytax
+from .config import config
+from .constants import BITTYTAX_PATH, ERROR
+from .conv import bittytax_conv
+from .price import bittytax_price
+from .price.pricedata import PriceData
+from .price.valueasset import ValueAsset
+from .report import ReportPdf
+from .utils import is_compiled
+from .version import __version__
+
+JOB_TOOLS: Dict[str, Tuple[str, Callable[[], None]]] = {
+    "tax": ("bittytax", bittytax.main),
+    "conv": ("bittytax_conv", bittytax_conv.main),
+    "price": ("bittytax_price", bittytax_price.main),
+}
+
+TOKEN_FILE = os.path.join(BITTYTAX_PATH, "bittytax_serve.token")
+
+# Imported up front, otherwise each job would import them again
+WARM_MODULES = ("openpyxl", "pypdf", "xhtml2pdf.pisa", "xlrd", "xlsxwriter")
+
+if sys.stdout.encoding != "UTF-8":
+    sys.stdout.reconfigure(encoding="utf-8")  # type: ignore[union-attr]
+
+
+class JobRunner:
+    def __init__(self, jobs: int) -> None:
+        self.job_slots = threading.BoundedSemaphore(jobs)
+        self.fork_lock = threading.Lock()
+        self.mp_context = multiprocessing.get_context("fork")
+        self.jobs = jobs
+        self.jobs_running = 0
+        self.jobs_done = 0
+
+    @staticmethod
+    def warm_up() -> None:
+        for module in WARM_MODULES:
+            importlib.import_module(module)
+
+        ValueAsset(leave_bar=True)
+
+        env = ReportPdf.get_environment()
+        for template in (
+            ReportPdf.AUDIT_TEMPLATE,
+            ReportPdf.TAX_SUMMARY_TEMPLATE,
+            ReportPdf.TAX_FULL_TEMPLATE,
+            ReportPdf.PAGE_FOOTER_TEMPLATE,
+        ):
+            env.get_template(template)
+
+    def run_job(self, tool: str, job_args: List[str], cwd: str) -> Dict[str, Any]:
+        with self.job_slots, tempfile.TemporaryDirectory() as output_dir:
+            process = self.mp_context.Process(
+                target=_run_job, args=(tool, job_args, cwd, output_dir)
+            )
+            # Not forked while the caches are being refreshed
+            with self.fork_lock:
+                self.jobs_running += 1
+                process.start()
+
+            process.join()
+
+            with self.fork_lock:
+                self.jobs_running -= 1
+                self.jobs_done += 1
+
+            result: Dict[str, Any] = {"exit_code": process.exitcode}
+            for stream in ("stdout", "stderr"):
+                try:
+                    with open(
+                        os.path.join(output_dir, stream), "r", encoding="utf-8"
+                    ) as output_file:
+                        result[stream] = output_file.read()
+                except IOError:
+                    result[stream] = ""
+
+        print(
+            f"{Fore.WHITE}job: {tool} {' '.join(job_args)} "
+            f"{Fore.YELLOW}(exit code {process.exitcode})"
+        )
+        return result
+
+    def refresh(self) -> None:
+        # Pick up any prices which were saved to the cache by a job
+        with self.fork_lock:
+            for data_source in PriceData.shared_data_sources():
+                data_source.refresh_prices()
+
+    def status(self) -> Dict[str, Any]:
+        with self.fork_lock:
+            return {
+                "version": __version__,
+                "jobs": self.jobs,
+                "jobs_running": self.jobs_running,
+                "jobs_done": self.jobs_done,
+            }
+
+
+class JobRequestHandler(http.server.BaseHTTPRequestHandler):
+    def __init__(
+        self, *args: Any, runner: JobRunner, token: Optional[str] = None, **kwargs: Any
+    ) -> None:
+        self.runner = runner
+        self.token = token
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        if not self._is_authorised():
+            return
+
+        if self.path == "/status":
+            self._send_json(HTTPStatus.OK, self.runner.status())
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"unknown path: {self.path}"})
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        if not self._is_authorised():
+            return
+
+        tool = self.path.lstrip("/")
+        if tool not in JOB_TOOLS:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"unknown path: {self.path}"})
+            return
+
+        try:
+            job = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or "{}")
+        except ValueError:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "job is not valid JSON"})
+            return
+
+        if not isinstance(job, dict):
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "job must be a JSON object"})
+            return
+
+        job_args = job.get("args", [])
+        if not isinstance(job_args, list) or not all(isinstance(arg, str) for arg in job_args):
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "args must be a list of strings"})
+            return
+
+        cwd = job.get("cwd", os.getcwd())
+        if not isinstance(cwd, str) or not os.path.isdir(cwd):
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": f"cwd is not a directory: {cwd}"})
+            return
+
+        self._send_json(HTTPStatus.OK, self.runner.run_job(tool, job_args, cwd))
+        self.runner.refresh()
+
+    def _is_authorised(self) -> bool:
+        # Anyone who can connect to a port can send a job, so it must have the token, a Unix
+        #  socket can only be connected to by its owner
+        if self.token is None or hmac.compare_digest(
+            self.headers.get("Authorization", ""), f"Bearer {self.token}"
+        ):
+            return True
+
+        self._send_json(HTTPStatus.UNAUTHORIZED, {"error": "token is missing or not valid"})
+        return False
+
+    def _send_json(self, status: HTTPStatus, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+        if config.debug:
+            print(f"{Fore.YELLOW}serve: {format % args}")
+
+
+def _run_job(tool: str, job_args: List[str], cwd: str, output_dir: str) -> None:
+    # Runs in a forked process, so any state the job changes is discarded with it
+    prog, tool_main = JOB_TOOLS[tool]
+    sys.argv = [prog] + job_args
+
+    with open(os.devnull, "r", encoding="utf-8") as sys.stdin, open(
+        os.path.join(output_dir, "stdout"), "w", encoding="utf-8"
+    ) as sys.stdout, open(os.path.join(output_dir, "stderr"), "w", encoding="utf-8") as sys.stderr:
+        try:
+            os.chdir(cwd)
+            tool_main()
+            exit_code = 0
+        except SystemExit as e:
+            if isinstance(e.code, str):
+                sys.stderr.write(f"{e.code}\n")
+                exit_code = 1
+            else:
+                exit_code = e.code or 0
+        except Exception:  # pylint: disable=broad-exception-caught
+            traceback.print_exc()
+            exit_code = 1
+
+        # The process exits without running atexit
+        for data_source in PriceData.shared_data_sources():
+            data_source.save_prices()
+
+    sys.exit(exit_code)
+
+
+def write_token() -> str:
+    token = secrets.token_hex(32)
+    # Only readable by the owner, a new token is created each time the worker is started
+    fd = os.open(TOKEN_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.chmod(TOKEN_FILE, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as token_file:
+        token_file.write(token)
+    return token
+
+
+def main() -> None:
+    colorama.init()
+    parser = argparse.ArgumentParser(
+        description="Run a worker which accepts jobs for the BittyTax tools, the data sources, "
+        "parsers and report templates are loaded once and kept warm between jobs."
+    )
+
+    if is_compiled():
+        version_str = f"{parser.prog} v{__version__} - compiled"
+    else:
+        version_str = f"{parser.prog} v{__version__}"
+
+    parser.add_argument(
+        "-v",
+        "--version",
+        action="version",
+        version=version_str,
+    )
+    parser.add_argument("-d", "--debug", action="store_true", help="enable debug logging")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "--socket",
+        type=str,
+        default=os.path.join(BITTYTAX_PATH, "bittytax.sock"),
+        help="listen on a Unix socket, default: %(default)s",
+    )
+    group.add_argument(
+        "--port",
+        type=int,
+        help="listen on a localhost port instead of a Unix socket",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="number of jobs to run at the same time, default: 1",
+    )
+
+    args = parser.parse_args()
+    config.debug = args.debug
+
+    if "fork" not in multiprocessing.get_all_start_methods():
+        parser.error("a platform which supports fork is required")
+
+    if args.jobs < 1:
+        parser.error("the [--jobs] option must be at least 1")
+
+    # Jobs are only forked while holding the lock, so no other thread is running inside the tools
+    warnings.filterwarnings("ignore", message=".*use of fork", category=DeprecationWarning)
+
+    runner = JobRunner(args.jobs)
+    print(f"{Fore.CYAN}warming up")
+    runner.warm_up()
+
+    server: socketserver.BaseServer
+    if args.port:
+        handler = functools.partial(JobRequestHandler, runner=runner, token=write_token())
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+        address = f"http://127.0.0.1:{args.port} (token: {TOKEN_FILE})"
+    else:
+        if os.path.lexists(args.socket):
+            if not stat.S_ISSOCK(os.lstat(args.socket).st_mode):
+                parser.exit(message=f"{ERROR} File exists and is not a socket: {args.socket}\n")
+            os.remove(args.socket)
+
+        # Created so it can only be connected to by its owner
+        umask = os.umask(0o177)
+        try:
+            server = socketserver.ThreadingUnixStreamServer(
+                args.socket, functools.partial(JobRequestHandler, runner=runner)
+            )
+        finally:
+            os.umask(umask)
+        server.daemon_threads = True
+        address = args.socket
+
+    print(f"{Fore.WHITE}{parser.prog} listening on: {Fore.YELLOW}{address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if not args.port:
+            os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    main()
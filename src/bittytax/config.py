@@ -4,9 +4,9 @@
 import datetime
 import os
 import sys
-from typing import Any, TextIO
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, SupportsIndex, TextIO, Tuple, Union, cast
 
-import yaml
 from colorama import Fore
 
 from .constants import BITTYTAX_PATH, ERROR
@@ -77,6 +77,14 @@ class Config:
         self.start_of_year_month = 4
         self.start_of_year_day = 6
 
+        # The config file is only read (and created if missing) when it's first needed
+        self._config: Optional[Dict[str, Any]] = None
+        self._ccy: Any = None
+        self._asset_priority: List[str] = []
+
+    def _load_config(self) -> Dict[str, Any]:
+        import yaml  # pylint: disable=import-outside-toplevel
+
         if not os.path.exists(BITTYTAX_PATH):
             os.mkdir(BITTYTAX_PATH)
 
@@ -93,7 +101,7 @@ class Config:
 
         try:
             with open(config_path, "rb") as config_file:
-                self.config = yaml.safe_load(config_file)
+                config_data = yaml.safe_load(config_file)
         except IOError:
             sys.stderr.write(
                 f"{ERROR}Config file cannot be loaded: "
@@ -104,17 +112,41 @@ class Config:
             sys.stderr.write(f"{ERROR}Config file contains an error:\n{e}\n")
             sys.exit(1)
 
-        if self.config is None:
-            self.config = {}
+        if config_data is None:
+            config_data = {}
 
         for name, default in self.DEFAULT_CONFIG.items():
-            if name not in self.config:
-                self.config[name] = default
-
-        self.ccy = self.config["local_currency"]
-        self.asset_priority = self.config["fiat_list"] + self.config["crypto_list"]
+            if name not in config_data:
+                config_data[name] = default
+
+        self._asset_priority = config_data["fiat_list"] + config_data["crypto_list"]
+        return config_data
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        if self._config is None:
+            self._config = self._load_config()
+        return self._config
+
+    @property
+    def ccy(self) -> Any:
+        if self._ccy is None:
+            self._ccy = self.config["local_currency"]
+        return self._ccy
+
+    @ccy.setter
+    def ccy(self, ccy: Any) -> None:
+        self._ccy = ccy
+
+    @property
+    def asset_priority(self) -> List[str]:
+        if self._config is None:
+            self._config = self._load_config()
+        return self._asset_priority
 
     def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
         return self.config[name]
 
     def output_config(self, file: TextIO) -> None:
@@ -187,4 +219,19 @@ class Config:
         return data[-show:].rjust(len(data), "#")
 
 
-config = Config()
+class ConfigProxy:
+    # Forwards to the config of the current session, so each job can change its own config
+    def __getattr__(self, name: str) -> Any:
+        return getattr(session_config.get(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(session_config.get(), name, value)
+
+    def __reduce_ex__(self, protocol: SupportsIndex) -> Union[str, Tuple[Any, ...]]:
+        # Pickled as the config itself, i.e. when passed to a worker process
+        return session_config.get().__reduce_ex__(protocol)
+
+
+default_config = Config()
+session_config: ContextVar[Config] = ContextVar("session_config", default=default_config)
+config = cast(Config, ConfigProxy())
@@ -13,6 +13,11 @@ PROJECT_URL = "https://github.com/BittyTax/BittyTax"
 BITTYTAX_PATH = os.path.join(os.getenv("BITTYTAX_DATA_DIR", os.path.expanduser("~")), ".bittytax")
 CACHE_DIR = os.path.join(BITTYTAX_PATH, "cache")
 
+# Data source responses can be recorded, and then replayed, or served by a local stand-in server
+PRICE_RECORD_DIR = os.getenv("BITTYTAX_PRICE_RECORD")
+PRICE_REPLAY_DIR = os.getenv("BITTYTAX_PRICE_REPLAY")
+PRICE_SERVER_URL = os.getenv("BITTYTAX_PRICE_SERVER")
+
 TERMINAL_POWERSHELL_GUI = "POWERSHELL_GUI"
 
 CONV_FORMAT_CSV = "CSV"
@@ -28,5 +33,7 @@ _H1 = f"{Style.NORMAL}"
 FONT_COLOR_TX_HASH = "7A7A7A"
 FONT_COLOR_TX_SRC = "7C7C7C"
 FONT_COLOR_TX_DEST = "7D7D7D"
+# Hidden columns which duplicate the cells marked by the font colours above
+TX_RAW_HEADER = ["_TxHash", "_TxSrc", "_TxDest"]
 
 EXCEL_PRECISION = 15
@@ -2,13 +2,19 @@
 # (c) Nano Nano Ltd 2019
 
 import argparse
+import contextlib
+import csv
 import errno
 import glob
 import hashlib
+import io
 import os
+import pickle
 import platform
 import sys
-from typing import Optional, Tuple
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Set, TextIO, Tuple
 
 import colorama
 from colorama import Fore
@@ -20,20 +26,27 @@ from ..constants import (
     CONV_FORMAT_RECAP,
     TERMINAL_POWERSHELL_GUI,
 )
+from ..exceptions import ImportFailureError
+from ..import_records import ImportRecords
+from ..session import Session, current_session
+from ..t_record import TransactionRecord
+from ..t_row import TransactionRow
 from ..utils import is_compiled
 from ..version import __version__
+from .conv_cache import ConvCache
 from .datafile import DataFile
 from .datamerge import DataMerge
 from .dataparser import DataParser
 from .exceptions import (
     DataFilenameError,
+    DataFileWorkerError,
     DataFormatNotSupported,
     DataFormatUnrecognised,
     UnknownCryptoassetError,
     UnknownUsernameError,
 )
 from .mergers import *  # pylint: disable=wildcard-import, unused-wildcard-import
-from .output_csv import OutputCsv
+from .output_csv import OutputCsv, OutputCsvStream
 from .output_excel import OutputExcel
 from .parsers import *  # type: ignore[no-redef] # pylint: disable=wildcard-import, unused-wildcard-import # noqa: E501
 
@@ -41,6 +54,15 @@ if sys.stderr.encoding != "UTF-8":
     sys.stderr.reconfigure(encoding="utf-8")  # type: ignore[union-attr]
 
 
+class ReadFileResult(NamedTuple):
+    file_type: str
+    file_hash: str
+    data_files: List[DataFile]
+    messages: str
+    error: Optional[Exception]
+    cached: bool = False
+
+
 def main() -> None:
     if config.terminal == TERMINAL_POWERSHELL_GUI:
         colorama.init(strip=False)
@@ -112,11 +134,48 @@ def main() -> None:
         help="append original data as extra columns in the CSV output",
     )
     parser.add_argument("-s", "--sort", action="store_true", help="sort CSV output by timestamp")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="stream CSV output row by row to limit memory use, files which need to be merged, "
+        "or parsed as a whole, are still held in memory",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="cache the parsed data files, so only new or changed files are parsed again",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="number of data files to read in parallel, default: 1",
+    )
     parser.add_argument("-o", dest="output_filename", type=str, help="specify the output filename")
 
     args = parser.parse_args()
     config.debug = args.debug
-    DataFile.remove_duplicates = args.duplicates
+    session = current_session()
+    session.remove_duplicates = args.duplicates
+
+    if args.stream:
+        if args.format == CONV_FORMAT_EXCEL:
+            parser.error("the [--stream] option is only supported for CSV or RECAP output")
+        if args.duplicates:
+            parser.error("the [--stream] option cannot be used with [--duplicates]")
+
+        session.output_stream = OutputCsvStream(args)
+
+    if args.jobs < 1:
+        parser.error("the [--jobs] option must be at least 1")
+
+    if args.jobs > 1 and args.stream:
+        parser.error("the [--jobs] option cannot be used with [--stream]")
+
+    if args.cache and args.stream:
+        parser.error("the [--cache] option cannot be used with [--stream]")
 
     if args.binance_statements_only:
         config.config["binance_statements_only"] = True
@@ -134,26 +193,40 @@ def main() -> None:
             sys.stderr.write(f"{Fore.GREEN}args: {arg}: {getattr(args, arg)}\n")
         config.output_config(sys.stderr)
 
-    file_hashes = set()
-    for filename in args.filename:
-        if os.path.isdir(filename):
-            filename = os.path.join(filename, "**", "*")
-
-        pathnames = glob.glob(filename, recursive=True)
-        if not pathnames:
-            pathnames = [filename]
+    conv_cache = ConvCache(args) if args.cache else None
+    pathnames = _get_pathnames(args.filename)
+    futures: List[Optional["Future[ReadFileResult]"]] = [None] * len(pathnames)
+    executor = None
 
-        for pathname in pathnames:
-            if os.path.isdir(pathname):
-                continue
+    if args.jobs > 1 and len(pathnames) > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=args.jobs,
+            initializer=_init_worker,
+            initargs=(config.debug, config.config),
+        )
+        futures = [
+            executor.submit(_read_file_job, pathname, args, conv_cache) for pathname in pathnames
+        ]
 
+    file_hashes: Set[str] = set()
+    try:
+        for pathname, future in zip(pathnames, futures):
             try:
-                file_type, file_hash = _get_file_info(pathname)
-                if file_hash in file_hashes:
-                    sys.stderr.write(_file_msg(pathname, None, msg="skipping duplicate"))
+                if future:
+                    # Results are consolidated in the input order, same as a serial run
+                    _do_read_result(pathname, future.result(), file_hashes)
                 else:
-                    file_hashes.add(file_hash)
-                    _do_read_file(file_type, pathname, args)
+                    file_type, file_hash = _get_file_info(pathname)
+                    if file_hash in file_hashes:
+                        sys.stderr.write(_file_msg(pathname, None, msg="skipping duplicate"))
+                    elif conv_cache:
+                        result = _parse_file(
+                            file_type, file_hash, pathname, args, conv_cache, capture=False
+                        )
+                        _do_read_result(pathname, result, file_hashes)
+                    else:
+                        file_hashes.add(file_hash)
+                        _do_read_file(file_type, pathname, args)
 
             except UnknownCryptoassetError as e:
                 sys.stderr.write(Fore.RESET)
@@ -164,7 +237,7 @@ def main() -> None:
                     message=f"{parser.prog}: error: {e}, please specify usernames in the "
                     f"{config.BITTYTAX_CONFIG} file\n"
                 )
-            except DataFilenameError as e:
+            except (DataFilenameError, DataFileWorkerError) as e:
                 sys.stderr.write(Fore.RESET)
                 parser.exit(message=f"{parser.prog}: error: {e}\n")
             except DataFormatUnrecognised:
@@ -176,16 +249,26 @@ def main() -> None:
                     sys.stderr.write(_file_msg(pathname, None, msg="no such file or directory"))
                 else:
                     sys.stderr.write(_file_msg(pathname, None, msg="read error"))
+    finally:
+        if executor:
+            for future in futures:
+                if future:
+                    future.cancel()
+            executor.shutdown()
 
-    if DataFile.data_files:
-        DataMerge.match_merge(DataFile.data_files)
+    if session.data_files or session.output_stream and session.output_stream.data_file_cnt:
+        DataMerge.match_merge(session.data_files)
 
         if args.format == CONV_FORMAT_EXCEL:
             is_macos = platform.system() == "Darwin"
-            output_excel = OutputExcel(parser.prog, DataFile.data_files_ordered, args, is_macos)
+            output_excel = OutputExcel(parser.prog, session.data_files_ordered, args, is_macos)
             output_excel.write_excel()
         else:
-            output_csv = OutputCsv(DataFile.data_files_ordered, args)
+            if session.output_stream:
+                output_csv: OutputCsv = session.output_stream
+                output_csv.data_files = session.data_files_ordered
+            else:
+                output_csv = OutputCsv(session.data_files_ordered, args)
             sys.stderr.write(Fore.RESET)
             sys.stderr.flush()
             output_csv.write_csv()
@@ -194,6 +277,169 @@ def main() -> None:
         parser.exit(3, f"{parser.prog}: error: no data file(s) could be processed\n")
 
 
+def convert(
+    filenames: List[str],
+    unconfirmed: bool = False,
+    cryptoasset: str = "",
+    duplicates: bool = False,
+    session: Optional[Session] = None,
+) -> List[TransactionRecord]:
+    args = argparse.Namespace(
+        unconfirmed=unconfirmed,
+        cryptoasset=cryptoasset,
+        output_filename=None,
+        format=CONV_FORMAT_CSV,
+        sort=False,
+        noheader=False,
+        append=False,
+    )
+
+    with session or Session() as job_session:
+        job_session.remove_duplicates = duplicates
+        file_hashes: Set[str] = set()
+        for pathname in _get_pathnames(filenames):
+            file_type, file_hash = _get_file_info(pathname)
+            if file_hash not in file_hashes:
+                file_hashes.add(file_hash)
+                _do_read_file(file_type, pathname, args)
+
+        if not job_session.data_files:
+            return []
+
+        DataMerge.match_merge(job_session.data_files)
+
+        # Imported from the same CSV as the conversion tool outputs, so the records are identical
+        csv_file = io.StringIO()
+        OutputCsv(job_session.data_files_ordered, args).write_rows(
+            csv.writer(csv_file, lineterminator="\n")
+        )
+        csv_file.seek(0)
+        reader = csv.reader(csv_file)
+        next(reader)
+
+        import_records = ImportRecords()
+        import_records.add_rows(
+            (TransactionRow(row, reader.line_num, None), None) for row in reader
+        )
+        if import_records.failure_cnt > 0:
+            raise ImportFailureError
+
+        return import_records.get_records()
+
+
+def _get_pathnames(filenames: List[str]) -> List[str]:
+    all_pathnames: List[str] = []
+    for filename in filenames:
+        if os.path.isdir(filename):
+            filename = os.path.join(filename, "**", "*")
+
+        pathnames = glob.glob(filename, recursive=True)
+        if not pathnames:
+            pathnames = [filename]
+
+        all_pathnames.extend(pathname for pathname in pathnames if not os.path.isdir(pathname))
+
+    return all_pathnames
+
+
+def _init_worker(debug: bool, config_dict: Dict[str, Any]) -> None:
+    config.debug = debug
+    config.config.update(config_dict)
+
+
+def _read_file_job(
+    pathname: str, args: argparse.Namespace, conv_cache: Optional[ConvCache]
+) -> ReadFileResult:
+    # Runs in a worker process, the data files are parsed but consolidated by the parent
+    try:
+        file_type, file_hash = _get_file_info(pathname)
+    except IOError as e:
+        return ReadFileResult("", "", [], "", e)
+
+    result = _parse_file(file_type, file_hash, pathname, args, conv_cache, capture=True)
+    if result.error:
+        # The error is returned to the parent, so must be unpickled there
+        try:
+            pickle.loads(pickle.dumps(result.error))
+        except Exception:  # pylint: disable=broad-exception-caught
+            error = DataFileWorkerError(
+                pathname,
+                "".join(traceback.format_exception_only(type(result.error), result.error)).strip(),
+            )
+            return result._replace(error=error)
+    return result
+
+
+def _parse_file(
+    file_type: str,
+    file_hash: str,
+    pathname: str,
+    args: argparse.Namespace,
+    conv_cache: Optional[ConvCache],
+    capture: bool,
+) -> ReadFileResult:
+    # The messages of a worker are captured and written by the parent, otherwise they are
+    #  written as they are recorded for the cache
+    if conv_cache:
+        cached = conv_cache.load(pathname, file_hash)
+        if cached:
+            data_files, messages = cached
+            return ReadFileResult(file_type, file_hash, data_files, messages, None, cached=True)
+
+    error = None
+    session = current_session()
+    session.parsed_files = []
+
+    with contextlib.redirect_stderr(
+        io.StringIO() if capture else _StderrRecorder(sys.stderr)
+    ) as messages_io:
+        try:
+            _do_read_file(file_type, pathname, args)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            error = e
+
+    data_files = session.parsed_files
+    messages = messages_io.getvalue()
+    session.parsed_files = None
+
+    if conv_cache and error is None:
+        conv_cache.save(pathname, file_hash, data_files, messages)
+
+    return ReadFileResult(file_type, file_hash, data_files, messages if capture else "", error)
+
+
+class _StderrRecorder(io.StringIO):
+    def __init__(self, stderr: TextIO) -> None:
+        super().__init__()
+        self.stderr = stderr
+
+    def write(self, s: str) -> int:
+        self.stderr.write(s)
+        return super().write(s)
+
+    def flush(self) -> None:
+        self.stderr.flush()
+
+
+def _do_read_result(pathname: str, result: ReadFileResult, file_hashes: Set[str]) -> None:
+    if result.file_hash in file_hashes:
+        sys.stderr.write(_file_msg(pathname, None, msg="skipping duplicate"))
+        return
+
+    if result.file_hash:
+        file_hashes.add(result.file_hash)
+
+    if config.debug and result.cached:
+        sys.stderr.write(f"{Fore.CYAN}conv: {pathname} loaded from cache\n")
+
+    sys.stderr.write(result.messages)
+    for data_file in result.data_files:
+        DataFile.consolidate_datafiles(data_file)
+
+    if result.error:
+        raise result.error
+
+
 def _do_read_file(file_type: str, pathname: str, args: argparse.Namespace) -> None:
     if file_type == "zip":
         for worksheet in DataFile.read_excel_xlsx(pathname):
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# (c) Nano Nano Ltd 2026
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from typing import List, Optional, Tuple
+
+from ..config import config
+from ..constants import CACHE_DIR
+from ..version import __version__
+from .datafile import DataFile
+from .dataparser import DataParser
+
+
+class ConvCache:
+    CONV_CACHE_DIR = os.path.join(CACHE_DIR, "conv")
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        # Anything which can change how a data file is parsed invalidates the cache
+        self.key_data = {
+            "version": __version__,
+            "config": config.config,
+            "debug": config.debug,
+            "unconfirmed": args.unconfirmed,
+            "cryptoasset": args.cryptoasset,
+            "parsers": [parser.parser_id for parser in DataParser.parsers],
+        }
+
+    def get_key(self, pathname: str, file_hash: str) -> str:
+        key_str = json.dumps(
+            {
+                **self.key_data,
+                "filename": os.path.abspath(pathname),
+                "file_hash": file_hash,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha1(key_str.encode("utf-8")).hexdigest()
+
+    def load(self, pathname: str, file_hash: str) -> Optional[Tuple[List[DataFile], str]]:
+        filename = os.path.join(self.CONV_CACHE_DIR, self.get_key(pathname, file_hash) + ".pickle")
+        if not os.path.exists(filename):
+            return None
+
+        try:
+            with open(filename, "rb") as conv_cache:
+                data_files, messages = pickle.load(conv_cache)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+            return None
+
+        return data_files, messages
+
+    def save(
+        self, pathname: str, file_hash: str, data_files: List[DataFile], messages: str
+    ) -> None:
+        if not os.path.exists(self.CONV_CACHE_DIR):
+            os.makedirs(self.CONV_CACHE_DIR, exist_ok=True)
+
+        filename = os.path.join(self.CONV_CACHE_DIR, self.get_key(pathname, file_hash) + ".pickle")
+
+        # Write to a temporary file first, so a reader (or another job) never sees a partial file
+        with tempfile.NamedTemporaryFile(
+            "wb", dir=self.CONV_CACHE_DIR, suffix=".tmp", delete=False
+        ) as conv_cache:
+            pickle.dump((data_files, messages), conv_cache, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(conv_cache.name, filename)
@@ -8,7 +8,7 @@ import io
 import os
 import sys
 import warnings
-from typing import Dict, Iterator, List, Literal, Optional, Tuple, Union, cast
+from typing import TYPE_CHECKING, Iterator, List, Literal, Optional, Tuple, Union, cast
 
 import openpyxl
 import xlrd
@@ -21,18 +21,20 @@ from xlrd.compdoc import CompDocError
 
 from ..config import config
 from ..constants import ERROR, WARNING
+from ..session import current_session
+from ..xlsx_reader import XlsxReaderError, XlsxWorkbook, XlsxWorksheet
+from .datamerge import DataMerge
 from .dataparser import ConsolidateType, DataParser, ParserArgs
 from .datarow import DataRow
 from .exceptions import DataFormatUnrecognised, DataRowError
 
+if TYPE_CHECKING:
+    from .output_csv import OutputCsvStream
+
 
 class DataFile:
     CSV_DELIMITERS = (",", ";")
 
-    remove_duplicates = False
-    data_files: Dict["DataFile", "DataFile"] = {}
-    data_files_ordered: List["DataFile"] = []
-
     def __init__(self, parser: DataParser, reader: Iterator[List[str]]) -> None:
         self.parser = copy.copy(parser)
         self.data_rows = [
@@ -71,7 +73,7 @@ class DataFile:
         if len(other.parser.header) > len(self.parser.header):
             self.parser = other.parser
 
-        if self.remove_duplicates:
+        if current_session().remove_duplicates:
             self.data_rows += [dr for dr in other.data_rows if dr not in self.data_rows]
         else:
             # Checking for duplicates can be very slow for large files
@@ -121,23 +123,101 @@ class DataFile:
             if self.parser.newest_first:
                 self.failures.reverse()
 
-            sys.stderr.write(f'{WARNING} Parser failure for "{self.parser.name}"\n')
+            self.write_failures(self.parser, self.failures)
+
+    @staticmethod
+    def write_failures(parser: DataParser, failures: List[DataRow]) -> None:
+        sys.stderr.write(f'{WARNING} Parser failure for "{parser.name}"\n')
 
-            for data_row in self.failures:
-                if self.parser.in_header_row_num is None:
-                    raise RuntimeError("Missing in_header_row_num")
+        for data_row in failures:
+            if parser.in_header_row_num is None:
+                raise RuntimeError("Missing in_header_row_num")
 
-                sys.stderr.write(
-                    f"{Fore.YELLOW}"
-                    f"row[{self.parser.in_header_row_num + data_row.line_num}] {data_row}\n"
-                )
-                if isinstance(data_row.failure, DataRowError):
-                    sys.stderr.write(f"{ERROR} {data_row.failure}\n")
-                else:
-                    sys.stderr.write(f'{ERROR} Unexpected error: "{data_row.failure}"\n')
+            sys.stderr.write(
+                f"{Fore.YELLOW}row[{parser.in_header_row_num + data_row.line_num}] {data_row}\n"
+            )
+            if isinstance(data_row.failure, DataRowError):
+                sys.stderr.write(f"{ERROR} {data_row.failure}\n")
+            else:
+                sys.stderr.write(f'{ERROR} Unexpected error: "{data_row.failure}"\n')
+
+    @classmethod
+    def read_data_file(
+        cls, parser: DataParser, reader: Iterator[List[str]], **kwargs: Unpack[ParserArgs]
+    ) -> None:
+        session = current_session()
+        if session.output_stream and cls.is_streamable(parser):
+            cls.stream_data_file(session.output_stream, parser, reader, **kwargs)
+        else:
+            data_file = DataFile(parser, reader)
+            data_file.parse(**kwargs)
+            if session.parsed_files is not None:
+                # Collected for consolidation later, i.e. by the parent of a worker process
+                session.parsed_files.append(data_file)
+            else:
+                cls.consolidate_datafiles(data_file)
+
+    @staticmethod
+    def is_streamable(parser: DataParser) -> bool:
+        # Rows must be independent of each other, and in the original order
+        return bool(
+            parser.row_handler and not parser.newest_first and not DataMerge.is_merged(parser)
+        )
+
+    @staticmethod
+    def stream_data_file(
+        output_stream: "OutputCsvStream",
+        parser: DataParser,
+        reader: Iterator[List[str]],
+        **kwargs: Unpack[ParserArgs],
+    ) -> None:
+        parser = copy.copy(parser)
+        failures = []
+
+        # Streamed files are not consolidated, so their rows are not checked for duplicates
+        parser_file_cnt = output_stream.parser_file_cnts.get(parser.name, 0)
+        if parser_file_cnt == 1 and not config.large_data:
+            sys.stderr.write(
+                f'{WARNING} Duplicate rows are not detected for "{parser.name}" '
+                f"with the [--stream] option\n"
+            )
+        output_stream.parser_file_cnts[parser.name] = parser_file_cnt + 1
+
+        def parse_rows() -> Iterator[DataRow]:
+            for line_num, row in enumerate(reader):
+                data_row = DataRow(line_num + 1, row, parser.in_header, parser.worksheet_name)
+                if config.debug:
+                    sys.stderr.write(
+                        f"{Fore.YELLOW}conv: "
+                        f"row[{parser.in_header_row_num + data_row.line_num}] {data_row}\n"
+                    )
+
+                data_row.parse(parser, **kwargs)
+                if data_row.failure is not None:
+                    failures.append(data_row)
+                yield data_row
+
+        output_stream.write_data_file(parser.in_header, parse_rows())
+
+        if failures:
+            DataFile.write_failures(parser, failures)
+
+    @classmethod
+    def read_excel_xlsx(cls, filename: str) -> Iterator[Union[Worksheet, XlsxWorksheet]]:
+        try:
+            workbook = XlsxWorkbook(filename)
+        except XlsxReaderError:
+            yield from cls.read_excel_xlsx_openpyxl(filename)
+            return
+
+        with workbook:
+            if config.debug:
+                sys.stderr.write(f"{Fore.CYAN}conv: EXCEL\n")
+
+            yield from workbook.worksheets()
 
     @classmethod
-    def read_excel_xlsx(cls, filename: str) -> Iterator[Worksheet]:
+    def read_excel_xlsx_openpyxl(cls, filename: str) -> Iterator[Worksheet]:
         warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
         with open(filename, "rb") as df:
             try:
@@ -172,11 +252,14 @@ class DataFile:
     @classmethod
     def read_worksheet_xlsx(
         cls,
-        worksheet: Worksheet,
+        worksheet: Union[Worksheet, XlsxWorksheet],
         filename: str,
         args: argparse.Namespace,
     ) -> None:
-        reader = cls.get_cell_values_xlsx(worksheet.rows)
+        if isinstance(worksheet, XlsxWorksheet):
+            reader = worksheet.rows()
+        else:
+            reader = cls.get_cell_values_xlsx(worksheet.rows)
         parser = cls.get_parser(reader)
 
         if parser is None:
@@ -192,16 +275,15 @@ class DataFile:
                 f'{WARNING} This parser is deprecated, please use "{parser.deprecated.name}"\n'
             )
 
-        data_file = DataFile(parser, reader)
-        data_file.parse(
+        cls.read_data_file(
+            parser,
+            reader,
             filename=filename,
             worksheet=worksheet.title,
             unconfirmed=args.unconfirmed,
             cryptoasset=args.cryptoasset,
         )
 
-        cls.consolidate_datafiles(data_file)
-
     @classmethod
     def read_excel_xls(cls, filename: str) -> Iterator[Tuple[xlrd.sheet.Sheet, int]]:
         try:
@@ -236,16 +318,15 @@ class DataFile:
                 f'{WARNING} This parser is deprecated, please use "{parser.deprecated.name}"\n'
             )
 
-        data_file = DataFile(parser, reader)
-        data_file.parse(
+        cls.read_data_file(
+            parser,
+            reader,
             filename=filename,
             worksheet=worksheet.name,
             unconfirmed=args.unconfirmed,
             cryptoasset=args.cryptoasset,
         )
 
-        cls.consolidate_datafiles(data_file)
-
     @staticmethod
     def get_cell_values_xlsx(
         rows: Iterator[Tuple[Union[Cell, MergedCell], ...]],
@@ -302,14 +383,13 @@ class DataFile:
                         f'"{parser.deprecated.name}"\n'
                     )
 
-                data_file = DataFile(parser, reader)
-                data_file.parse(
+                cls.read_data_file(
+                    parser,
+                    reader,
                     filename=filename,
                     unconfirmed=args.unconfirmed,
                     cryptoasset=args.cryptoasset,
                 )
-
-                cls.consolidate_datafiles(data_file)
                 break
 
         if parser is None:
@@ -325,16 +405,17 @@ class DataFile:
                 yield csv.reader(csv_file, delimiter=delimiter)
                 csv_file.seek(0)
 
-    @classmethod
-    def consolidate_datafiles(cls, data_file: "DataFile") -> None:
+    @staticmethod
+    def consolidate_datafiles(data_file: "DataFile") -> None:
+        session = current_session()
         if (
             data_file.parser.consolidate_type is not ConsolidateType.NEVER
-            and data_file in cls.data_files
+            and data_file in session.data_files
         ):
-            cls.data_files[data_file] += data_file
+            session.data_files[data_file] += data_file
         else:
-            cls.data_files[data_file] = data_file
-            cls.data_files_ordered.append(data_file)
+            session.data_files[data_file] = data_file
+            session.data_files_ordered.append(data_file)
 
     @staticmethod
     def get_parser(reader: Iterator[List[str]]) -> Optional[DataParser]:
@@ -92,6 +92,17 @@ class DataMerge:  # pylint: disable=too-few-public-methods
                     else:
                         sys.stderr.write(f"{Fore.YELLOW}merge: nothing to merge\n")
 
+    @classmethod
+    def is_merged(cls, parser: DataParser) -> bool:
+        for data_merge in cls.mergers:
+            for merge_parser in data_merge.parsers.values():
+                if (parser.row_handler, parser.all_handler) == (
+                    merge_parser["obj"].row_handler,
+                    merge_parser["obj"].all_handler,
+                ):
+                    return True
+        return False
+
     @classmethod
     def _match_datafile(
         cls, data_files: Dict["DataFile", "DataFile"], parser: Parser
@@ -1,13 +1,14 @@
 # -*- coding: utf-8 -*-
 # (c) Nano Nano Ltd 2019
 
+import copy
+import json
 import sys
 from datetime import datetime, tzinfo
 from decimal import Decimal
 from enum import Enum, auto
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
 
-import dateutil.parser
 import dateutil.tz
 from colorama import Fore, Style
 from typing_extensions import NotRequired, Protocol, TypedDict, Unpack
@@ -17,6 +18,7 @@ from ..config import config
 from ..constants import TZ_UTC
 from ..price.pricedata import PriceData
 from .exceptions import CurrencyConversionError
+from .timestamp_parser import TimestampParser
 
 if TYPE_CHECKING:
     from parsers.defitaxes import DtConfig
@@ -120,10 +122,27 @@ class DataParser:  # pylint: disable=too-many-instance-attributes
         self.args: List[Any] = []
         self.in_header = [col if col and not callable(col) else "" for col in self.header]
         self.in_header_row_num = 1
+        self.matched_row: List[str] = []
         self.newest_first = newest_first
+        self.parser_id = self._get_parser_id()
 
         self.parsers.append(self)
 
+    def _get_parser_id(self) -> str:
+        # Identifies the parser in another process, or after the parsers have changed. Parsers
+        #  with the same id parse in the same way, so either can be used
+        return json.dumps(
+            [
+                self.name,
+                _qualified_name(self.row_handler or self.all_handler),
+                [_qualified_name(col) if callable(col) else col for col in self.header],
+                self.header_fixed,
+                self.delimiter,
+                self.consolidate_type.name,
+                self.newest_first,
+            ]
+        )
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, DataParser):
             return NotImplemented
@@ -159,7 +178,7 @@ class DataParser:  # pylint: disable=too-many-instance-attributes
         if isinstance(timestamp_str, (int, float)):
             timestamp = datetime.fromtimestamp(timestamp_str, TZ_UTC)
         else:
-            timestamp = dateutil.parser.parse(
+            timestamp = TimestampParser.parse(
                 timestamp_str, tzinfos=tzinfos, dayfirst=dayfirst, fuzzy=fuzzy
             )
 
@@ -240,23 +259,9 @@ class DataParser:  # pylint: disable=too-many-instance-attributes
         parsers_reduced = [p for p in cls.parsers if len(p.header) == len(row) and p.header_fixed]
 
         for parser in parsers_reduced:
-            parser.args = []
-            match = False
-
-            for i, row_field in enumerate(row):
-                if callable(parser.header[i]):
-                    match = parser.header[i](row_field)  # type: ignore[operator, misc]
-                    parser.args.append(match)
-                elif parser.header[i] is not None:
-                    match = row_field == parser.header[i]
-
-                if not match:
-                    break
-
-            if match:
-                parser.in_header = row
-                parser.in_header_row_num = row_num + 1
-                return parser
+            args = parser.match_fixed(row)
+            if args is not None:
+                return parser.matched(row, row_num, args)
 
             if config.debug:
                 sys.stderr.write(
@@ -273,31 +278,9 @@ class DataParser:  # pylint: disable=too-many-instance-attributes
         ]
 
         for parser in parsers_reduced:
-            parser.args = []
-            match = False
-            i = 0
-
-            # All fields must exist in order, but don't have to be contiguous
-            for header_field in parser.header:
-                while i < len(row):
-                    if callable(header_field):
-                        match = header_field(row[i])
-                        if match:
-                            parser.args.append(match)
-                    else:
-                        match = row[i] == header_field
-
-                    if match:
-                        break
-                    i += 1
-
-                if not match:
-                    break
-
-            if match:
-                parser.in_header = row
-                parser.in_header_row_num = row_num + 1
-                return parser
+            args = parser.match_dynamic(row)
+            if args is not None:
+                return parser.matched(row, row_num, args)
 
             if config.debug:
                 sys.stderr.write(
@@ -307,6 +290,100 @@ class DataParser:  # pylint: disable=too-many-instance-attributes
 
         return None
 
+    def matched(self, row: List[str], row_num: int, args: List[Any]) -> "DataParser":
+        # The registered parser is shared, so the match is recorded on a copy
+        parser = copy.copy(self)
+        parser.args = args
+        parser.in_header = row
+        parser.in_header_row_num = row_num + 1
+        parser.matched_row = list(row)
+        return parser
+
+    def match_fixed(self, row: List[str]) -> Optional[List[Any]]:
+        args: List[Any] = []
+        match = False
+
+        for i, row_field in enumerate(row):
+            if callable(self.header[i]):
+                match = self.header[i](row_field)  # type: ignore[operator, misc]
+                args.append(match)
+            elif self.header[i] is not None:
+                match = row_field == self.header[i]
+
+            if not match:
+                break
+
+        return args if match else None
+
+    def match_dynamic(self, row: List[str]) -> Optional[List[Any]]:
+        args: List[Any] = []
+        match = False
+        i = 0
+
+        # All fields must exist in order, but don't have to be contiguous
+        for header_field in self.header:
+            while i < len(row):
+                if callable(header_field):
+                    match = header_field(row[i])
+                    if match:
+                        args.append(match)
+                else:
+                    match = row[i] == header_field
+
+                if match:
+                    break
+                i += 1
+
+            if not match:
+                break
+
+        return args if match else None
+
+    def __copy__(self) -> "DataParser":
+        parser = self.__class__.__new__(self.__class__)
+        parser.__dict__.update(self.__dict__)
+        return parser
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # The header can contain lambdas which can't be pickled, so the parser is looked up by
+        # its id in the registered parsers, and the matched header row is matched again
+        return (
+            DataParser._unpickle,
+            (
+                self.parser_id,
+                self.matched_row,
+                self.in_header,
+                self.in_header_row_num,
+                self.worksheet_name,
+            ),
+        )
+
+    @classmethod
+    def _unpickle(
+        cls,
+        parser_id: str,
+        matched_row: List[str],
+        in_header: List[str],
+        in_header_row_num: int,
+        worksheet_name: str,
+    ) -> "DataParser":
+        registered = next((p for p in cls.parsers if p.parser_id == parser_id), None)
+        if registered is None:
+            raise ValueError(f"parser is not registered: {parser_id}")
+
+        parser = copy.copy(registered)
+        if matched_row:
+            if parser.header_fixed:
+                parser.args = parser.match_fixed(matched_row) or []
+            else:
+                parser.args = parser.match_dynamic(matched_row) or []
+
+        parser.matched_row = matched_row
+        parser.in_header = in_header
+        parser.in_header_row_num = in_header_row_num
+        parser.worksheet_name = worksheet_name
+        return parser
+
     @classmethod
     def format_parsers(cls) -> str:
         txt = ""
@@ -334,3 +411,7 @@ class DataParser:  # pylint: disable=too-many-instance-attributes
                 row_out.append(f"'{col}'")
 
         return f"[{', '.join(row_out)}]"
+
+
+def _qualified_name(obj: Optional[Callable]) -> str:
+    return f"{obj.__module__}.{obj.__qualname__}" if obj else ""
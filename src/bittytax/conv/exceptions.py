@@ -2,6 +2,7 @@
 # (c) Nano Nano Ltd 2019
 
 from datetime import datetime
+from typing import Any, Tuple
 
 
 class DataRowError(Exception):
@@ -11,6 +12,9 @@ class DataRowError(Exception):
         self.col_name = col_name
         self.value = value
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (self.__class__, (self.col_num, self.col_name, self.value))
+
 
 class UnexpectedTypeError(DataRowError):
     def __str__(self) -> str:
@@ -43,6 +47,9 @@ class DataParserError(Exception):
         self.filename = filename
         self.worksheet = worksheet
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (self.__class__, (self.filename, self.worksheet))
+
     def format_filename(self) -> str:
         if self.worksheet:
             return f"{self.filename} '{self.worksheet}'"
@@ -74,10 +81,25 @@ class DataFilenameError(DataParserError):
         super().__init__(filename)
         self.component = component
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (self.__class__, (self.filename, self.component))
+
     def __str__(self) -> str:
         return f"{self.component} cannot be identified from filename: {self.filename}"
 
 
+class DataFileWorkerError(DataParserError):
+    def __init__(self, filename: str, error: str) -> None:
+        super().__init__(filename)
+        self.error = error
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (self.__class__, (self.filename, self.error))
+
+    def __str__(self) -> str:
+        return f"Data file could not be parsed: {self.filename}, {self.error}"
+
+
 class CurrencyConversionError(Exception):
     def __init__(self, from_currency: str, to_currency: str, timestamp: datetime) -> None:
         super().__init__()
@@ -85,6 +107,9 @@ class CurrencyConversionError(Exception):
         self.to_currency = to_currency
         self.timestamp = timestamp
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (self.__class__, (self.from_currency, self.to_currency, self.timestamp))
+
     def __str__(self) -> str:
         return (
             f"Conversion error: {self.from_currency}->{self.to_currency} "
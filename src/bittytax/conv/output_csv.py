@@ -3,23 +3,26 @@
 
 import argparse
 import csv
+import heapq
 import os
 import sys
-from datetime import datetime
+import tempfile
+from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import TYPE_CHECKING, List, Optional, Union
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
 
 from colorama import Fore
 
 from ..bt_types import TrType, UnmappedType
 from ..config import config
-from ..constants import CONV_FORMAT_RECAP
+from ..constants import CONV_FORMAT_RECAP, TZ_UTC
 from .out_record import TransactionOutRecord
 
 if TYPE_CHECKING:
     import _csv
 
     from .datafile import DataFile
+    from .datarow import DataRow
 
 
 class OutputBase:  # pylint: disable=too-few-public-methods
@@ -147,6 +150,12 @@ class OutputCsv(OutputBase):
             writer = csv.writer(sys.stdout, lineterminator="\n")
             self.write_rows(writer)
 
+    def write_header(self, writer: "_csv.Writer", in_header: List[str]) -> None:
+        if self.append_raw_data:
+            writer.writerow(self.out_header() + self.in_header(in_header))
+        else:
+            writer.writerow(self.out_header())
+
     def write_rows(self, writer: "_csv.Writer") -> None:
         data_rows = []
         for data_file in self.data_files:
@@ -156,22 +165,22 @@ class OutputCsv(OutputBase):
             data_rows = sorted(data_rows, key=lambda dr: dr.timestamp, reverse=False)
 
         if not self.no_header:
-            if self.append_raw_data:
-                writer.writerow(
-                    self.out_header() + self.in_header(self.data_files[0].parser.in_header)
-                )
-            else:
-                writer.writerow(self.out_header())
+            self.write_header(writer, self.data_files[0].parser.in_header)
 
         for data_row in data_rows:
-            if self.append_raw_data:
-                if data_row.t_record:
-                    writer.writerow(self._to_csv(data_row.t_record) + data_row.row)
-                else:
-                    writer.writerow([None] * len(self.out_header()) + data_row.row)
-            else:
-                if data_row.t_record:
-                    writer.writerow(self._to_csv(data_row.t_record))
+            out_row = self._out_row(data_row)
+            if out_row is not None:
+                writer.writerow(out_row)
+
+    def _out_row(self, data_row: "DataRow") -> Optional[List[Optional[str]]]:
+        if self.append_raw_data:
+            if data_row.t_record:
+                return [*self._to_csv(data_row.t_record), *data_row.row]
+            return [None] * len(self.out_header()) + data_row.row
+
+        if data_row.t_record:
+            return [*self._to_csv(data_row.t_record)]
+        return None
 
     def _to_csv(self, t_record: TransactionOutRecord) -> List[str]:
         if self.csv_format == CONV_FORMAT_RECAP:
@@ -232,3 +241,138 @@ class OutputCsv(OutputBase):
             OutputCsv._format_decimal(tr.fee_quantity),
             tr.fee_asset,
         ]
+
+
+class OutputCsvStream(OutputCsv):
+    SORT_CHUNK_ROWS = 100000
+    SORT_MERGE_FILES = 64
+    EPOCH = datetime(1970, 1, 1, tzinfo=TZ_UTC)
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        super().__init__([], args)
+        self.data_file_cnt = 0
+        self.parser_file_cnts: Dict[str, int] = {}
+        self.csv_file: Optional[TextIO] = None
+        self.writer: Optional["_csv.Writer"] = None
+        self.header: Optional[List[str]] = None
+        self.sort_rows: List[Tuple[int, List[Optional[str]]]] = []
+        self.sort_chunks: List[str] = []
+        self.sort_dir: Optional[tempfile.TemporaryDirectory] = None
+        self.chunk_cnt = 0
+
+    def write_data_file(self, in_header: List[str], data_rows: Iterable["DataRow"]) -> None:
+        self.data_file_cnt += 1
+        if self.header is None:
+            self.header = in_header
+
+            if not self.sort and not self.no_header:
+                self.write_header(self._get_writer(), self.header)
+
+        for data_row in data_rows:
+            out_row = self._out_row(data_row)
+            if out_row is None:
+                continue
+
+            if self.sort:
+                self.sort_rows.append((self._sort_key(data_row.timestamp), out_row))
+                if len(self.sort_rows) >= self.SORT_CHUNK_ROWS:
+                    self.sort_rows.sort(key=lambda r: r[0])
+                    self.sort_chunks.append(self._write_chunk(self.sort_rows))
+                    self.sort_rows = []
+            else:
+                self._get_writer().writerow(out_row)
+
+    def write_csv(self) -> None:
+        for data_file in self.data_files:
+            self.write_data_file(data_file.parser.in_header, data_file.data_rows)
+
+        if self.sort:
+            writer = self._get_writer()
+            if not self.no_header and self.header is not None:
+                self.write_header(writer, self.header)
+
+            for out_row in self._merge_sorted():
+                writer.writerow(out_row)
+
+        if self.filename and self.csv_file:
+            self.csv_file.close()
+            sys.stdout.write(
+                f"{Fore.WHITE}output CSV file created: "
+                f"{Fore.YELLOW}{os.path.abspath(self.filename)}\n"
+            )
+
+    def _get_writer(self) -> "_csv.Writer":
+        if self.writer is None:
+            if self.filename:
+                self.csv_file = open(  # pylint: disable=consider-using-with
+                    self.filename, "w", newline="", encoding="utf-8"
+                )
+                self.writer = csv.writer(self.csv_file, lineterminator="\n")
+            else:
+                sys.stdout.reconfigure(encoding="utf-8")  # type: ignore[union-attr]
+                self.writer = csv.writer(sys.stdout, lineterminator="\n")
+        return self.writer
+
+    def _sort_key(self, timestamp: datetime) -> int:
+        # Integer microseconds, so no precision is lost when written to a chunk file
+        return (timestamp - self.EPOCH) // timedelta(microseconds=1)
+
+    def _write_chunk(self, sort_rows: Iterable[Tuple[int, List[Optional[str]]]]) -> str:
+        if self.sort_dir is None:
+            self.sort_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+        chunk_path = os.path.join(self.sort_dir.name, f"chunk{self.chunk_cnt}.csv")
+        self.chunk_cnt += 1
+
+        with open(chunk_path, "w", newline="", encoding="utf-8") as chunk_file:
+            writer = csv.writer(chunk_file, lineterminator="\n")
+            for sort_key, out_row in sort_rows:
+                writer.writerow([sort_key] + out_row)
+
+        return chunk_path
+
+    @staticmethod
+    def _read_chunk(chunk_path: str) -> Iterator[Tuple[int, List[Optional[str]]]]:
+        with open(chunk_path, newline="", encoding="utf-8") as chunk_file:
+            for row in csv.reader(chunk_file):
+                yield int(row[0]), list(row[1:])
+
+        os.remove(chunk_path)
+
+    @staticmethod
+    def _merge_chunks(chunk_paths: List[str]) -> Iterator[Tuple[int, List[Optional[str]]]]:
+        # heapq.merge is stable, rows with the same timestamp are taken from the earliest chunk
+        return heapq.merge(
+            *[OutputCsvStream._read_chunk(chunk_path) for chunk_path in chunk_paths],
+            key=lambda r: r[0],
+        )
+
+    def _merge_sorted(self) -> Iterator[List[Optional[str]]]:
+        # Sort is stable, so rows with the same timestamp keep their original order
+        self.sort_rows.sort(key=lambda r: r[0])
+
+        if not self.sort_chunks:
+            for _, out_row in self.sort_rows:
+                yield out_row
+            return
+
+        if self.sort_rows:
+            self.sort_chunks.append(self._write_chunk(self.sort_rows))
+            self.sort_rows = []
+
+        # Limit the number of open files by merging in multiple passes
+        while len(self.sort_chunks) > self.SORT_MERGE_FILES:
+            self.sort_chunks = [
+                self._write_chunk(
+                    self._merge_chunks(self.sort_chunks[i : i + self.SORT_MERGE_FILES])
+                )
+                for i in range(0, len(self.sort_chunks), self.SORT_MERGE_FILES)
+            ]
+
+        for _, out_row in self._merge_chunks(self.sort_chunks):
+            yield out_row
+
+        self.sort_chunks = []
+        if self.sort_dir is not None:
+            self.sort_dir.cleanup()
+            self.sort_dir = None
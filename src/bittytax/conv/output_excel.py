@@ -8,7 +8,7 @@ import re
 import sys
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
 
 import xlsxwriter
 from colorama import Fore
@@ -29,6 +29,7 @@ from ..constants import (
     FONT_COLOR_TX_HASH,
     FONT_COLOR_TX_SRC,
     PROJECT_URL,
+    TX_RAW_HEADER,
     TZ_UTC,
 )
 from ..version import __version__
@@ -44,6 +45,13 @@ class Column(TypedDict):  # pylint: disable=too-few-public-methods
     header_format: xlsxwriter.worksheet.Format
 
 
+class Validation(TypedDict):  # pylint: disable=too-few-public-methods
+    tr_types: Sequence[TrType]
+    first_row: int
+    last_row: int
+    col: int
+
+
 class OutputExcel(OutputBase):  # pylint: disable=too-many-instance-attributes
     FILE_EXTENSION = "xlsx"
     DATE_FORMAT = "yyyy-mm-dd hh:mm:ss"
@@ -71,11 +79,16 @@ class OutputExcel(OutputBase):  # pylint: disable=too-many-instance-attributes
             if not args:
                 raise RuntimeError("Missing args")
 
+            # Rows are written out as they are added, only one row at a time is kept in memory
+            self.constant_memory = config.large_data
             self.filename: Optional[str] = self.get_output_filename(
                 args.output_filename, self.FILE_EXTENSION
             )
-            self.workbook = xlsxwriter.Workbook(self.filename)
+            self.workbook = xlsxwriter.Workbook(
+                self.filename, {"constant_memory": self.constant_memory}
+            )
         else:
+            self.constant_memory = False
             self.filename = None
             self.workbook = xlsxwriter.Workbook(stream, {"in_memory": True})
 
@@ -216,6 +229,9 @@ class OutputExcel(OutputBase):  # pylint: disable=too-many-instance-attributes
                     worksheets[ws_name] = Worksheet(
                         self, ws_name, data_file.parser.in_header, data_file.data_rows
                     )
+                    if self.constant_memory:
+                        # Rows must be written in order, so headings first instead of a table
+                        worksheets[ws_name].add_headings()
 
                 data_rows = sorted(data_file.data_rows, key=lambda dr: dr.timestamp, reverse=False)
                 for dr in data_rows:
@@ -223,8 +239,11 @@ class OutputExcel(OutputBase):  # pylint: disable=too-many-instance-attributes
                     worksheet.add_row(dr)
 
                 for ws_name in worksheet_names:
-                    worksheets[ws_name].make_table()
-                    if not config.large_data:
+                    worksheets[ws_name].add_validations()
+                    if not self.constant_memory:
+                        # Tables are not supported in constant memory mode
+                        worksheets[ws_name].make_table()
+                    if not worksheets[ws_name].large_data:
                         # Lots of conditional formatting can slow down Excel
                         worksheets[ws_name].conditional_formatting()
                     worksheets[ws_name].autofit()
@@ -244,8 +263,12 @@ class OutputExcel(OutputBase):  # pylint: disable=too-many-instance-attributes
             )
 
 
-class Worksheet:
+class Worksheet:  # pylint: disable=too-many-instance-attributes
     MAX_COL_WIDTH = 30
+    # Column widths are calculated from the first and last rows only
+    AUTOFIT_SAMPLE_ROWS = 1000
+    # Above this many rows, cheaper formatting is used (as if large_data was set)
+    LARGE_DATA_ROWS = 100000
 
     def __init__(
         self,
@@ -258,9 +281,27 @@ class Worksheet:
         self.worksheet = output.workbook.add_worksheet(self.output.sheet_name(worksheet_name))
         self.worksheet_name = worksheet_name
         self.col_width: Dict[int, int] = {}
+        self.num_max: Dict[int, Decimal] = {}
+        self.num_places: Dict[int, int] = {}
+        self.num_negative: Set[int] = set()
+        self.num_prefix: Dict[int, int] = {}
+        self.validations: List[Validation] = []
+        self.tx_raw_col: Optional[int] = None
+        if any(dr.tx_raw for dr in data_rows if dr.worksheet_name == worksheet_name):
+            # Hidden columns after the original data, so the importer can read the transaction
+            # hashes and addresses without checking the font colours
+            self.tx_raw_col = len(self.output.BITTYTAX_OUT_HEADER) + max(
+                [len(in_header)]
+                + [len(dr.row) for dr in data_rows if dr.worksheet_name == worksheet_name]
+            )
         self.columns = self._make_columns(in_header)
+        self.in_data_formats: Dict[
+            Tuple[Optional[int], Optional[int], Optional[int]], List[xlsxwriter.worksheet.Format]
+        ] = {}
         self.row_num = 1
         self.microseconds, self.milliseconds = self._is_microsecond_timestamp(data_rows)
+        self.total_rows = sum(1 for dr in data_rows if dr.worksheet_name == worksheet_name)
+        self.large_data = config.large_data or self.total_rows > self.LARGE_DATA_ROWS
 
         self.worksheet.freeze_panes(1, len(self.output.BITTYTAX_OUT_HEADER))
 
@@ -268,6 +309,12 @@ class Worksheet:
         col_names = {}
         columns = []
 
+        if self.tx_raw_col is not None:
+            in_header = in_header + [""] * (
+                self.tx_raw_col - len(self.output.BITTYTAX_OUT_HEADER) - len(in_header)
+            )
+            in_header += TX_RAW_HEADER
+
         for col_num, col_name in enumerate(self.output.BITTYTAX_OUT_HEADER + in_header):
             col_name = col_name.replace("{{currency}}", config.ccy)
             if col_name.lower() not in col_names:
@@ -309,57 +356,96 @@ class Worksheet:
         return milliseconds, microseconds
 
     def add_row(self, data_row: DataRow) -> None:
-        self.worksheet.set_row(self.row_num, None, self.output.format_out_data)
+        sampled = (
+            self.row_num <= self.AUTOFIT_SAMPLE_ROWS
+            or self.row_num > self.total_rows - self.AUTOFIT_SAMPLE_ROWS
+        )
+
+        if not self.large_data:
+            self.worksheet.set_row(self.row_num, None, self.output.format_out_data)
 
         # Add transaction record
         if data_row.t_record:
             self._xl_type(data_row.t_record.t_type, self.row_num, 0, data_row.t_record)
             self._xl_quantity(data_row.t_record.buy_quantity, self.row_num, 1)
-            self._xl_asset(data_row.t_record.buy_asset, self.row_num, 2)
+            self._xl_asset(data_row.t_record.buy_asset, self.row_num, 2, sampled)
             self._xl_value(data_row.t_record.buy_value, self.row_num, 3)
             self._xl_quantity(data_row.t_record.sell_quantity, self.row_num, 4)
-            self._xl_asset(data_row.t_record.sell_asset, self.row_num, 5)
+            self._xl_asset(data_row.t_record.sell_asset, self.row_num, 5, sampled)
             self._xl_value(data_row.t_record.sell_value, self.row_num, 6)
             self._xl_quantity(data_row.t_record.fee_quantity, self.row_num, 7)
-            self._xl_asset(data_row.t_record.fee_asset, self.row_num, 8)
+            self._xl_asset(data_row.t_record.fee_asset, self.row_num, 8, sampled)
             self._xl_value(data_row.t_record.fee_value, self.row_num, 9)
-            self._xl_wallet(data_row.t_record.wallet, self.row_num, 10)
+            self._xl_wallet(data_row.t_record.wallet, self.row_num, 10, sampled)
             self._xl_timestamp(data_row.t_record.timestamp, self.row_num, 11)
-            self._xl_note(data_row.t_record.note, self.row_num, 12)
+            self._xl_note(data_row.t_record.note, self.row_num, 12, sampled)
 
         # Add original data
-        for col_num, col_data in enumerate(data_row.row):
-            if (
-                data_row.failure
-                and isinstance(data_row.failure, DataRowError)
-                and data_row.failure.col_num == col_num
-            ):
-                cell_format = self.output.format_in_data_col_err
-            elif data_row.failure and not isinstance(data_row.failure, DataRowError):
-                cell_format = self.output.format_in_data_err
-            elif data_row.tx_raw:
-                if data_row.tx_raw.tx_hash_pos == col_num:
-                    cell_format = self.output.format_in_data_tx_hash
-                elif data_row.tx_raw.tx_src_pos == col_num:
-                    cell_format = self.output.format_in_data_tx_src
-                elif data_row.tx_raw.tx_dest_pos == col_num:
-                    cell_format = self.output.format_in_data_tx_dest
-                else:
-                    cell_format = self.output.format_in_data
+        col_offset = len(self.output.BITTYTAX_OUT_HEADER)
+        for col_num, (col_data, cell_format) in enumerate(
+            zip(data_row.row, self._in_data_formats(data_row))
+        ):
+            if col_data and col_data[0] not in "={" and ":" not in col_data:
+                # Plain string, skip the type detection done by write()
+                self.worksheet.write_string(
+                    self.row_num, col_offset + col_num, col_data, cell_format
+                )
             else:
-                cell_format = self.output.format_in_data
+                self.worksheet.write(self.row_num, col_offset + col_num, col_data, cell_format)
 
-            self.worksheet.write(
-                self.row_num,
-                len(self.output.BITTYTAX_OUT_HEADER) + col_num,
-                col_data,
-                cell_format,
-            )
+            if sampled:
+                self._autofit_calc(col_offset + col_num, len(col_data))
 
-            self._autofit_calc(len(self.output.BITTYTAX_OUT_HEADER) + col_num, len(col_data))
+        if data_row.tx_raw and self.tx_raw_col is not None:
+            for i, pos in enumerate(
+                (
+                    data_row.tx_raw.tx_hash_pos,
+                    data_row.tx_raw.tx_src_pos,
+                    data_row.tx_raw.tx_dest_pos,
+                )
+            ):
+                if pos is not None and data_row.row[pos]:
+                    self.worksheet.write_string(
+                        self.row_num, self.tx_raw_col + i, data_row.row[pos]
+                    )
 
         self.row_num += 1
 
+    def _in_data_formats(self, data_row: DataRow) -> List[xlsxwriter.worksheet.Format]:
+        if data_row.failure and not isinstance(data_row.failure, DataRowError):
+            return [self.output.format_in_data_err] * len(data_row.row)
+
+        # Formats only depend upon the tx_raw positions, so they can be reused
+        if data_row.tx_raw:
+            key = (
+                data_row.tx_raw.tx_hash_pos,
+                data_row.tx_raw.tx_src_pos,
+                data_row.tx_raw.tx_dest_pos,
+            )
+        else:
+            key = (None, None, None)
+
+        if key not in self.in_data_formats or len(self.in_data_formats[key]) < len(data_row.row):
+            formats = []
+            for col_num in range(len(data_row.row)):
+                if key[0] == col_num:
+                    formats.append(self.output.format_in_data_tx_hash)
+                elif key[1] == col_num:
+                    formats.append(self.output.format_in_data_tx_src)
+                elif key[2] == col_num:
+                    formats.append(self.output.format_in_data_tx_dest)
+                else:
+                    formats.append(self.output.format_in_data)
+            self.in_data_formats[key] = formats
+
+        if isinstance(data_row.failure, DataRowError):
+            formats = list(self.in_data_formats[key])
+            if data_row.failure.col_num < len(formats):
+                formats[data_row.failure.col_num] = self.output.format_in_data_col_err
+            return formats
+
+        return self.in_data_formats[key]
+
     def _xl_type(
         self,
         t_type: Union[TrType, UnmappedType],
@@ -368,38 +454,11 @@ class Worksheet:
         t_record: TransactionOutRecord,
     ) -> None:
         if t_type in BUY_AND_SELL_TYPES or t_record.buy_asset and t_record.sell_asset:
-            self.worksheet.data_validation(
-                row_num,
-                col_num,
-                row_num,
-                col_num,
-                {
-                    "validate": "list",
-                    "source": [t.value for t in BUY_AND_SELL_TYPES if t not in DEPRECATED_TYPES],
-                },
-            )
+            self._add_validation(row_num, col_num, BUY_AND_SELL_TYPES)
         elif t_type in BUY_TYPES or t_record.buy_asset and not t_record.sell_asset:
-            self.worksheet.data_validation(
-                row_num,
-                col_num,
-                row_num,
-                col_num,
-                {
-                    "validate": "list",
-                    "source": [t.value for t in BUY_TYPES if t not in DEPRECATED_TYPES],
-                },
-            )
+            self._add_validation(row_num, col_num, BUY_TYPES)
         elif t_type in SELL_TYPES or t_record.sell_asset and not t_record.buy_asset:
-            self.worksheet.data_validation(
-                row_num,
-                col_num,
-                row_num,
-                col_num,
-                {
-                    "validate": "list",
-                    "source": [t.value for t in SELL_TYPES if t not in DEPRECATED_TYPES],
-                },
-            )
+            self._add_validation(row_num, col_num, SELL_TYPES)
         if isinstance(t_type, TrType):
             self.worksheet.write_string(row_num, col_num, t_type.value)
             self._autofit_calc(col_num, len(t_type.value))
@@ -420,38 +479,78 @@ class Worksheet:
                 },
             )
 
+    def _add_validation(self, row_num: int, col_num: int, tr_types: Sequence[TrType]) -> None:
+        # Consecutive rows with the same list of types share a single data validation
+        if (
+            self.validations
+            and self.validations[-1]["tr_types"] is tr_types
+            and self.validations[-1]["last_row"] == row_num - 1
+        ):
+            self.validations[-1]["last_row"] = row_num
+        else:
+            self.validations.append(
+                Validation(
+                    {
+                        "tr_types": tr_types,
+                        "first_row": row_num,
+                        "last_row": row_num,
+                        "col": col_num,
+                    }
+                )
+            )
+
+    def add_validations(self) -> None:
+        for validation in self.validations:
+            self.worksheet.data_validation(
+                validation["first_row"],
+                validation["col"],
+                validation["last_row"],
+                validation["col"],
+                {
+                    "validate": "list",
+                    "source": [
+                        t.value for t in validation["tr_types"] if t not in DEPRECATED_TYPES
+                    ],
+                },
+            )
+
     def _xl_quantity(self, quantity: Optional[Decimal], row_num: int, col_num: int) -> None:
         if quantity is not None:
-            if len(quantity.normalize().as_tuple().digits) > EXCEL_PRECISION:
+            quantity = quantity.normalize()
+            quantity_tuple = quantity.as_tuple()
+            if len(quantity_tuple.digits) > EXCEL_PRECISION:
                 self.worksheet.write_string(
                     row_num,
                     col_num,
-                    f"{quantity.normalize():0,f}",
+                    f"{quantity:0,f}",
                     self.output.format_num_string,
                 )
             else:
                 self.worksheet.write_number(
-                    row_num, col_num, quantity.normalize(), self.output.format_num_float
+                    row_num, col_num, quantity, self.output.format_num_float
                 )
 
-            self._autofit_calc(col_num, len(f"{quantity.normalize():0,f}"))
+            places = -quantity_tuple.exponent if isinstance(quantity_tuple.exponent, int) else 0
+            self._autofit_number(col_num, quantity, max(places, 0))
 
-    def _xl_asset(self, asset: str, row_num: int, col_num: int) -> None:
+    def _xl_asset(self, asset: str, row_num: int, col_num: int, sampled: bool = True) -> None:
         self.worksheet.write_string(row_num, col_num, asset)
-        self._autofit_calc(col_num, len(asset))
+        if sampled:
+            self._autofit_calc(col_num, len(asset))
 
     def _xl_value(self, value: Optional[Decimal], row_num: int, col_num: int) -> None:
         if value is not None:
             self.worksheet.write_number(
                 row_num, col_num, value.normalize(), self.output.format_currency
             )
-            self._autofit_calc(col_num, len(f"£{value:0,.2f}"))
+            self._autofit_number(col_num, value, 2, "£")
         else:
             self.worksheet.write_blank(row_num, col_num, None, self.output.format_currency)
 
-    def _xl_wallet(self, wallet: str, row_num: int, col_num: int) -> None:
+    def _xl_wallet(self, wallet: str, row_num: int, col_num: int, sampled: bool = True) -> None:
         self.worksheet.write_string(row_num, col_num, wallet)
-        self._autofit_calc(col_num, len(wallet))
+        if sampled:
+            self._autofit_calc(col_num, len(wallet))
 
     def _xl_timestamp(self, timestamp: datetime, row_num: int, col_num: int) -> None:
         utc_timestamp = timestamp.astimezone(TZ_UTC)
@@ -477,9 +576,10 @@ class Worksheet:
             )
             self._autofit_calc(col_num, len(self.output.DATE_FORMAT))
 
-    def _xl_note(self, note: str, row_num: int, col_num: int) -> None:
+    def _xl_note(self, note: str, row_num: int, col_num: int, sampled: bool = True) -> None:
         self.worksheet.write_string(row_num, col_num, note)
-        self._autofit_calc(col_num, len(note) if note else self.MAX_COL_WIDTH)
+        if sampled:
+            self._autofit_calc(col_num, len(note) if note else self.MAX_COL_WIDTH)
 
     def _autofit_calc(self, col_num: int, width: int) -> None:
         width = min(width, self.MAX_COL_WIDTH)
@@ -490,9 +590,36 @@ class Worksheet:
         else:
             self.col_width[col_num] = width
 
+    def _autofit_number(self, col_num: int, number: Decimal, places: int, prefix: str = "") -> None:
+        # Numbers are not sampled, instead just the largest magnitude, the most decimal places
+        # and the sign are tracked, the width is calculated from these when the sheet is done
+        if number < 0:
+            self.num_negative.add(col_num)
+            number = -number
+
+        if col_num not in self.num_max or number > self.num_max[col_num]:
+            self.num_max[col_num] = number
+
+        if col_num not in self.num_places or places > self.num_places[col_num]:
+            self.num_places[col_num] = places
+
+        if prefix:
+            self.num_prefix[col_num] = len(prefix)
+
     def autofit(self) -> None:
+        for col_num, num_max in self.num_max.items():
+            width = self.num_prefix.get(col_num, 0) + len(f"{int(num_max):,}")
+            if self.num_places[col_num]:
+                width += 1 + self.num_places[col_num]
+            if col_num in self.num_negative:
+                width += 1
+            self._autofit_calc(col_num, width)
+
         for col_num, col_width in self.col_width.items():
-            self.worksheet.set_column(col_num, col_num, col_width)
+            if self.tx_raw_col is not None and col_num >= self.tx_raw_col:
+                self.worksheet.set_column(col_num, col_num, col_width, None, {"hidden": True})
+            else:
+                self.worksheet.set_column(col_num, col_num, col_width)
 
     def conditional_formatting(self) -> None:
         self._format_integer(1, 1)
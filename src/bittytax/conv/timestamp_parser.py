@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+# (c) Nano Nano Ltd 2026
+
+import re
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Dict, FrozenSet, List, Match, Optional, Pattern, Tuple
+
+import dateutil.parser
+
+from ..constants import TZ_UTC
+
+ParserKey = Tuple[bool, bool, FrozenSet[str]]
+
+
+class TimestampFormat:
+    DIRECTIVES = {
+        "%Y": r"(?P<Y>\d{4})",
+        "%m": r"(?P<m>\d{1,2})",
+        "%d": r"(?P<d>\d{1,2})",
+        "%b": r"(?P<b>[A-Za-z]{3})",
+        "%H": r"(?P<H>\d{1,2})",
+        "%I": r"(?P<I>\d{1,2})",
+        "%M": r"(?P<M>\d{2})",
+        "%S": r"(?P<S>\d{2})",
+        "%f": r"(?P<f>\d{1,6})",
+        "%p": r"(?P<p>[AaPp][Mm])",
+    }
+    TIME_24H = "%H:%M:%S"
+    TIME_12H = "%I:%M:%S %p"
+    TZ_REGEX = r"(?:(?P<tz_name>Z| UTC)|(?P<tz_offset> ?[+-]\d{2}:?\d{2}))?"
+
+    MONTHS = {
+        "jan": 1,
+        "feb": 2,
+        "mar": 3,
+        "apr": 4,
+        "may": 5,
+        "jun": 6,
+        "jul": 7,
+        "aug": 8,
+        "sep": 9,
+        "oct": 10,
+        "nov": 11,
+        "dec": 12,
+    }
+
+    def __init__(self, date_fmt: str, sep: str = "", time_fmt: str = "") -> None:
+        self.probe_fmt = f"{date_fmt}{sep}{time_fmt}"
+        self.has_time = bool(time_fmt)
+
+        regex = self._to_regex(date_fmt)
+        if time_fmt:
+            if time_fmt == self.TIME_12H:
+                time_regex = r"%I:%M(?::%S(?:\.%f)?)? %p"
+            else:
+                time_regex = r"%H:%M(?::%S(?:\.%f)?)?"
+
+            regex += re.escape(sep) + self._to_regex(time_regex, escape=False) + self.TZ_REGEX
+
+        self.regex: Pattern[str] = re.compile(regex)
+
+    def _to_regex(self, fmt: str, escape: bool = True) -> str:
+        regex = ""
+        for token in re.split(r"(%[A-Za-z])", fmt):
+            if token in self.DIRECTIVES:
+                regex += self.DIRECTIVES[token]
+            elif escape:
+                regex += re.escape(token)
+            else:
+                regex += token
+        return regex
+
+    def match(self, timestamp_str: str) -> Optional[Match[str]]:
+        return self.regex.fullmatch(timestamp_str)
+
+    def parse(self, timestamp_str: str) -> Optional[datetime]:
+        match = self.regex.fullmatch(timestamp_str)
+        if not match:
+            return None
+
+        fields = match.groupdict()
+
+        if fields.get("b") is not None:
+            month = self.MONTHS[fields["b"].lower()]
+        else:
+            month = int(fields["m"])
+
+        if fields.get("I") is not None:
+            hour = int(fields["I"])
+            if not 1 <= hour <= 12:
+                raise ValueError("Hour out of range for 12-hour clock")
+            hour = hour % 12 + (12 if fields["p"].lower() == "pm" else 0)
+        elif fields.get("H") is not None:
+            hour = int(fields["H"])
+        else:
+            hour = 0
+
+        minute = int(fields["M"]) if fields.get("M") is not None else 0
+        second = int(fields["S"]) if fields.get("S") is not None else 0
+        microsecond = int(fields["f"].ljust(6, "0")) if fields.get("f") is not None else 0
+
+        tz: Optional[tzinfo] = None
+        if fields.get("tz_name") is not None:
+            tz = TZ_UTC
+        elif fields.get("tz_offset") is not None:
+            offset = fields["tz_offset"].strip().replace(":", "")
+            delta = timedelta(hours=int(offset[1:3]), minutes=int(offset[3:5]))
+            tz = timezone(-delta if offset[0] == "-" else delta)
+
+        return datetime(
+            int(fields["Y"]), month, int(fields["d"]), hour, minute, second, microsecond, tz
+        )
+
+    def tz_name(self, timestamp_str: str) -> Optional[str]:
+        match = self.regex.fullmatch(timestamp_str)
+        if match and match.group("tz_name"):
+            return match.group("tz_name").strip()
+        return None
+
+
+class TimestampParser:  # pylint: disable=too-few-public-methods
+    # A timestamp's "shape" replaces all digits and letters, so all rows of a column normally
+    # share the same shape, and the format learnt from the first row can be reused for the rest
+    SHAPE_TABLE = str.maketrans(
+        "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ",
+        "9" * 10 + "a" * 52,
+    )
+    MAX_SHAPES = 1024
+    PROBE_TIMESTAMP = datetime(2001, 2, 3, 4, 5, 6)
+
+    DATE_FORMATS = (
+        "%Y-%m-%d",
+        "%Y-%d-%m",
+        "%Y/%m/%d",
+        "%Y/%d/%m",
+        "%d/%m/%Y",
+        "%m/%d/%Y",
+        "%d-%m-%Y",
+        "%m-%d-%Y",
+        "%d.%m.%Y",
+        "%m.%d.%Y",
+        "%d %b %Y",
+        "%b %d %Y",
+        "%b %d, %Y",
+        "%d-%b-%Y",
+    )
+    DATE_TIME_SEPARATORS = ("T", " ", ", ")
+
+    candidates: List[TimestampFormat] = []
+    shapes: Dict[ParserKey, Dict[str, Optional[TimestampFormat]]] = {}
+    probes: Dict[Tuple[ParserKey, str], bool] = {}
+
+    @classmethod
+    def parse(
+        cls,
+        timestamp_str: str,
+        tzinfos: Optional[Dict[str, Optional[tzinfo]]] = None,
+        dayfirst: bool = False,
+        fuzzy: bool = False,
+    ) -> datetime:
+        key = (dayfirst, fuzzy, frozenset(tzinfos) if tzinfos else frozenset())
+        shapes = cls.shapes.setdefault(key, {})
+        shape = timestamp_str.translate(cls.SHAPE_TABLE)
+
+        if shape in shapes:
+            timestamp_format = shapes[shape]
+            if timestamp_format:
+                try:
+                    timestamp = timestamp_format.parse(timestamp_str)
+                except (ValueError, KeyError):
+                    timestamp = None
+
+                if timestamp:
+                    return timestamp
+
+            # Mismatch, dateutil decides
+            return dateutil.parser.parse(
+                timestamp_str, tzinfos=tzinfos, dayfirst=dayfirst, fuzzy=fuzzy
+            )
+
+        timestamp = dateutil.parser.parse(
+            timestamp_str, tzinfos=tzinfos, dayfirst=dayfirst, fuzzy=fuzzy
+        )
+
+        if len(shapes) < cls.MAX_SHAPES:
+            shapes[shape] = cls._learn_format(key, timestamp_str, timestamp, tzinfos)
+
+        return timestamp
+
+    @classmethod
+    def _learn_format(
+        cls,
+        key: ParserKey,
+        timestamp_str: str,
+        timestamp: datetime,
+        tzinfos: Optional[Dict[str, Optional[tzinfo]]],
+    ) -> Optional[TimestampFormat]:
+        if not cls.candidates:
+            cls.candidates = cls._make_candidates()
+
+        for timestamp_format in cls.candidates:
+            if not timestamp_format.match(timestamp_str):
+                continue
+
+            if tzinfos and timestamp_format.tz_name(timestamp_str) in tzinfos:
+                continue
+
+            try:
+                fast_timestamp = timestamp_format.parse(timestamp_str)
+            except (ValueError, KeyError):
+                continue
+
+            if (
+                fast_timestamp
+                and cls._is_same(fast_timestamp, timestamp)
+                and cls._is_unambiguous(key, timestamp_format, tzinfos)
+            ):
+                return timestamp_format
+
+        return None
+
+    @classmethod
+    def _is_unambiguous(
+        cls,
+        key: ParserKey,
+        timestamp_format: TimestampFormat,
+        tzinfos: Optional[Dict[str, Optional[tzinfo]]],
+    ) -> bool:
+        # Day and month must not be interchangeable, check dateutil agrees on their order
+        # (for the given dayfirst) using a probe where both are valid as either
+        probe_key = (key, timestamp_format.probe_fmt)
+        if probe_key not in cls.probes:
+            dayfirst, fuzzy, _ = key
+            probe_str = f"{cls.PROBE_TIMESTAMP:{timestamp_format.probe_fmt}}"
+            try:
+                probe = dateutil.parser.parse(
+                    probe_str, tzinfos=tzinfos, dayfirst=dayfirst, fuzzy=fuzzy
+                )
+            except (ValueError, OverflowError):
+                cls.probes[probe_key] = False
+            else:
+                if timestamp_format.has_time:
+                    cls.probes[probe_key] = probe == cls.PROBE_TIMESTAMP
+                else:
+                    cls.probes[probe_key] = probe == datetime.combine(
+                        cls.PROBE_TIMESTAMP.date(), datetime.min.time()
+                    )
+
+        return cls.probes[probe_key]
+
+    @staticmethod
+    def _is_same(timestamp1: datetime, timestamp2: datetime) -> bool:
+        if (timestamp1.tzinfo is None) != (timestamp2.tzinfo is None):
+            return False
+
+        return (
+            timestamp1 == timestamp2
+            and timestamp1.utcoffset() == timestamp2.utcoffset()
+            and timestamp1.replace(tzinfo=None) == timestamp2.replace(tzinfo=None)
+        )
+
+    @classmethod
+    def _make_candidates(cls) -> List[TimestampFormat]:
+        candidates = []
+        for date_fmt in cls.DATE_FORMATS:
+            for sep in cls.DATE_TIME_SEPARATORS:
+                candidates.append(TimestampFormat(date_fmt, sep, TimestampFormat.TIME_24H))
+                candidates.append(TimestampFormat(date_fmt, sep, TimestampFormat.TIME_12H))
+            candidates.append(TimestampFormat(date_fmt))
+        return candidates
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # (c) Nano Nano Ltd 2019
 
-from typing import Any
+from typing import Any, Tuple
 
 from .bt_types import TrType
 
@@ -13,6 +13,9 @@ class TransactionParserError(Exception):
         self.col_name = col_name
         self.value = value
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (self.__class__, (self.col_num, self.col_name, self.value))
+
 
 class UnexpectedTransactionTypeError(TransactionParserError):
     def __str__(self) -> str:
@@ -45,3 +48,8 @@ class MissingDataError(TransactionParserError):
 class ImportFailureError(Exception):
     def __str__(self) -> str:
         return "Import failure"
+
+
+class IntegrityCheckError(Exception):
+    def __str__(self) -> str:
+        return "Integrity check failure"
@@ -4,29 +4,79 @@
 import csv
 import re
 import warnings
-from typing import List, Optional, TextIO, Tuple, Union, cast
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+    cast,
+)
 
-import openpyxl
-import xlrd
 from colorama import Fore
-from openpyxl.cell.cell import Cell, MergedCell
 from tqdm import tqdm, trange
 
 from .config import config
-from .constants import ERROR, FONT_COLOR_TX_DEST, FONT_COLOR_TX_HASH, FONT_COLOR_TX_SRC
+from .constants import (
+    ERROR,
+    FONT_COLOR_TX_DEST,
+    FONT_COLOR_TX_HASH,
+    FONT_COLOR_TX_SRC,
+    TX_RAW_HEADER,
+)
 from .exceptions import TransactionParserError
 from .t_record import TransactionRecord
-from .t_row import TransactionRow, TxRaw
+from .t_row import ParsedRow, TransactionRow, TxRaw
 from .utils import bt_tqdm_write, disable_tqdm
 
+if TYPE_CHECKING:
+    import xlrd
+    from openpyxl.cell.cell import Cell, MergedCell
+
+    from .xlsx_reader import XlsxRow
+
+ParseResult = Union[ParsedRow, TransactionParserError, None]
+PendingRow = Tuple[TransactionRow, Optional[TxRaw]]
+
 
 class ImportRecords:
-    def __init__(self) -> None:
+    CHUNK_ROWS = 5000
+
+    def __init__(self, jobs: int = 1) -> None:
         self.t_rows: List["TransactionRow"] = []
         self.success_cnt = 0
         self.failure_cnt = 0
+        self.jobs = jobs
 
     def import_excel_xlsx(self, filename: str) -> None:
+        # pylint: disable-next=import-outside-toplevel
+        from .xlsx_reader import XlsxReaderError, XlsxWorkbook
+
+        try:
+            workbook = XlsxWorkbook(filename)
+        except XlsxReaderError:
+            self.import_excel_xlsx_openpyxl(filename)
+            return
+
+        print(f"{Fore.WHITE}Excel file: {Fore.YELLOW}{filename}")
+
+        with workbook:
+            for worksheet in workbook.worksheets():
+                self.import_worksheet_xlsx(
+                    filename, worksheet.title, worksheet.rows_with_font_colors(), worksheet.max_row
+                )
+
+    def import_excel_xlsx_openpyxl(self, filename: str) -> None:
+        import openpyxl  # pylint: disable=import-outside-toplevel
+
         warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
         workbook = openpyxl.load_workbook(
             filename=filename,
@@ -48,52 +98,68 @@ class ImportRecords:
                 if dimensions == "A1:A1" or dimensions.endswith("1048576"):
                     worksheet.reset_dimensions()
 
-            if worksheet.title.startswith("--"):
-                print(f"{Fore.GREEN}skipping '{worksheet.title}' worksheet")
-                continue
-
-            if config.debug:
-                print(f"{Fore.CYAN}importing '{worksheet.title}' rows")
-
-            for row_num, worksheet_row in enumerate(
-                tqdm(
-                    worksheet.rows,
-                    total=worksheet.max_row,
-                    unit=" row",
-                    desc=f"{Fore.CYAN}importing '{worksheet.title}' rows{Fore.GREEN}",
-                    disable=disable_tqdm(),
-                )
-            ):
-                if row_num == 0:
-                    # Skip headers
-                    continue
-
-                row = [self.convert_cell_xlsx(cell) for cell in worksheet_row]
+            # Font colours are only needed if the hidden tx_raw columns are missing
+            header = next(worksheet.iter_rows(max_row=1, values_only=True), ())
+            font_colors = self.get_tx_raw_col([str(value) for value in header]) is None
 
-                t_row = TransactionRow(
-                    row[: len(TransactionRow.HEADER)], row_num + 1, filename, worksheet.title
-                )
+            self.import_worksheet_xlsx(
+                filename,
+                worksheet.title,
+                (
+                    self.convert_row_xlsx(worksheet_row, font_colors)
+                    for worksheet_row in worksheet.rows
+                ),
+                worksheet.max_row,
+            )
 
-                try:
-                    t_row.parse()
-                except TransactionParserError as e:
-                    t_row.failure = e
-                else:
-                    t_row.tx_raw = self.get_tx_raw_xlsx(worksheet_row)
+        workbook.close()
+        del workbook
 
-                if config.debug or t_row.failure:
-                    bt_tqdm_write(f"{Fore.YELLOW}import: {t_row}")
+    def import_worksheet_xlsx(
+        self,
+        filename: str,
+        worksheet_title: str,
+        worksheet_rows: Iterator["XlsxRow"],
+        max_row: Optional[int],
+    ) -> None:
+        if worksheet_title.startswith("--"):
+            print(f"{Fore.GREEN}skipping '{worksheet_title}' worksheet")
+            return
 
-                if t_row.failure:
-                    bt_tqdm_write(f"{ERROR} {t_row.failure}")
+        if config.debug:
+            print(f"{Fore.CYAN}importing '{worksheet_title}' rows")
 
-                self.t_rows.append(t_row)
-                self.update_cnts(t_row)
+        worksheet_rows = iter(
+            tqdm(
+                worksheet_rows,
+                total=max_row,
+                unit=" row",
+                desc=f"{Fore.CYAN}importing '{worksheet_title}' rows{Fore.GREEN}",
+                disable=disable_tqdm(),
+            )
+        )
 
-        workbook.close()
-        del workbook
+        # Skip headers
+        header, _ = next(worksheet_rows, ([], []))
+        tx_raw_col = self.get_tx_raw_col(header)
+
+        self.add_rows(
+            (
+                TransactionRow(
+                    row[: len(TransactionRow.HEADER)], row_num, filename, worksheet_title
+                ),
+                (
+                    self.get_tx_raw_hidden_xlsx(row, tx_raw_col)
+                    if tx_raw_col is not None
+                    else self.get_tx_raw_xlsx(row, font_colors)
+                ),
+            )
+            for row_num, (row, font_colors) in enumerate(worksheet_rows, start=2)
+        )
 
     def import_excel_xls(self, filename: str) -> None:
+        import xlrd  # pylint: disable=import-outside-toplevel
+
         workbook = xlrd.open_workbook(filename)
         print(f"{Fore.WHITE}Excel file: {Fore.YELLOW}{filename}")
 
@@ -105,62 +171,88 @@ class ImportRecords:
             if config.debug:
                 print(f"{Fore.CYAN}importing '{worksheet.name}' rows")
 
-            for row_num in trange(
-                0,
-                worksheet.nrows,
-                unit=" row",
-                desc=f"{Fore.CYAN}importing '{worksheet.name}' rows{Fore.GREEN}",
-                disable=disable_tqdm(),
-            ):
-                if row_num == 0:
-                    # Skip headers
-                    continue
-
-                row = [
-                    self.convert_cell_xls(worksheet.cell(row_num, cell_num), workbook)
-                    for cell_num in range(0, worksheet.ncols)
-                ]
-
-                t_row = TransactionRow(
-                    row[: len(TransactionRow.HEADER)], row_num + 1, filename, worksheet.name
+            self.add_rows(
+                (
+                    TransactionRow(
+                        [
+                            self.convert_cell_xls(worksheet.cell(row_num, cell_num), workbook)
+                            for cell_num in range(0, worksheet.ncols)
+                        ][: len(TransactionRow.HEADER)],
+                        row_num + 1,
+                        filename,
+                        worksheet.name,
+                    ),
+                    None,
                 )
-
-                try:
-                    t_row.parse()
-                except TransactionParserError as e:
-                    t_row.failure = e
-
-                if config.debug or t_row.failure:
-                    bt_tqdm_write(f"{Fore.YELLOW}import: {t_row}")
-
-                if t_row.failure:
-                    bt_tqdm_write(f"{ERROR} {t_row.failure}")
-
-                self.t_rows.append(t_row)
-                self.update_cnts(t_row)
+                for row_num in trange(
+                    1,  # Skip headers
+                    worksheet.nrows,
+                    unit=" row",
+                    desc=f"{Fore.CYAN}importing '{worksheet.name}' rows{Fore.GREEN}",
+                    disable=disable_tqdm(),
+                )
+            )
 
         workbook.release_resources()
         del workbook
 
     @staticmethod
-    def convert_cell_xlsx(cell: Union[Cell, MergedCell]) -> str:
+    def convert_cell_xlsx(cell: Union["Cell", "MergedCell"]) -> str:
         if cell.value is None:
             return ""
         return str(cell.value)
 
+    @staticmethod
+    def convert_row_xlsx(
+        worksheet_row: Tuple[Union["Cell", "MergedCell"], ...], font_colors_required: bool = True
+    ) -> "XlsxRow":
+        row = []
+        font_colors: List[Optional[str]] = []
+
+        for cell in worksheet_row:
+            row.append(ImportRecords.convert_cell_xlsx(cell))
+            if (
+                font_colors_required
+                and cell.value
+                and cell.font.color
+                and cell.font.color.type == "rgb"
+            ):
+                font_colors.append(cell.font.color.rgb)
+            else:
+                font_colors.append(None)
+
+        return row, font_colors
+
     def get_tx_raw_xlsx(
-        self, worksheet_row: Tuple[Union[Cell, MergedCell], ...]
+        self, row: List[str], font_colors: List[Optional[str]]
     ) -> Optional["TxRaw"]:
         tx_hash = tx_src = tx_dest = ""
 
-        for cell in worksheet_row[len(TransactionRow.HEADER) :]:
-            if cell.value and cell.font.color and cell.font.color.type == "rgb":
-                if cell.font.color.rgb == f"FF{FONT_COLOR_TX_HASH}":
-                    tx_hash = self.get_tx_component(str(cell.value))
-                elif cell.font.color.rgb == f"FF{FONT_COLOR_TX_SRC}":
-                    tx_src = self.get_tx_component(str(cell.value))
-                elif cell.font.color.rgb == f"FF{FONT_COLOR_TX_DEST}":
-                    tx_dest = self.get_tx_component(str(cell.value))
+        for cell_str, font_color in list(zip(row, font_colors))[len(TransactionRow.HEADER) :]:
+            if cell_str and font_color:
+                if font_color == f"FF{FONT_COLOR_TX_HASH}":
+                    tx_hash = self.get_tx_component(cell_str)
+                elif font_color == f"FF{FONT_COLOR_TX_SRC}":
+                    tx_src = self.get_tx_component(cell_str)
+                elif font_color == f"FF{FONT_COLOR_TX_DEST}":
+                    tx_dest = self.get_tx_component(cell_str)
+
+        if any((tx_hash, tx_src, tx_dest)):
+            return TxRaw(tx_hash, tx_src, tx_dest)
+        return None
+
+    @staticmethod
+    def get_tx_raw_col(header: List[str]) -> Optional[int]:
+        # Worksheets created by the conversion tool have hidden tx_raw columns
+        for col_num in range(len(TransactionRow.HEADER), len(header) - len(TX_RAW_HEADER) + 1):
+            if header[col_num : col_num + len(TX_RAW_HEADER)] == TX_RAW_HEADER:
+                return col_num
+        return None
+
+    def get_tx_raw_hidden_xlsx(self, row: List[str], tx_raw_col: int) -> Optional["TxRaw"]:
+        cells = row[tx_raw_col : tx_raw_col + len(TX_RAW_HEADER)]
+        cells += [""] * (len(TX_RAW_HEADER) - len(cells))
+        tx_hash, tx_src, tx_dest = (self.get_tx_component(cell_str) for cell_str in cells)
 
         if any((tx_hash, tx_src, tx_dest)):
             return TxRaw(tx_hash, tx_src, tx_dest)
@@ -176,7 +268,9 @@ class ImportRecords:
         return cell_str
 
     @staticmethod
-    def convert_cell_xls(cell: xlrd.sheet.Cell, workbook: xlrd.Book) -> str:
+    def convert_cell_xls(cell: "xlrd.sheet.Cell", workbook: "xlrd.Book") -> str:
+        import xlrd  # pylint: disable=import-outside-toplevel
+
         if cell.ctype == xlrd.XL_CELL_DATE:
             dt = xlrd.xldate.xldate_as_datetime(cast(float, cell.value), workbook.datemode)
             if dt.microsecond:
@@ -202,30 +296,82 @@ class ImportRecords:
 
         reader = csv.reader(import_file)
 
-        for row in tqdm(
-            reader,
-            unit=" row",
-            desc=f"{Fore.CYAN}importing{Fore.GREEN}",
-            disable=disable_tqdm(),
-        ):
-            if reader.line_num == 1:
-                # Skip headers
-                continue
-
-            t_row = TransactionRow(row[: len(TransactionRow.HEADER)], reader.line_num, filename)
-            try:
-                t_row.parse()
-            except TransactionParserError as e:
-                t_row.failure = e
-
-            if config.debug or t_row.failure:
-                bt_tqdm_write(f"{Fore.YELLOW}import: {t_row}")
-
-            if t_row.failure:
-                bt_tqdm_write(f"{ERROR} {t_row.failure}")
+        self.add_rows(
+            (TransactionRow(row[: len(TransactionRow.HEADER)], reader.line_num, filename), None)
+            for row in tqdm(
+                reader,
+                unit=" row",
+                desc=f"{Fore.CYAN}importing{Fore.GREEN}",
+                disable=disable_tqdm(),
+            )
+            if reader.line_num != 1  # Skip headers
+        )
 
-            self.t_rows.append(t_row)
-            self.update_cnts(t_row)
+    def add_rows(self, pending_rows: Iterable[PendingRow]) -> None:
+        if self.jobs <= 1:
+            for t_row, tx_raw in pending_rows:
+                try:
+                    parse_result: ParseResult = t_row.validate()
+                except TransactionParserError as e:
+                    parse_result = e
+
+                self.add_row(t_row, tx_raw, parse_result)
+            return
+
+        # Rows are validated in chunks by worker processes, the records are then built by the
+        # parent in the original row order, so the result is the same as a serial import
+        with ProcessPoolExecutor(
+            max_workers=self.jobs,
+            initializer=_init_worker,
+            initargs=(config.debug, config.config, config.ccy),
+        ) as executor:
+            pending: Deque[Tuple[List[PendingRow], "Future[List[ParseResult]]"]] = deque()
+            chunk: List[PendingRow] = []
+
+            for pending_row in pending_rows:
+                chunk.append(pending_row)
+                if len(chunk) == self.CHUNK_ROWS:
+                    pending.append((chunk, executor.submit(_validate_rows, _rows(chunk))))
+                    chunk = []
+
+                    # Limit how many rows are held in memory waiting to be added
+                    if len(pending) > self.jobs * 2:
+                        self._add_chunk(*pending.popleft())
+
+            if chunk:
+                pending.append((chunk, executor.submit(_validate_rows, _rows(chunk))))
+
+            while pending:
+                self._add_chunk(*pending.popleft())
+
+    def _add_chunk(
+        self, chunk: List[PendingRow], parse_results: "Future[List[ParseResult]]"
+    ) -> None:
+        for (t_row, tx_raw), parse_result in zip(chunk, parse_results.result()):
+            self.add_row(t_row, tx_raw, parse_result)
+
+    def add_row(
+        self,
+        t_row: TransactionRow,
+        tx_raw: Optional[TxRaw],
+        parse_result: ParseResult,
+    ) -> None:
+        if isinstance(parse_result, TransactionParserError):
+            t_row.failure = parse_result
+        elif parse_result:
+            t_row.build(parse_result)
+
+        if not t_row.failure:
+            t_row.tx_raw = tx_raw
+
+        if config.debug or t_row.failure:
+            bt_tqdm_write(f"{Fore.YELLOW}import: {t_row}")
+
+        if t_row.failure:
+            bt_tqdm_write(f"{ERROR} {t_row.failure}")
+
+        self.t_rows.append(t_row)
+        self.update_cnts(t_row)
 
     def update_cnts(self, t_row: "TransactionRow") -> None:
         if t_row.failure is not None:
@@ -245,3 +391,25 @@ class ImportRecords:
                 print(f"{Fore.YELLOW}import: {t_row}")
 
         return transaction_records
+
+
+def _init_worker(debug: bool, config_dict: Dict[str, Any], ccy: str) -> None:
+    config.debug = debug
+    config.config.update(config_dict)
+    config.ccy = ccy
+
+
+def _rows(chunk: List[PendingRow]) -> List[List[str]]:
+    return [t_row.row for t_row, _ in chunk]
+
+
+def _validate_rows(rows: List[List[str]]) -> List[ParseResult]:
+    # Runs in a worker process, only the validated fields are returned to the parent
+    parse_results: List[ParseResult] = []
+    for row in rows:
+        try:
+            parse_results.append(TransactionRow(row, 0).validate())
+        except TransactionParserError as e:
+            parse_results.append(e)
+
+    return parse_results
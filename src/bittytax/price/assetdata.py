@@ -3,7 +3,7 @@
 
 import os
 from decimal import Decimal
-from typing import List, Optional, cast
+from typing import Dict, List, Optional, cast
 
 from colorama import Fore
 from tqdm import tqdm
@@ -22,7 +22,8 @@ from ..bt_types import (
 from ..config import config
 from ..constants import CACHE_DIR
 from ..utils import disable_tqdm
-from .datasource import DataSourceBase
+from .assetindex import AssetIndex
+from .datasource import DataSourceBase, DsSymbolToAssetData
 from .exceptions import UnexpectedDataSourceError
 
 
@@ -75,50 +76,80 @@ class AssetData:
         for ds in self.data_sources.values():
             ds.progress_bar = None
 
+    @classmethod
+    def list_assets(
+        cls,
+        req_symbol: AssetSymbol,
+        req_data_source: str,
+        search_terms: Optional[List[str]],
+        no_cache: bool = False,
+    ) -> List[AsRecord]:
+        if not req_data_source or req_data_source == "ALL":
+            data_sources_required = None
+        else:
+            data_sources_required = [req_data_source]
+
+        # The data sources are only initialised if the asset index is out of date
+        asset_index = None if no_cache else AssetIndex.load(data_sources_required)
+        if asset_index is None:
+            return cls(no_cache, data_sources_required).get_assets(
+                req_symbol, req_data_source, search_terms
+            )
+        return cls.search_assets(asset_index, req_symbol, req_data_source, search_terms)
+
     def get_assets(
-        self, req_symbol: AssetSymbol, req_data_source: str, search_terms: str
+        self, req_symbol: AssetSymbol, req_data_source: str, search_terms: Optional[List[str]]
+    ) -> List[AsRecord]:
+        return self.search_assets(
+            AssetIndex.build(self.data_sources, self.no_cache),
+            req_symbol,
+            req_data_source,
+            search_terms,
+        )
+
+    @classmethod
+    def search_assets(
+        cls,
+        asset_index: AssetIndex,
+        req_symbol: AssetSymbol,
+        req_data_source: str,
+        search_terms: Optional[List[str]],
     ) -> List[AsRecord]:
         if not req_data_source or req_data_source == "ALL":
-            data_sources = list(self.data_sources.keys())
+            data_sources = list(asset_index.ds_indexes.keys())
         else:
             data_sources = [req_data_source]
 
+        ds_assets = {k: v.assets for k, v in asset_index.ds_indexes.items()}
         asset_data = []
         for ds in data_sources:
-            if not req_symbol:
-                assets = self.data_sources[ds].get_list()
-            else:
-                assets = {}
-                assets[req_symbol] = self.data_sources[ds].get_list().get(req_symbol, [])
-            for symbol in assets:
-                for asset_id in assets[symbol]:
-                    if search_terms:
-                        match = self.do_search(
-                            symbol, asset_id["name"], search_terms, asset_id["asset_id"]
-                        )
-                    else:
-                        match = True
-
-                    if match:
-                        asset_data.append(
-                            AsRecord(
-                                symbol=symbol,
-                                name=asset_id["name"],
-                                data_source=self.data_sources[ds].name(),
-                                asset_id=asset_id["asset_id"],
-                                priority=(
-                                    self._is_priority(symbol, asset_id["asset_id"], ds)
-                                    if (not req_data_source or req_data_source == "ALL")
-                                    and not search_terms
-                                    else False
-                                ),
-                                deprecated=self.data_sources[ds].DEPRECATED,
-                            )
-                        )
+            ds_index = asset_index.ds_indexes[ds]
+            for symbol, name, asset_id in ds_index.find(req_symbol, search_terms or []):
+                asset_data.append(
+                    AsRecord(
+                        symbol=symbol,
+                        name=name,
+                        data_source=ds_index.name,
+                        asset_id=asset_id,
+                        priority=(
+                            cls._is_priority(ds_assets, symbol, asset_id, ds)
+                            if (not req_data_source or req_data_source == "ALL")
+                            and not search_terms
+                            else False
+                        ),
+                        deprecated=ds_index.deprecated,
+                    )
+                )
 
         return sorted(asset_data, key=lambda a: a["symbol"].lower())
 
-    def _is_priority(self, symbol: AssetSymbol, asset_id: AssetId, data_source: str) -> bool:
+    @staticmethod
+    def _is_priority(
+        ds_assets: Dict[str, Dict[AssetSymbol, DsSymbolToAssetData]],
+        symbol: AssetSymbol,
+        asset_id: AssetId,
+        data_source: str,
+    ) -> bool:
         if symbol in config.data_source_select:
             ds_priority = [ds.split(":")[0] for ds in config.data_source_select[symbol]]
         elif symbol in config.fiat_list:
@@ -127,11 +158,11 @@ class AssetData:
             ds_priority = config.data_source_crypto
 
         for ds in ds_priority:
-            if ds.upper() in self.data_sources:
-                if symbol in self.data_sources[ds.upper()].assets:
+            if ds.upper() in ds_assets:
+                if symbol in ds_assets[ds.upper()]:
                     if (
                         ds.upper() == data_source.upper()
-                        and self.data_sources[ds.upper()].assets[symbol].get("asset_id") == asset_id
+                        and ds_assets[ds.upper()][symbol].get("asset_id") == asset_id
                     ):
                         return True
                     return False
@@ -139,8 +170,11 @@ class AssetData:
                 raise UnexpectedDataSourceError(ds, DataSourceBase.datasources_str())
         return False
 
+    def _ds_assets(self) -> Dict[str, Dict[AssetSymbol, DsSymbolToAssetData]]:
+        return {k: v.assets for k, v in self.data_sources.items()}
+
     @staticmethod
-    def do_search(symbol: str, name: str, search_terms: str, asset_id: str = "") -> bool:
+    def do_search(symbol: str, name: str, search_terms: List[str], asset_id: str = "") -> bool:
         for search_term in search_terms:
             if search_term.upper() not in f"{symbol} {name} {asset_id}".upper():
                 return False
@@ -165,7 +199,9 @@ class AssetData:
                 asset_data["symbol"] = req_symbol
                 asset_data["data_source"] = self.data_sources[ds].name()
                 asset_data["priority"] = (
-                    self._is_priority(asset_data["symbol"], asset_data["asset_id"], ds)
+                    self._is_priority(
+                        self._ds_assets(), asset_data["symbol"], asset_data["asset_id"], ds
+                    )
                     if req_data_source == "ALL"
                     else False
                 )
@@ -264,7 +300,9 @@ class AssetData:
                 asset_data["symbol"] = req_symbol
                 asset_data["data_source"] = self.data_sources[ds].name()
                 asset_data["priority"] = (
-                    self._is_priority(asset_data["symbol"], asset_data["asset_id"], ds)
+                    self._is_priority(
+                        self._ds_assets(), asset_data["symbol"], asset_data["asset_id"], ds
+                    )
                     if req_data_source == "ALL"
                     else False
                 )
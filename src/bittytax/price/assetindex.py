@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+# Search index of the assets of each data source, saved so they can be listed and searched
+#  without initialising the data sources
+# (c) Nano Nano Ltd 2026
+
+import json
+import os
+import pickle
+import time
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Type
+
+from colorama import Fore
+
+from ..bt_types import AssetId, AssetName, AssetSymbol, DataSourceName
+from ..config import config
+from ..constants import CACHE_DIR
+from ..version import __version__
+from .datasource import DataSourceBase, DsSymbolToAssetData
+
+ASSET_INDEX_DIR = os.path.join(CACHE_DIR, "asset_index")
+NGRAM_SIZE = 3
+INDEX_FORMAT = 2
+
+IndexEntry = Tuple[AssetSymbol, AssetName, AssetId]
+CacheSignature = Tuple[Optional[float], ...]
+
+
+@dataclass
+class DsIndex:  # pylint: disable=too-many-instance-attributes
+    name: DataSourceName
+    deprecated: bool
+    signature: CacheSignature
+    assets: Dict[AssetSymbol, DsSymbolToAssetData]
+    # Kept as lists of strings, as they are much faster to save and load than lists of tuples
+    symbols: List[AssetSymbol] = field(default_factory=list)
+    names: List[AssetName] = field(default_factory=list)
+    asset_ids: List[AssetId] = field(default_factory=list)
+    texts: List[str] = field(default_factory=list)
+    # The entries of each symbol are together, so only the first is kept
+    symbol_starts: Dict[AssetSymbol, int] = field(default_factory=dict)
+    ngrams: Dict[str, bytes] = field(default_factory=dict)
+    # A data source without an ids or assets cache has nothing else to expire its index
+    built: float = field(default_factory=time.time)
+
+    @classmethod
+    def build(cls, data_source: DataSourceBase) -> "DsIndex":
+        ds_index = cls(
+            data_source.name(),
+            data_source.DEPRECATED,
+            cache_signature(data_source.name()),
+            dict(data_source.assets),
+        )
+        ngrams: Dict[str, List[int]] = {}
+        for symbol, asset_ids in data_source.get_list().items():
+            ds_index.symbol_starts[symbol] = len(ds_index.symbols)
+            for asset_id in asset_ids:
+                entry = len(ds_index.symbols)
+                ds_index.symbols.append(symbol)
+                ds_index.names.append(asset_id["name"])
+                ds_index.asset_ids.append(asset_id["asset_id"])
+
+                # The same text that is searched without an index
+                text = f'{symbol} {asset_id["name"]} {asset_id["asset_id"]}'.upper()
+                ds_index.texts.append(text)
+                for ngram in _ngrams(text):
+                    ngrams.setdefault(ngram, []).append(entry)
+
+        # Postings are stored as packed arrays, as they are much faster to save and load
+        ds_index.ngrams = {k: array("I", v).tobytes() for k, v in ngrams.items()}
+        return ds_index
+
+    def find(self, req_symbol: AssetSymbol, search_terms: Sequence[str]) -> List[IndexEntry]:
+        search_terms = [search_term.upper() for search_term in search_terms]
+        candidates: Optional[Set[int]] = None
+        if req_symbol:
+            entry = self.symbol_starts.get(req_symbol, len(self.symbols))
+            candidates = set()
+            while entry < len(self.symbols) and self.symbols[entry] == req_symbol:
+                candidates.add(entry)
+                entry += 1
+
+        # Only entries which contain every n-gram of a search term can match it
+        for search_term in search_terms:
+            for ngram in _ngrams(search_term):
+                postings = set(array("I", self.ngrams.get(ngram, b"")))
+                candidates = postings if candidates is None else candidates & postings
+
+        entries: Sequence[int] = (
+            range(len(self.texts)) if candidates is None else sorted(candidates)
+        )
+        for search_term in search_terms:
+            entries = [entry for entry in entries if search_term in self.texts[entry]]
+
+        return [
+            (self.symbols[entry], self.names[entry], self.asset_ids[entry]) for entry in entries
+        ]
+
+
+class AssetIndex:
+    def __init__(self) -> None:
+        self.ds_indexes: Dict[str, DsIndex] = {}
+
+    @classmethod
+    def load(cls, data_sources_required: Optional[List[str]] = None) -> Optional["AssetIndex"]:
+        # Only returned if it's up to date for every data source required, so the data sources
+        #  don't need to be initialised
+        asset_index = cls()
+        for ds_class in DataSourceBase.__subclasses__():
+            ds_key = ds_class.__name__.upper()
+            if data_sources_required is not None and ds_key not in {
+                ds.upper() for ds in data_sources_required
+            }:
+                continue
+
+            ds_index = _load_ds_index(DataSourceName(ds_class.__name__))
+            if ds_index is None or not _is_current(ds_index, ds_class):
+                if config.debug:
+                    print(f"{Fore.YELLOW}price: {ds_class.__name__} asset index out of date")
+                return None
+            asset_index.ds_indexes[ds_key] = ds_index
+        return asset_index
+
+    @classmethod
+    def build(cls, data_sources: Dict[str, DataSourceBase], no_cache: bool = False) -> "AssetIndex":
+        # A data source is only re-indexed if its ids have changed since its index was saved
+        asset_index = cls()
+        for ds_key, data_source in data_sources.items():
+            ds_index = None if no_cache else _load_ds_index(data_source.name())
+            if (
+                ds_index is None
+                or ds_index.signature != cache_signature(data_source.name())
+                or _is_expired(ds_index.built, data_source.IDS_TTL)
+            ):
+                ds_index = DsIndex.build(data_source)
+                _save_ds_index(ds_index)
+
+                if config.debug:
+                    print(f"{Fore.YELLOW}price: {data_source.name()} asset index built")
+            asset_index.ds_indexes[ds_key] = ds_index
+        return asset_index
+
+
+def cache_signature(ds_name: DataSourceName) -> CacheSignature:
+    # The assets of a data source are from its ids and assets caches
+    signature: List[Optional[float]] = []
+    for suffix in ("_ids.json", "_assets.json"):
+        filename = os.path.join(CACHE_DIR, ds_name + suffix)
+        signature.append(os.path.getmtime(filename) if os.path.exists(filename) else None)
+    return tuple(signature)
+
+
+def _is_current(ds_index: DsIndex, ds_class: Type[DataSourceBase]) -> bool:
+    if ds_index.signature != cache_signature(ds_index.name):
+        return False
+
+    # An expired cache is refreshed when the data source is initialised
+    for mtime in ds_index.signature + (ds_index.built,):
+        if mtime is not None and _is_expired(mtime, ds_class.IDS_TTL):
+            return False
+    return True
+
+
+def _is_expired(mtime: float, ttl: timedelta) -> bool:
+    return datetime.now() - datetime.fromtimestamp(mtime) > ttl
+
+
+def _ngrams(text: str) -> Set[str]:
+    return {text[i : i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def _index_key() -> str:
+    # Assets can also be added by the config
+    return json.dumps(
+        {
+            "version": __version__,
+            "format": INDEX_FORMAT,
+            "data_source_select": config.data_source_select,
+        },
+        sort_keys=True,
+    )
+
+
+def _load_ds_index(ds_name: DataSourceName) -> Optional[DsIndex]:
+    filename = os.path.join(ASSET_INDEX_DIR, f"{ds_name}.pickle")
+    try:
+        with open(filename, "rb") as index_file:
+            index_key, ds_index = pickle.load(index_file)
+    except FileNotFoundError:
+        return None
+    except (IOError, EOFError, ValueError, pickle.UnpicklingError, AttributeError, ImportError):
+        if config.debug:
+            print(f"{Fore.YELLOW}price: {ds_name} asset index could not be read")
+        return None
+
+    if index_key != _index_key() or not isinstance(ds_index, DsIndex):
+        return None
+    return ds_index
+
+
+def _save_ds_index(ds_index: DsIndex) -> None:
+    filename = os.path.join(ASSET_INDEX_DIR, f"{ds_index.name}.pickle")
+    try:
+        if not os.path.exists(ASSET_INDEX_DIR):
+            os.makedirs(ASSET_INDEX_DIR, exist_ok=True)
+
+        # Written to a temporary file first, so other processes never read a partial index
+        with open(f"{filename}.{os.getpid()}.tmp", "wb") as index_file:
+            pickle.dump((_index_key(), ds_index), index_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(f"{filename}.{os.getpid()}.tmp", filename)
+    except IOError:
+        pass
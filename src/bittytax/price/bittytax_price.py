@@ -3,34 +3,36 @@
 
 import argparse
 import platform
-import re
 import sys
 from decimal import Decimal, InvalidOperation
 from typing import List, Optional
 
 import colorama
-import dateutil.parser
 from colorama import Fore
 
 from ..bt_types import AssetSymbol, Timestamp
 from ..config import config
-from ..constants import ERROR, TZ_UTC, WARNING
+from ..constants import ERROR, WARNING
 from ..utils import is_compiled
 from ..version import __version__
 from .assetdata import AsPriceRecord, AsRecord, AssetData
 from .datasource import DataSourceBase
 from .exceptions import DataSourceApiError, DataSourceError
+from .pricebatch import parse_date, price_queries, read_queries, write_csv, write_json
 from .valueasset import ValueAsset
+from .warmcache import find_records, records_demand, warm_cache
 
 CMD_LATEST = "latest"
 CMD_HISTORY = "historic"
 CMD_LIST = "list"
+CMD_BATCH = "batch"
+CMD_WARM = "warm"
 
 if sys.stdout.encoding != "UTF-8":
     sys.stdout.reconfigure(encoding="utf-8")  # type: ignore[union-attr]
 
 
-def main() -> None:
+def main() -> None:  # pylint: disable=too-many-locals
     colorama.init()
     parser = argparse.ArgumentParser()
 
@@ -168,10 +170,85 @@ def main() -> None:
         help="bypass data cache",
     )
 
+    parser_batch = subparsers.add_parser(
+        CMD_BATCH,
+        help="get the prices of a file of assets",
+        description=f"Get the prices (in {config.ccy}) of each asset, date and quantity in a CSV "
+        "file, which has a header row of: Asset, Date, Quantity. If the date is blank, the "
+        "latest price is used. The same data source(s) as 'bittytax' are used.",
+    )
+    parser_batch.add_argument(
+        "filename",
+        type=str,
+        help="filename of the CSV file of assets to price",
+    )
+    parser_batch.add_argument(
+        "-o",
+        dest="output_filename",
+        type=str,
+        help="specify the output filename for the prices, default: standard output",
+    )
+    parser_batch.add_argument(
+        "--format",
+        choices=["csv", "json"],
+        default="csv",
+        type=str.lower,
+        dest="output_format",
+        help="specify the format of the prices, CSV or JSON lines, default: csv",
+    )
+    parser_batch.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=4,
+        metavar="N",
+        help="number of assets to price at the same time, default: 4",
+    )
+    parser_batch.add_argument(
+        "-ccy",
+        choices=config.FIAT_LIST,
+        metavar="{" + ", ".join(config.FIAT_LIST) + "}",
+        type=str.upper,
+        default=None,
+        help="override the local currency for these queries",
+    )
+    parser_batch.add_argument(
+        "-nc",
+        "--nocache",
+        dest="no_cache",
+        action="store_true",
+        help="bypass data cache",
+    )
+    parser_batch.add_argument("-d", "--debug", action="store_true", help="enable debug logging")
+
+    parser_warm = subparsers.add_parser(
+        CMD_WARM,
+        help="fill the price cache for transaction records",
+        description="Fetch every historic price which 'bittytax' would need for the transaction "
+        "records, so they are already in the cache when the tax report is run. A folder can be "
+        "given to use all the Excel and CSV files within it.",
+    )
+    parser_warm.add_argument(
+        "paths",
+        type=str,
+        nargs="+",
+        metavar="filename",
+        help="filename of transaction records, or a folder of them",
+    )
+    parser_warm.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=4,
+        metavar="N",
+        help="number of assets to price at the same time, default: 4",
+    )
+    parser_warm.add_argument("-d", "--debug", action="store_true", help="enable debug logging")
+
     args = parser.parse_args()
     config.debug = args.debug
 
-    if args.command in (CMD_LATEST, CMD_HISTORY) and args.ccy:
+    if args.command in (CMD_LATEST, CMD_HISTORY, CMD_BATCH) and args.ccy:
         config.ccy = args.ccy
 
     if config.debug:
@@ -273,12 +350,9 @@ def main() -> None:
     elif args.command == CMD_LIST:
         symbol = args.asset
         try:
-            ds_required = (
-                None if not args.datasource or args.datasource == "ALL" else [args.datasource]
+            asset_list = AssetData.list_assets(
+                symbol, args.datasource, args.search_terms, no_cache=args.no_cache
             )
-            asset_list = AssetData(
-                no_cache=args.no_cache, data_sources_required=ds_required
-            ).get_assets(symbol, args.datasource, args.search_terms)
         except DataSourceApiError as e:
             parser.exit(message=f"{ERROR} {e} - please wait and try again\n")
         except DataSourceError as e:
@@ -291,6 +365,62 @@ def main() -> None:
             parser.exit(message="No results found\n")
 
         output_assets(asset_list)
+    elif args.command == CMD_BATCH:
+        do_batch(parser, args)
+    elif args.command == CMD_WARM:
+        do_warm(parser, args)
+
+
+def do_batch(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    if args.jobs < 1:
+        parser.error("the [--jobs] option must be at least 1")
+
+    try:
+        with open(args.filename, "r", encoding="utf-8-sig", newline="") as query_file:
+            queries = read_queries(query_file)
+    except IOError:
+        parser.exit(message=f"{ERROR} File could not be read: {args.filename}\n")
+    except ValueError as e:
+        parser.exit(message=f"{ERROR} File is not valid: {args.filename}, {e}\n")
+
+    # The data sources are only initialised once for all of the queries
+    value_asset = ValueAsset(no_cache=args.no_cache)
+    results = price_queries(queries, value_asset, args.jobs)
+    write = write_json if args.output_format == "json" else write_csv
+
+    if args.output_filename:
+        with open(args.output_filename, "w", encoding="utf-8", newline="") as output_file:
+            write(results, output_file)
+
+        print(f"{Fore.WHITE}prices created: {Fore.YELLOW}{args.output_filename}")
+    else:
+        write(results, sys.stdout)
+
+
+def do_warm(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    if args.jobs < 1:
+        parser.error("the [--jobs] option must be at least 1")
+
+    filenames = find_records(args.paths)
+    if not filenames:
+        parser.exit(message=f"{WARNING} No transaction records found\n")
+
+    demand = records_demand(filenames)
+    coverage = warm_cache(demand, ValueAsset(leave_bar=True), args.jobs)
+
+    for asset, asset_coverage in sorted(coverage.items()):
+        colour = Fore.GREEN if asset_coverage.priced == asset_coverage.needed else Fore.YELLOW
+        print(
+            f"{Fore.WHITE}{asset}: {colour}{asset_coverage.priced} of {asset_coverage.needed} "
+            f"prices ({asset_coverage.priced / asset_coverage.needed:.0%})"
+        )
+
+    missing_cnt = sum(c.needed - c.priced for c in coverage.values())
+    print(
+        f"{Fore.WHITE}price cache {'complete' if missing_cnt <= 0 else 'incomplete'} "
+        f"(files={len(filenames)}, assets={len(coverage)}, prices={len(demand)}, "
+        f"missing={missing_cnt})"
+    )
 
 
 def output_price(symbol: AssetSymbol, price_ccy: Decimal, quantity: Decimal) -> None:
@@ -330,22 +460,10 @@ def output_assets(asset_list: List[AsRecord]) -> None:
 
 
 def validate_date(value: str) -> Timestamp:
-    match = re.match(r"^([0-9]{4}-[0-9]{2}-[0-9]{2})|([0-9]{2}\/[0-9]{2}\/[0-9]{4})$", value)
-
-    if not match:
-        raise argparse.ArgumentTypeError("date format is not valid, use YYYY-MM-DD or DD/MM/YYYY")
-
-    if match.group(1):
-        dayfirst = False
-    else:
-        dayfirst = True
-
     try:
-        date = dateutil.parser.parse(value, dayfirst=dayfirst)
+        return Timestamp(parse_date(value))
     except ValueError as e:
-        raise argparse.ArgumentTypeError("date is not valid") from e
-
-    return Timestamp(date.replace(tzinfo=TZ_UTC))
+        raise argparse.ArgumentTypeError(str(e)) from e
 
 
 def validate_quantity(value: str) -> Decimal:
@@ -11,9 +11,8 @@ import time
 from datetime import datetime, timedelta
 from decimal import Decimal
 from http import HTTPStatus
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
 
-import requests
 from colorama import Fore
 from tqdm import tqdm
 from typing_extensions import TypedDict
@@ -30,10 +29,21 @@ from ..bt_types import (
     TradingPair,
 )
 from ..config import config
-from ..constants import CACHE_DIR, TZ_UTC, WARNING
-from ..utils import disable_tqdm
+from ..constants import (
+    CACHE_DIR,
+    PRICE_RECORD_DIR,
+    PRICE_REPLAY_DIR,
+    PRICE_SERVER_URL,
+    TZ_UTC,
+    WARNING,
+)
+from ..utils import disable_tqdm, file_lock
 from ..version import __version__
 from .exceptions import DataSourceApiError, UnexpectedDataSourceAssetIdError
+from .replay import load_response, request_url, save_response
+
+if TYPE_CHECKING:
+    import requests
 
 
 class DsSymbolToAssetData(TypedDict):  # pylint: disable=too-few-public-methods
@@ -51,6 +61,9 @@ class DsPriceData(TypedDict):  # pylint: disable=too-few-public-methods
     url: SourceUrl
 
 
+DsPrices = Dict[TradingPair, Dict[AssetId, Dict[Date, DsPriceData]]]
+
+
 class _CoinGeckoIdData(TypedDict):
     symbol: AssetSymbol
     name: AssetName
@@ -63,7 +76,7 @@ class _CoinPaprikaIdData(TypedDict):
     rank: int
 
 
-class DataSourceBase:
+class DataSourceBase:  # pylint: disable=too-many-instance-attributes
     DEPRECATED = False
     USER_AGENT = (
         f"BittyTax/{__version__} Python/{platform.python_version()} "
@@ -85,20 +98,34 @@ class DataSourceBase:
         self.headers = {"User-Agent": self.USER_AGENT}
         self.assets: Dict[AssetSymbol, DsSymbolToAssetData] = {}
         self.ids: Dict[AssetId, DsIdToAssetData] = {}
-        self.progress_bar: Optional[tqdm] = progress_bar
-        self.prices: Dict[TradingPair, Dict[AssetId, Dict[Date, DsPriceData]]] = {}
+        self.prices: DsPrices = {}
         self._prices_dirty = False
+        self._prices_mtime = 0.0
 
+        # Shared by jobs in different threads, prices are only changed or saved holding the lock
         self.api_lock = threading.Lock()
+        self.prices_lock = threading.RLock()
         self._thread_local = threading.local()
+        self.progress_bar = progress_bar
         self.last_request_time = float(0)
 
-        atexit.register(self._save_prices)
+        atexit.register(self.save_prices)
+
+    @property
+    def progress_bar(self) -> Optional[tqdm]:
+        # Each thread has its own progress bar, so a job only updates its own
+        return getattr(self._thread_local, "progress_bar", None)
+
+    @progress_bar.setter
+    def progress_bar(self, progress_bar: Optional[tqdm]) -> None:
+        self._thread_local.progress_bar = progress_bar
 
     def name(self) -> DataSourceName:
         return DataSourceName(self.__class__.__name__)
 
-    def _get_session(self) -> requests.Session:
+    def _get_session(self) -> "requests.Session":
+        import requests  # pylint: disable=import-outside-toplevel
+
         if not hasattr(self._thread_local, "session"):
             self._thread_local.session = requests.Session()
         return self._thread_local.session
@@ -140,7 +167,7 @@ class DataSourceBase:
         if wait_time > 0:
             if config.debug:
                 print(f"{Fore.YELLOW}price: {self.name()} rate-limit, wait: {wait_time:.2f}s")
-                time.sleep(wait_time)
+            time.sleep(wait_time)
 
         self.last_request_time = time.time()
 
@@ -173,6 +200,20 @@ class DataSourceBase:
         return False, None
 
     def _get_json(self, url: str) -> Any:
+        if PRICE_REPLAY_DIR:
+            try:
+                return load_response(PRICE_REPLAY_DIR, url)
+            except IOError as e:
+                raise DataSourceApiError(self.name(), url, "no recorded response") from e
+
+        json_resp = self._request_json(url)
+        if PRICE_RECORD_DIR:
+            save_response(PRICE_RECORD_DIR, url, json_resp)
+        return json_resp
+
+    def _request_json(self, url: str) -> Any:
+        import requests  # pylint: disable=import-outside-toplevel
+
         with self.api_lock:
             session = self._get_session()
 
@@ -189,7 +230,11 @@ class DataSourceBase:
                             )
                         )
 
-                    response = session.get(url, headers=self.headers, timeout=self.TIME_OUT)
+                    response = session.get(
+                        request_url(PRICE_SERVER_URL, url),
+                        headers=self.headers,
+                        timeout=self.TIME_OUT,
+                    )
 
                     if response.status_code in [
                         HTTPStatus.UNAUTHORIZED,
@@ -268,11 +313,6 @@ class DataSourceBase:
         prices: Dict[Date, DsPriceData],
         timestamp: Timestamp,
     ) -> None:
-        if pair not in self.prices:
-            self.prices[pair] = {}
-        if asset_id not in self.prices[pair]:
-            self.prices[pair][asset_id] = {}
-
         # We are not interested in today's latest price, only the days closing price, also need to
         #  filter any erroneous future dates returned
         prices = {k: v for k, v in prices.items() if k < datetime.now().date()}
@@ -283,8 +323,9 @@ class DataSourceBase:
         if date not in prices and date < datetime.now().date():
             prices[date] = {"price": None, "url": SourceUrl("")}
 
-        self.prices[pair][asset_id].update(prices)
-        self._prices_dirty = True
+        with self.prices_lock:
+            self.prices.setdefault(pair, {}).setdefault(asset_id, {}).update(prices)
+            self._prices_dirty = True
 
     def _load_prices(self) -> None:
         filename = os.path.join(CACHE_DIR, self.name() + ".json")
@@ -292,42 +333,8 @@ class DataSourceBase:
             return
 
         try:
-            with open(filename, "r", encoding="utf-8") as price_cache:
-                json_prices = json.load(price_cache)
-            legacy_format = False
-            for pair, pair_data in json_prices.items():
-                if pair_data and self._is_date_key(next(iter(pair_data))):
-                    # Legacy format
-                    legacy_format = True
-                    symbol = AssetSymbol(pair.split("/")[0])
-                    if symbol in self.assets and self.assets[symbol]["asset_id"]:
-                        # Promote to real asset_id
-                        asset_id = self.assets[symbol]["asset_id"]
-                    else:
-                        # Keep as empty asset_id if no mapping
-                        asset_id = AssetId("")
-
-                    self.prices[TradingPair(pair)] = {
-                        asset_id: {
-                            self.str_to_date(date): {
-                                "price": self.str_to_decimal(price_data["price"]),
-                                "url": price_data["url"],
-                            }
-                            for date, price_data in pair_data.items()
-                        }
-                    }
-                else:
-                    # New format
-                    self.prices[TradingPair(pair)] = {}
-                    for asset_id, asset_entry in pair_data.items():
-                        aid = AssetId(asset_id)
-                        self.prices[TradingPair(pair)][aid] = {
-                            self.str_to_date(date): {
-                                "price": self.str_to_decimal(price_data["price"]),
-                                "url": price_data["url"],
-                            }
-                            for date, price_data in asset_entry.get("prices", {}).items()
-                        }
+            self._prices_mtime = os.path.getmtime(filename)
+            self.prices, legacy_format = self._read_prices(filename)
 
             if legacy_format:
                 backup_filename = filename + ".bak"
@@ -349,32 +356,111 @@ class DataSourceBase:
             self.prices = {}
             self._prices_dirty = True
 
-    def _save_prices(self) -> None:
-        if not self._prices_dirty:
-            return
-        with open(
-            os.path.join(CACHE_DIR, self.name() + ".json"), "w", encoding="utf-8"
-        ) as price_cache:
-            json_prices: Dict[str, Any] = {}
-            for pair, asset_id_dict in self.prices.items():
+    def _read_prices(self, filename: str) -> Tuple[DsPrices, bool]:
+        prices: DsPrices = {}
+        with open(filename, "r", encoding="utf-8") as price_cache:
+            json_prices = json.load(price_cache)
+        legacy_format = False
+        for pair, pair_data in json_prices.items():
+            if pair_data and self._is_date_key(next(iter(pair_data))):
+                # Legacy format
+                legacy_format = True
                 symbol = AssetSymbol(pair.split("/")[0])
-                json_prices[pair] = {}
-                for asset_id, date_dict in asset_id_dict.items():
-                    if asset_id:
-                        name = self.ids[asset_id]["name"] if asset_id in self.ids else ""
-                    else:
-                        name = self.assets[symbol]["name"] if symbol in self.assets else ""
-                    json_prices[pair][asset_id] = {
-                        "name": name,
-                        "prices": {
-                            f"{date:%Y-%m-%d}": {
-                                "price": self.decimal_to_str(price["price"]),
-                                "url": price["url"],
-                            }
-                            for date, price in date_dict.items()
-                        },
+                if symbol in self.assets and self.assets[symbol]["asset_id"]:
+                    # Promote to real asset_id
+                    asset_id = self.assets[symbol]["asset_id"]
+                else:
+                    # Keep as empty asset_id if no mapping
+                    asset_id = AssetId("")
+
+                prices[TradingPair(pair)] = {
+                    asset_id: {
+                        self.str_to_date(date): {
+                            "price": self.str_to_decimal(price_data["price"]),
+                            "url": price_data["url"],
+                        }
+                        for date, price_data in pair_data.items()
                     }
-            json.dump(json_prices, price_cache, indent=4, sort_keys=True)
+                }
+            else:
+                # New format
+                prices[TradingPair(pair)] = {}
+                for asset_id, asset_entry in pair_data.items():
+                    aid = AssetId(asset_id)
+                    prices[TradingPair(pair)][aid] = {
+                        self.str_to_date(date): {
+                            "price": self.str_to_decimal(price_data["price"]),
+                            "url": price_data["url"],
+                        }
+                        for date, price_data in asset_entry.get("prices", {}).items()
+                    }
+        return prices, legacy_format
+
+    def _merge_prices(self, filename: str) -> None:
+        # Prices saved by another process are added, the prices held are kept where both have one
+        try:
+            saved_prices, _ = self._read_prices(filename)
+        except (IOError, ValueError):
+            return
+
+        for pair, asset_id_dict in saved_prices.items():
+            for asset_id, date_dict in asset_id_dict.items():
+                prices = self.prices.setdefault(pair, {}).setdefault(asset_id, {})
+                for date, price in date_dict.items():
+                    prices.setdefault(date, price)
+
+    def save_prices(self) -> None:
+        with self.prices_lock:
+            if self._prices_dirty:
+                self._save_prices()
+
+    def _save_prices(self) -> None:
+        filename = os.path.join(CACHE_DIR, self.name() + ".json")
+        with file_lock(filename):
+            # Prices saved by other processes since they were loaded are merged in first
+            if os.path.exists(filename):
+                self._merge_prices(filename)
+
+            # Written to a temporary file first, so other processes never read a partial cache
+            with open(f"{filename}.{os.getpid()}.tmp", "w", encoding="utf-8") as price_cache:
+                json_prices: Dict[str, Any] = {}
+                for pair, asset_id_dict in self.prices.items():
+                    symbol = AssetSymbol(str(pair).split("/", maxsplit=1)[0])
+                    json_prices[pair] = {}
+                    for asset_id, date_dict in asset_id_dict.items():
+                        if asset_id:
+                            name = self.ids[asset_id]["name"] if asset_id in self.ids else ""
+                        else:
+                            name = self.assets[symbol]["name"] if symbol in self.assets else ""
+                        json_prices[pair][asset_id] = {
+                            "name": name,
+                            "prices": {
+                                f"{date:%Y-%m-%d}": {
+                                    "price": self.decimal_to_str(price["price"]),
+                                    "url": price["url"],
+                                }
+                                for date, price in date_dict.items()
+                            },
+                        }
+                json.dump(json_prices, price_cache, indent=4, sort_keys=True)
+
+            os.replace(f"{filename}.{os.getpid()}.tmp", filename)
+            self._prices_mtime = os.path.getmtime(filename)
+        self._prices_dirty = False
+
+    def refresh_prices(self) -> None:
+        # Pick up prices which have been saved to the cache by another process
+        filename = os.path.join(CACHE_DIR, self.name() + ".json")
+        with self.prices_lock:
+            if not os.path.exists(filename) or os.path.getmtime(filename) == self._prices_mtime:
+                return
+
+            if self._prices_dirty:
+                # Prices which are not saved yet are kept
+                self._prices_mtime = os.path.getmtime(filename)
+                self._merge_prices(filename)
+            else:
+                self._load_prices()
 
     def _load_ids(self) -> Optional[Dict[AssetId, DsIdToAssetData]]:
         if self.no_cache:
@@ -2,6 +2,7 @@
 # (c) Nano Nano Ltd 2020
 
 import os
+from typing import Any, Tuple
 
 from ..config import config
 from ..constants import BITTYTAX_PATH
@@ -13,6 +14,9 @@ class DataSourceError(Exception):
         self.data_source = data_source
         self.value = value
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (self.__class__, (self.data_source, self.value))
+
 
 class UnexpectedDataSourceError(DataSourceError):
     def __str__(self) -> str:
@@ -37,6 +41,9 @@ class DataSourceApiError(Exception):
         self.url = url
         self.reason = reason
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (self.__class__, (self.data_source, self.url, self.reason))
+
     def __str__(self) -> str:
         if self.reason:
             return f"{self.data_source} API request failed ({self.reason})"
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+# Prices a file of queries, sharing the data sources between them
+# (c) Nano Nano Ltd 2026
+
+import contextvars
+import csv
+import datetime
+import json
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+import dateutil.parser
+
+from ..bt_types import AssetSymbol, Date, Timestamp
+from ..config import config
+from ..constants import TZ_UTC
+from .exceptions import DataSourceApiError, DataSourceError
+from .pricedata import PriceDataRecord
+from .valueasset import ValueAsset
+
+OUTPUT_FIELDS = (
+    "asset",
+    "date",
+    "quantity",
+    "price",
+    "value",
+    "currency",
+    "name",
+    "data_source",
+    "error",
+)
+
+AssetPrices = Dict[Optional[Date], Tuple[Optional[PriceDataRecord], str]]
+
+
+@dataclass
+class PriceQuery:
+    asset: AssetSymbol
+    date: Optional[Date] = None
+    quantity: Optional[Decimal] = None
+
+
+def parse_date(value: str) -> datetime.datetime:
+    match = re.match(r"^([0-9]{4}-[0-9]{2}-[0-9]{2})|([0-9]{2}\/[0-9]{2}\/[0-9]{4})$", value)
+
+    if not match:
+        raise ValueError("date format is not valid, use YYYY-MM-DD or DD/MM/YYYY")
+
+    if match.group(1):
+        dayfirst = False
+    else:
+        dayfirst = True
+
+    try:
+        date = dateutil.parser.parse(value, dayfirst=dayfirst)
+    except ValueError as e:
+        raise ValueError("date is not valid") from e
+
+    return date.replace(tzinfo=TZ_UTC)
+
+
+def read_queries(query_file: TextIO) -> List[PriceQuery]:
+    reader = csv.DictReader(query_file)
+    if reader.fieldnames is None or "asset" not in [f.strip().lower() for f in reader.fieldnames]:
+        raise ValueError("header must include the asset, and optionally the date and quantity")
+
+    queries = []
+    for row in reader:
+        fields = {k.strip().lower(): v.strip() for k, v in row.items() if k and v}
+        if not fields.get("asset"):
+            raise ValueError(f"row {reader.line_num} is missing the asset")
+
+        try:
+            date = Date(parse_date(fields["date"]).date()) if fields.get("date") else None
+        except ValueError as e:
+            raise ValueError(f"row {reader.line_num} {e}") from e
+
+        try:
+            quantity = (
+                Decimal(fields["quantity"].replace(",", "")) if fields.get("quantity") else None
+            )
+        except InvalidOperation as e:
+            raise ValueError(f"row {reader.line_num} quantity is not valid") from e
+
+        queries.append(PriceQuery(AssetSymbol(fields["asset"].upper()), date, quantity))
+    return queries
+
+
+def price_queries(
+    queries: List[PriceQuery], value_asset: ValueAsset, jobs: int = 1
+) -> Iterator[Dict[str, Any]]:
+    # Each asset is priced once for each date, in date order, so data sources which return a range
+    #  of dates need fewer requests. Each data source only makes one request at a time, so the
+    #  assets are priced concurrently, to overlap requests to different data sources.
+    demand: Dict[AssetSymbol, Set[Optional[Date]]] = {}
+    for query in queries:
+        demand.setdefault(query.asset, set()).add(query.date)
+
+    results: Dict[AssetSymbol, AssetPrices] = {}
+    if config.price_via_btc:
+        # Other cryptoassets are priced via BTC, so the BTC prices are needed first
+        btc_dates: Set[Optional[Date]] = {
+            date
+            for asset, dates in demand.items()
+            if asset not in config.fiat_list
+            for date in dates
+            if date
+        }
+        results[AssetSymbol("BTC")] = _price_asset(
+            value_asset,
+            AssetSymbol("BTC"),
+            btc_dates | demand.get(AssetSymbol("BTC"), set()),
+        )
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        # Each worker runs in a copy of the current context, so it uses the same session
+        futures: Dict[AssetSymbol, "Future[AssetPrices]"] = {
+            asset: executor.submit(
+                contextvars.copy_context().run, _price_asset, value_asset, asset, dates
+            )
+            for asset, dates in demand.items()
+            if asset not in results
+        }
+
+        # Results are returned in the same order as the queries, as soon as each is priced
+        for query in queries:
+            if query.asset not in results:
+                results[query.asset] = futures[query.asset].result()
+
+            price_record, error = results[query.asset][query.date]
+            yield _get_result(query, price_record, error)
+
+
+def _price_asset(
+    value_asset: ValueAsset, asset: AssetSymbol, dates: Set[Optional[Date]]
+) -> AssetPrices:
+    prices: AssetPrices = {}
+    for date in sorted(dates, key=lambda d: d or datetime.date.max):
+        try:
+            if date is None or date >= datetime.date.today():
+                price_record = value_asset.get_latest_price(asset)
+            else:
+                price_record = value_asset.get_historical_price(
+                    asset, Timestamp(datetime.datetime.combine(date, datetime.time(), TZ_UTC))
+                )
+        except (DataSourceApiError, DataSourceError) as e:
+            prices[date] = None, str(e)
+            continue
+
+        if not price_record.name:
+            prices[date] = price_record, "not supported"
+        elif price_record.price_ccy is None:
+            prices[date] = price_record, "not available"
+        else:
+            prices[date] = price_record, ""
+    return prices
+
+
+def _get_result(
+    query: PriceQuery, price_record: Optional[PriceDataRecord], error: str
+) -> Dict[str, Any]:
+    price = price_record.price_ccy if price_record else None
+    return {
+        "asset": query.asset,
+        "date": query.date,
+        "quantity": query.quantity,
+        "price": price,
+        "value": query.quantity * price if query.quantity is not None and price else None,
+        "currency": config.ccy,
+        "name": price_record.name if price_record else None,
+        "data_source": price_record.data_source if price_record and price else None,
+        "error": error or None,
+    }
+
+
+def write_csv(results: Iterator[Dict[str, Any]], output: TextIO) -> None:
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(OUTPUT_FIELDS)
+    for result in results:
+        writer.writerow(["" if result[k] is None else _to_value(result[k]) for k in OUTPUT_FIELDS])
+        output.flush()
+
+
+def write_json(results: Iterator[Dict[str, Any]], output: TextIO) -> None:
+    # One JSON object per line, so each result can be read as soon as it's written
+    for result in results:
+        output.write(json.dumps({k: _to_value(v) for k, v in result.items()}) + "\n")
+        output.flush()
+
+
+def _to_value(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        # Fixed-point, so no precision is lost, and there's no exponent
+        return f"{value:f}"
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return value
@@ -2,14 +2,16 @@
 # (c) Nano Nano Ltd 2019
 
 import os
+import threading
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Any, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from colorama import Fore
 from tqdm import tqdm
 
 from ..bt_types import (
+    AssetId,
     AssetName,
     AssetSymbol,
     DataSourceName,
@@ -25,6 +27,8 @@ from ..utils import disable_tqdm
 from .datasource import DataSourceBase
 from .exceptions import UnexpectedDataSourceError
 
+PricesUsed = Dict[Tuple[DataSourceName, TradingPair, AssetId, Date], Optional[Decimal]]
+
 
 @dataclass
 class PriceDataRecord:
@@ -37,6 +41,11 @@ class PriceDataRecord:
 
 
 class PriceData:
+    # Data sources are shared by each PriceData in the process, so their assets and price caches
+    #  are only loaded once, each is only created by one thread
+    data_sources_shared: Dict[Tuple[DataSourceName, bool], DataSourceBase] = {}
+    data_sources_lock = threading.Lock()
+
     def __init__(
         self,
         data_sources_required: List[DataSourceName],
@@ -47,6 +56,8 @@ class PriceData:
         self.price_tool = price_tool
         self.no_cache = no_cache
         self.data_sources = {}
+        # Every historical price looked up, so a result can be checked against the price cache
+        self.prices_used: PricesUsed = {}
         self.progress_bar: "Optional[tqdm[Any]]" = None
 
         if not os.path.exists(CACHE_DIR):
@@ -66,12 +77,21 @@ class PriceData:
                 disable=disable_tqdm(),
             ) as pbar:
                 for cls in ds_classes:
-                    self.data_sources[cls.__name__.upper()] = cls(no_cache, progress_bar=pbar)
+                    ds_key = (DataSourceName(cls.__name__.upper()), no_cache)
+                    with self.data_sources_lock:
+                        if ds_key not in self.data_sources_shared:
+                            self.data_sources_shared[ds_key] = cls(no_cache, progress_bar=pbar)
+                    self.data_sources[cls.__name__.upper()] = self.data_sources_shared[ds_key]
                     pbar.update(1)
 
         for ds in self.data_sources.values():
             ds.progress_bar = None
 
+    @classmethod
+    def shared_data_sources(cls) -> List[DataSourceBase]:
+        with cls.data_sources_lock:
+            return list(cls.data_sources_shared.values())
+
     @staticmethod
     def data_source_priority(asset: AssetSymbol) -> List[DataSourceName]:
         if asset in config.data_source_select:
@@ -109,34 +129,27 @@ class PriceData:
                 pair = TradingPair(asset + "/" + quote)
                 asset_id = ds_obj.assets[asset]["asset_id"]
 
-                if not self.no_cache:
-                    if (
-                        pair in ds_obj.prices
-                        and asset_id in ds_obj.prices[pair]
-                        and date in ds_obj.prices[pair][asset_id]
-                    ):
-                        return (
-                            ds_obj.prices[pair][asset_id][date]["price"],
-                            ds_obj.assets[asset]["name"],
-                            ds_obj.prices[pair][asset_id][date]["url"],
-                        )
+                if (
+                    self.no_cache
+                    or pair not in ds_obj.prices
+                    or asset_id not in ds_obj.prices[pair]
+                    or date not in ds_obj.prices[pair][asset_id]
+                ):
+                    ds_obj.get_historical(asset, quote, timestamp)
 
-                ds_obj.get_historical(asset, quote, timestamp)
                 if (
                     pair in ds_obj.prices
                     and asset_id in ds_obj.prices[pair]
                     and date in ds_obj.prices[pair][asset_id]
                 ):
-                    return (
-                        ds_obj.prices[pair][asset_id][date]["price"],
-                        ds_obj.assets[asset]["name"],
-                        ds_obj.prices[pair][asset_id][date]["url"],
-                    )
-                return (
-                    None,
-                    ds_obj.assets[asset]["name"],
-                    SourceUrl(""),
-                )
+                    price = ds_obj.prices[pair][asset_id][date]["price"]
+                    url = ds_obj.prices[pair][asset_id][date]["url"]
+                else:
+                    price = None
+                    url = SourceUrl("")
+
+                self.prices_used[(ds_obj.name(), pair, asset_id, date)] = price
+                return price, ds_obj.assets[asset]["name"], url
             return None, AssetName(""), SourceUrl("")
         raise UnexpectedDataSourceError(data_source, DataSourceBase.datasources_str())
 
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+# Record and replay of data source responses, with a stand-in server which serves them
+# (c) Nano Nano Ltd 2026
+
+import argparse
+import hashlib
+import http.server
+import json
+import os
+import threading
+import time
+from http import HTTPStatus
+from typing import Any, Optional, Tuple
+
+import colorama
+from colorama import Fore
+
+from ..config import config
+from ..utils import is_compiled
+from ..version import __version__
+
+
+def response_filename(recording_dir: str, url: str) -> str:
+    return os.path.join(recording_dir, f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json")
+
+
+def save_response(recording_dir: str, url: str, json_resp: Any) -> None:
+    if not os.path.exists(recording_dir):
+        os.makedirs(recording_dir, exist_ok=True)
+
+    # Written to a temporary file first, as data sources can be recorded by other threads
+    filename = response_filename(recording_dir, url)
+    tmp_filename = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_filename, "w", encoding="utf-8") as response_file:
+        json.dump({"url": url, "json": json_resp}, response_file, indent=4)
+
+    os.replace(tmp_filename, filename)
+
+
+def load_response(recording_dir: str, url: str) -> Any:
+    with open(response_filename(recording_dir, url), "r", encoding="utf-8") as response_file:
+        return json.load(response_file)["json"]
+
+
+def request_url(server_url: Optional[str], url: str) -> str:
+    # The stand-in server is given the original URL as its path
+    if server_url:
+        return f"{server_url.rstrip('/')}/{url.split('://', 1)[1]}"
+    return url
+
+
+class StandInServer(http.server.ThreadingHTTPServer):
+    def __init__(
+        self,
+        server_address: Tuple[str, int],
+        recording_dir: str,
+        latency: float = 0,
+        rate_limit: Optional[int] = None,
+        retry_after: int = 1,
+        error_every: Optional[int] = None,
+        error_status: HTTPStatus = HTTPStatus.SERVICE_UNAVAILABLE,
+    ) -> None:
+        super().__init__(server_address, StandInRequestHandler)
+        self.recording_dir = recording_dir
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.error_every = error_every
+        self.error_status = error_status
+
+        self.lock = threading.Lock()
+        self.request_cnt = 0
+        self.window_start = 0.0
+        self.window_cnt = 0
+
+    def get_fault(self) -> Optional[HTTPStatus]:
+        # Faults are decided in the order requests arrive, so a run can be repeated exactly
+        with self.lock:
+            self.request_cnt += 1
+            if self.error_every and self.request_cnt % self.error_every == 0:
+                return self.error_status
+
+            if self.rate_limit:
+                now = time.monotonic()
+                if now - self.window_start >= 1:
+                    self.window_start = now
+                    self.window_cnt = 0
+
+                self.window_cnt += 1
+                if self.window_cnt > self.rate_limit:
+                    return HTTPStatus.TOO_MANY_REQUESTS
+        return None
+
+
+class StandInRequestHandler(http.server.BaseHTTPRequestHandler):
+    server: StandInServer
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        # The path is the original URL without its scheme, i.e. /api.coingecko.com/api/v3/...
+        url = f"https://{self.path.lstrip('/')}"
+        fault = self.server.get_fault()
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if fault == HTTPStatus.TOO_MANY_REQUESTS:
+            self._send_json(fault, {"error": "rate limit exceeded"}, self.server.retry_after)
+        elif fault:
+            self._send_json(fault, {"error": fault.phrase})
+        else:
+            try:
+                self._send_json(HTTPStatus.OK, load_response(self.server.recording_dir, url))
+            except IOError:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": f"no recorded response: {url}"})
+
+    def _send_json(self, status: HTTPStatus, body: Any, retry_after: Optional[int] = None) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if retry_after is not None:
+            self.send_header("Retry-After", str(retry_after))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+        if config.debug:
+            print(f"{Fore.YELLOW}replay: {format % args}")
+
+
+def main() -> None:
+    colorama.init()
+    parser = argparse.ArgumentParser(
+        description="Run a local stand-in for the price data sources, which serves responses "
+        "recorded with BITTYTAX_PRICE_RECORD. Set BITTYTAX_PRICE_SERVER to its address to use it."
+    )
+
+    if is_compiled():
+        version_str = f"{parser.prog} v{__version__} - compiled"
+    else:
+        version_str = f"{parser.prog} v{__version__}"
+
+    parser.add_argument(
+        "recording_dir",
+        type=str,
+        help="folder of recorded responses",
+    )
+    parser.add_argument(
+        "-v",
+        "--version",
+        action="version",
+        version=version_str,
+    )
+    parser.add_argument("-d", "--debug", action="store_true", help="enable debug logging")
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8000,
+        help="localhost port to listen on, default: %(default)s",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0,
+        metavar="SECONDS",
+        help="delay before each response, default: %(default)s",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=int,
+        dest="rate_limit",
+        metavar="N",
+        help="requests per second before responding with HTTP 429",
+    )
+    parser.add_argument(
+        "--retry-after",
+        type=int,
+        default=1,
+        dest="retry_after",
+        metavar="SECONDS",
+        help="Retry-After header sent with HTTP 429, default: %(default)s",
+    )
+    parser.add_argument(
+        "--error-every",
+        type=int,
+        dest="error_every",
+        metavar="N",
+        help="respond to every Nth request with a server error",
+    )
+    parser.add_argument(
+        "--error-status",
+        type=int,
+        choices=[500, 502, 503, 504],
+        default=503,
+        dest="error_status",
+        help="HTTP status of the server error, default: %(default)s",
+    )
+
+    args = parser.parse_args()
+    config.debug = args.debug
+
+    server = StandInServer(
+        ("127.0.0.1", args.port),
+        args.recording_dir,
+        latency=args.latency,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after,
+        error_every=args.error_every,
+        error_status=HTTPStatus(args.error_status),
+    )
+
+    print(f"{Fore.WHITE}{parser.prog} listening on: {Fore.YELLOW}http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 # (c) Nano Nano Ltd 2019
 
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import TYPE_CHECKING, Dict, Optional, Tuple, Union
 
@@ -27,10 +27,16 @@ class ValueOrigin:
 
 class ValueAsset:
     def __init__(
-        self, price_tool: bool = False, no_cache: bool = False, leave_bar: bool = False
+        self,
+        price_tool: bool = False,
+        no_cache: bool = False,
+        leave_bar: bool = False,
+        tax_year: Optional[Year] = None,
     ) -> None:
         self.price_tool = price_tool
         self.price_report: Dict[Year, Dict[AssetSymbol, Dict[Date, PriceDataRecord]]] = {}
+        self.tax_year = tax_year
+        self.value_until = self._get_value_until(tax_year)
         data_sources_required = set(config.data_source_fiat + config.data_source_crypto) | {
             x.split(":")[0] for v in config.data_source_select.values() for x in v
         }
@@ -43,6 +49,9 @@ class ValueAsset:
         if t.quantity == 0:
             return Decimal(0), ValueOrigin(t)
 
+        if self.value_until and t.date() > self.value_until:
+            return Decimal(0), ValueOrigin(t)
+
         price_record = self.get_historical_price(t.asset, t.timestamp)
         if price_record.price_ccy is not None:
             value = price_record.price_ccy * t.quantity
@@ -61,6 +70,14 @@ class ValueAsset:
         )
         return Decimal(0), ValueOrigin(t, price_record)
 
+    @staticmethod
+    def _get_value_until(tax_year: Optional[Year]) -> Optional[Date]:
+        # Only buy-backs within 30 days of the end of the tax year can be matched with its
+        #  disposals, so nothing after that is needed to calculate it
+        if tax_year:
+            return Date(config.get_tax_year_end(tax_year) + timedelta(days=30))
+        return None
+
     def get_current_value(
         self, asset: AssetSymbol, quantity: Decimal
     ) -> Tuple[Optional[Decimal], AssetName, DataSourceName]:
@@ -91,13 +108,28 @@ class ValueAsset:
     def price_report_cache(
         self, asset: AssetSymbol, timestamp: Timestamp, price_record: PriceDataRecord
     ) -> None:
-        date = timestamp.date()
-
+        self._price_report_add(asset, Date(timestamp.date()), price_record)
+
+    def rebuild_price_report(self) -> None:
+        # The tax year of each price depends on when the tax year starts, i.e. for company tax rules
+        price_report = self.price_report
+        self.price_report = {}
+        for asset_prices in price_report.values():
+            for asset, date_prices in asset_prices.items():
+                for date, price_record in date_prices.items():
+                    self._price_report_add(asset, date, price_record)
+
+    def _price_report_add(
+        self, asset: AssetSymbol, date: Date, price_record: PriceDataRecord
+    ) -> None:
         if date > config.get_tax_year_end(date.year):
             tax_year = Year(date.year + 1)
         else:
             tax_year = Year(date.year)
 
+        if self.tax_year and tax_year != self.tax_year:
+            return
+
         if tax_year not in self.price_report:
             self.price_report[tax_year] = {}
 
@@ -105,4 +137,24 @@ class ValueAsset:
             self.price_report[tax_year][asset] = {}
 
         if date not in self.price_report[tax_year][asset]:
-            self.price_report[tax_year][asset][Date(date)] = price_record
+            self.price_report[tax_year][asset][date] = price_record
+
+
+class PriceDemand(ValueAsset):
+    # Records the historic prices needed to value the transactions, instead of looking them up
+    def __init__(self) -> None:  # pylint: disable=super-init-not-called
+        self.price_tool = False
+        self.price_report = {}
+        self.tax_year = None
+        self.value_until = None
+        self.price_data = PriceData([])
+        self.demand: Dict[Tuple[AssetSymbol, Date], Timestamp] = {}
+
+    def get_value(self, t: Union["Buy", "Sell"]) -> Tuple[Decimal, ValueOrigin]:
+        # Valued as if every price was available, so values are derived in the same way
+        if t.asset == config.ccy or t.quantity == 0:
+            return t.quantity, ValueOrigin(t)
+
+        if t.date() < datetime.now().date():
+            self.demand.setdefault((t.asset, t.date()), t.timestamp)
+        return t.quantity, ValueOrigin(t, PriceDataRecord(AssetName(""), DataSourceName("")))
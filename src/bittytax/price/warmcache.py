@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# Fills the price cache with the historic prices needed by transaction records
+# (c) Nano Nano Ltd 2026
+
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Set, Tuple
+
+from colorama import Fore
+from tqdm import tqdm
+
+from ..bt_types import AssetSymbol, Date
+from ..constants import WARNING
+from ..exceptions import ImportFailureError
+from ..session import Session
+from ..utils import disable_tqdm
+from .pricebatch import PriceQuery, price_queries
+from .valueasset import ValueAsset
+
+RECORDS_FILE_EXTENSIONS = (".xlsx", ".xls", ".csv")
+
+
+@dataclass
+class AssetCoverage:
+    needed: int = 0
+    priced: int = 0
+
+
+def find_records(paths: List[str]) -> List[str]:
+    filenames: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, files in os.walk(path):
+                dirnames.sort()
+                filenames.extend(
+                    os.path.join(dirpath, file)
+                    for file in sorted(files)
+                    if os.path.splitext(file)[1].lower() in RECORDS_FILE_EXTENSIONS
+                )
+        else:
+            filenames.append(path)
+    return filenames
+
+
+def records_demand(filenames: List[str]) -> Set[Tuple[AssetSymbol, Date]]:
+    # The accounting tool is only imported when it's needed, as it's slow to import
+    from .. import bittytax  # pylint: disable=import-outside-toplevel
+
+    demand: Set[Tuple[AssetSymbol, Date]] = set()
+    for filename in filenames:
+        with Session() as session:
+            try:
+                transaction_records = bittytax.load_records(filename, session=session)
+            except IOError:
+                print(f"{WARNING} File could not be read: {filename}")
+                continue
+            except ImportFailureError:
+                print(f"{WARNING} File is skipped: {filename}")
+                continue
+
+            demand.update(bittytax.price_demand(transaction_records, session=session))
+    return demand
+
+
+def warm_cache(
+    demand: Set[Tuple[AssetSymbol, Date]], value_asset: ValueAsset, jobs: int = 1
+) -> Dict[AssetSymbol, AssetCoverage]:
+    # Prices which are already cached are returned without a request, so only missing prices
+    #  are fetched
+    coverage: Dict[AssetSymbol, AssetCoverage] = {}
+    queries = [PriceQuery(asset, date) for asset, date in sorted(demand)]
+
+    with tqdm(
+        price_queries(queries, value_asset, jobs),
+        total=len(queries),
+        unit="price",
+        desc=f"{Fore.CYAN}fetching prices{Fore.GREEN}",
+        disable=disable_tqdm(),
+    ) as progress_bar:
+        value_asset.price_data.progress_bar = progress_bar
+        for result in progress_bar:
+            asset_coverage = coverage.setdefault(result["asset"], AssetCoverage())
+            asset_coverage.needed += 1
+            if result["price"] is not None:
+                asset_coverage.priced += 1
+    return coverage
@@ -3,18 +3,18 @@
 
 import argparse
 import datetime
+import io
 import itertools
 import os
 import sys
 import threading
 import time
+from concurrent.futures import ProcessPoolExecutor
 from decimal import Decimal
 from types import TracebackType
-from typing import Dict, List, Optional, Tuple, Type
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, List, Optional, Tuple, Type
 
-import jinja2
 from colorama import Fore, Style
-from xhtml2pdf import pisa
 
 from .audit import AuditRecords, AuditTotals
 from .bt_types import TAX_RULES_UK_COMPANY, AssetName, AssetSymbol, Date, Note, TaxRules, Year
@@ -36,6 +36,11 @@ if sys.version_info < (3, 9):
 else:
     import importlib.resources as pkg_resources
 
+if TYPE_CHECKING:
+    import jinja2
+    from pypdf import PdfReader, PdfWriter
+    from pypdf.generic import IndirectObject
+
 
 class ReportPdf:
     AUDIT_FILENAME = "BittyTax_Audit_Report"
@@ -46,6 +51,12 @@ class ReportPdf:
     AUDIT_TEMPLATE = "audit_report.html"
     TAX_SUMMARY_TEMPLATE = "tax_summary_report.html"
     TAX_FULL_TEMPLATE = "tax_full_report.html"
+    PAGE_FOOTER_TEMPLATE = "page_footer.html"
+
+    PAGE_PORTRAIT = "default-portrait"
+    PAGE_LANDSCAPE = "default-landscape"
+
+    env_shared: "Optional[jinja2.Environment]" = None
 
     def __init__(
         self,
@@ -56,72 +67,217 @@ class ReportPdf:
         price_report: Optional[Dict[Year, Dict[AssetSymbol, Dict[Date, PriceDataRecord]]]] = None,
         holdings_report: Optional[HoldingsReportRecord] = None,
     ) -> None:
-        self.env = jinja2.Environment(loader=jinja2.PackageLoader(__package__, "templates"))
-
-        self.env.filters["datefilter"] = self.datefilter
-        self.env.filters["datefilter2"] = self.datefilter2
-        self.env.filters["quantityfilter"] = self.quantityfilter
-        self.env.filters["valuefilter"] = self.valuefilter
-        self.env.filters["ratefilter"] = self.ratefilter
-        self.env.filters["ratesfilter"] = self.ratesfilter
-        self.env.filters["nowrapfilter"] = self.nowrapfilter
-        self.env.filters["lenfilter"] = self.lenfilter
-        self.env.filters["audittotalsfilter"] = self.audittotalsfilter
-        self.env.filters["mismatchfilter"] = self.mismatchfilter
-        self.env.globals["TAX_RULES_UK_COMPANY"] = TAX_RULES_UK_COMPANY
-        self.env.globals["TEMPLATE_PATH"] = pkg_resources.files(__package__).joinpath("templates")
+        # The PDF libraries are slow to import, so are only imported when a PDF is created
+        from xhtml2pdf import pisa  # pylint: disable=import-outside-toplevel
+
+        self.env = self.get_environment()
+
+        context = {
+            "date": datetime.datetime.now(),
+            "author": f"{progname} v{__version__}",
+            "config": config,
+            "args": args,
+        }
+        html = ""
+        html_sections: List[Tuple[Optional[str], bool, str]] = []
 
         if args.audit_only:
             filename = self.get_output_filename(args.output_filename, self.AUDIT_FILENAME)
             template = self.env.get_template(self.AUDIT_TEMPLATE)
-            html = template.render(
-                {
-                    "date": datetime.datetime.now(),
-                    "author": f"{progname} v{__version__}",
-                    "config": config,
-                    "args": args,
-                    "audit": audit,
-                }
-            )
+            html = template.render({**context, "audit": audit})
         elif args.summary_only:
             filename = self.get_output_filename(args.output_filename, self.TAX_SUMMARY_FILENAME)
             template = self.env.get_template(self.TAX_SUMMARY_TEMPLATE)
-            html = template.render(
-                {
-                    "date": datetime.datetime.now(),
-                    "author": f"{progname} v{__version__}",
-                    "config": config,
-                    "args": args,
-                    "tax_report": tax_report,
-                }
-            )
+            html = template.render({**context, "tax_report": tax_report})
         else:
             filename = self.get_output_filename(args.output_filename, self.TAX_FULL_FILENAME)
             template = self.env.get_template(self.TAX_FULL_TEMPLATE)
-            html = template.render(
+            context.update(
                 {
-                    "date": datetime.datetime.now(),
-                    "author": f"{progname} v{__version__}",
-                    "config": config,
-                    "args": args,
                     "audit": audit,
                     "tax_report": tax_report,
                     "price_report": price_report,
                     "holdings_report": holdings_report,
                 }
             )
+            html_sections = [
+                (
+                    page_template,
+                    continued,
+                    template.render(
+                        {
+                            **context,
+                            "layer": "content",
+                            "section": section,
+                            "tax_year": tax_year,
+                            "page_template": page_template,
+                        }
+                    ),
+                )
+                for section, tax_year, page_template, continued in self._tax_full_sections(
+                    tax_report, holdings_report
+                )
+            ]
 
         with ProgressSpinner(f"{Fore.CYAN}generating PDF report{Fore.GREEN}: "):
             with open(filename, "w+b") as pdf_file:
-                status = pisa.CreatePDF(html, dest=pdf_file)
+                if html_sections:
+                    err = self._create_pdf_sections(pdf_file, html_sections, context, args.jobs)
+                else:
+                    err = pisa.CreatePDF(html, dest=pdf_file).err
 
-        if not status.err:
+        if not err:
             sys.stdout.write(
                 f"{Fore.WHITE}PDF report created: {Fore.YELLOW}{os.path.abspath(filename)}\n"
             )
         else:
             print(f"{ERROR} Failed to create PDF report")
 
+    @classmethod
+    def get_environment(cls) -> "jinja2.Environment":
+        # Shared by every report in the process, so each template is only compiled once
+        import jinja2  # pylint: disable=import-outside-toplevel
+
+        if cls.env_shared is None:
+            env = jinja2.Environment(loader=jinja2.PackageLoader(__package__, "templates"))
+
+            env.filters["datefilter"] = cls.datefilter
+            env.filters["datefilter2"] = cls.datefilter2
+            env.filters["quantityfilter"] = cls.quantityfilter
+            env.filters["valuefilter"] = cls.valuefilter
+            env.filters["ratefilter"] = cls.ratefilter
+            env.filters["ratesfilter"] = cls.ratesfilter
+            env.filters["nowrapfilter"] = cls.nowrapfilter
+            env.filters["lenfilter"] = cls.lenfilter
+            env.filters["audittotalsfilter"] = cls.audittotalsfilter
+            env.filters["mismatchfilter"] = cls.mismatchfilter
+            env.globals["TAX_RULES_UK_COMPANY"] = TAX_RULES_UK_COMPANY
+            env.globals["TEMPLATE_PATH"] = pkg_resources.files(__package__).joinpath("templates")
+            cls.env_shared = env
+        return cls.env_shared
+
+    def _tax_full_sections(
+        self,
+        tax_report: Optional[Dict[Year, TaxReportRecord]],
+        holdings_report: Optional[HoldingsReportRecord],
+    ) -> List[Tuple[str, Optional[Year], Optional[str], bool]]:
+        # Each section starts on a new page, the cover page is on the unnamed page template. The
+        #  sections of the appendix after the first continue under its heading in the outline
+        sections: List[Tuple[str, Optional[Year], Optional[str], bool]] = [
+            ("cover", None, None, False),
+            ("audit", None, self.PAGE_PORTRAIT, False),
+        ]
+        for tax_year in sorted(tax_report or {}):
+            sections.append(
+                (
+                    "tax_year",
+                    tax_year,
+                    self.PAGE_PORTRAIT if config.legacy_report else self.PAGE_LANDSCAPE,
+                    False,
+                )
+            )
+        for i, tax_year in enumerate(sorted(tax_report or {})):
+            sections.append(("price_data", tax_year, self.PAGE_PORTRAIT, i > 0))
+        if holdings_report or not tax_report:
+            sections.append(("holdings", None, self.PAGE_PORTRAIT, bool(tax_report)))
+        return sections
+
+    def _create_pdf_sections(
+        self,
+        pdf_file: BinaryIO,
+        html_sections: List[Tuple[Optional[str], bool, str]],
+        context: Dict[str, Any],
+        jobs: int,
+    ) -> int:
+        from pypdf import PdfReader, PdfWriter  # pylint: disable=import-outside-toplevel
+
+        # Each section is rendered as a document of its own, without the page numbers, so
+        #  sections can be rendered in parallel, and none has to be laid out twice to count
+        #  its pages. The page footers are then rendered for the whole report and overlaid.
+        htmls = [html for _, _, html in html_sections]
+        if jobs > 1 and len(htmls) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(htmls))) as executor:
+                pdf_sections = list(executor.map(_create_pdf, htmls))
+        else:
+            pdf_sections = [_create_pdf(html) for html in htmls]
+
+        err = sum(section_err for _, section_err in pdf_sections)
+        if err:
+            return err
+
+        writer = PdfWriter()
+        page_templates: List[Optional[str]] = []
+        heading = None
+        for (page_template, continued, _), (pdf_section, _) in zip(html_sections, pdf_sections):
+            reader = PdfReader(io.BytesIO(pdf_section))
+            if not page_templates:
+                writer.add_metadata(reader.metadata or {})
+                if reader.page_mode:
+                    writer.page_mode = reader.page_mode
+
+            # Changing to a named page template leaves an empty first page
+            start = 0 if page_template is None else 1
+            page_offset = len(writer.pages) - start
+            writer.append(reader, pages=(start, len(reader.pages)), import_outline=False)
+            outline = reader.outline
+            nested = self._unnamed_outline(outline)
+            if continued and heading is not None and nested is not None:
+                # Without a heading of its own, the section's outline is under an unnamed item
+                #  which repeats its first heading, so only the items under it are added
+                self._add_outline(writer, reader, nested, page_offset, heading)
+                self._add_outline(writer, reader, outline[2:], page_offset)
+            else:
+                heading = self._add_outline(writer, reader, outline, page_offset)
+            page_templates.extend([page_template] * (len(reader.pages) - start))
+
+        template = self.env.get_template(self.PAGE_FOOTER_TEMPLATE)
+        pdf_footer, err = _create_pdf(
+            template.render({**context, "layer": "footer", "page_templates": page_templates})
+        )
+        if err:
+            return err
+
+        for page, footer_page in zip(writer.pages, PdfReader(io.BytesIO(pdf_footer)).pages):
+            page.merge_page(footer_page)
+            # The merged content is otherwise written uncompressed
+            page.compress_content_streams()
+
+        writer.write(pdf_file)
+        return 0
+
+    @staticmethod
+    def _unnamed_outline(outline: List[Any]) -> Optional[List[Any]]:
+        # An outline which starts below the top level is nested under an unnamed item, which
+        #  has the title of its first heading
+        if len(outline) >= 2 and isinstance(outline[1], list) and outline[1]:
+            if not isinstance(outline[0], list) and not isinstance(outline[1][0], list):
+                if outline[0].title == outline[1][0].title:
+                    return outline[1]
+        return None
+
+    @staticmethod
+    def _add_outline(
+        writer: "PdfWriter",
+        reader: "PdfReader",
+        outline: List[Any],
+        page_offset: int,
+        parent: Optional["IndirectObject"] = None,
+    ) -> Optional["IndirectObject"]:
+        # Copied by hand, as appending the outline opens every item which has children. Returns
+        #  the last item added at the top level
+        item = None
+        for destination in outline:
+            if isinstance(destination, list):
+                ReportPdf._add_outline(writer, reader, destination, page_offset, item)
+            else:
+                item = writer.add_outline_item(
+                    destination.title,
+                    page_offset + (reader.get_destination_page_number(destination) or 0),
+                    parent,
+                    is_open=destination.get("/Count", 0) >= 0,
+                )
+        return item
+
     @staticmethod
     def datefilter(date: Date) -> str:
         return f"{date:%d/%m/%Y}"
@@ -728,6 +884,14 @@ class ReportLog:
         return True
 
 
+def _create_pdf(html: str) -> Tuple[bytes, int]:
+    from xhtml2pdf import pisa  # pylint: disable=import-outside-toplevel
+
+    pdf = io.BytesIO()
+    status = pisa.CreatePDF(html, dest=pdf)
+    return pdf.getvalue(), status.err
+
+
 class ProgressSpinner:
     def __init__(self, message: str) -> None:
         self.message = message
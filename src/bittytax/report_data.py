@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+# (c) Nano Nano Ltd 2026
+
+import argparse
+import csv
+import datetime
+import json
+import os
+import sys
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+from colorama import Fore
+
+from .audit import AuditRecords
+from .bt_types import AssetSymbol, Date, Year
+from .config import config
+from .price.pricedata import PriceDataRecord
+from .tax import (
+    CalculateCapitalGains,
+    CalculateIncome,
+    CalculateMarginTrading,
+    HoldingsReportRecord,
+    TaxReportRecord,
+)
+from .version import __version__
+
+ReportRow = Dict[str, Any]
+
+
+class ReportData:
+    AUDIT_FILENAME = "BittyTax_Audit_Report"
+    TAX_SUMMARY_FILENAME = "BittyTax_Summary_Report"
+    TAX_FULL_FILENAME = "BittyTax_Report"
+    FILE_EXTENSION = ""
+
+    def __init__(
+        self,
+        progname: str,
+        args: argparse.Namespace,
+        audit: AuditRecords,
+        tax_report: Optional[Dict[Year, TaxReportRecord]] = None,
+        price_report: Optional[Dict[Year, Dict[AssetSymbol, Dict[Date, PriceDataRecord]]]] = None,
+        holdings_report: Optional[HoldingsReportRecord] = None,
+    ) -> None:
+        self.report: Dict[str, Any] = {
+            "author": f"{progname} v{__version__}",
+            "date": datetime.datetime.now().replace(microsecond=0),
+            "tax_rules": args.tax_rules.name,
+            "ccy": config.ccy,
+        }
+
+        if args.audit_only:
+            default_filename = self.AUDIT_FILENAME
+            self.report["audit"] = self._audit(audit)
+        elif args.summary_only:
+            if tax_report is None:
+                raise RuntimeError("Missing tax_report")
+
+            default_filename = self.TAX_SUMMARY_FILENAME
+            self.report["tax_years"] = self._tax_years(tax_report)
+        else:
+            if tax_report is None:
+                raise RuntimeError("Missing tax_report")
+
+            if price_report is None:
+                raise RuntimeError("Missing price_report")
+
+            default_filename = self.TAX_FULL_FILENAME
+            self.report["audit"] = self._audit(audit)
+            self.report["tax_years"] = self._tax_years(tax_report)
+            self.report["price_data"] = self._price_data(price_report)
+            if holdings_report:
+                self.report["holdings"] = self._holdings(holdings_report)
+
+        self.filename = self.get_output_filename(args.output_filename, default_filename)
+
+    @staticmethod
+    def _audit(audit: AuditRecords) -> Dict[str, List[ReportRow]]:
+        return {
+            "wallets": [
+                {
+                    "wallet": wallet,
+                    "asset": asset,
+                    "balance": audit.wallets[wallet][asset].balance,
+                    "staked": audit.wallets[wallet][asset].staked,
+                }
+                for wallet in sorted(audit.wallets, key=str.lower)
+                for asset in sorted(audit.wallets[wallet])
+            ],
+            "totals": [
+                {
+                    "asset": asset,
+                    "total": audit.totals[asset].total,
+                    "transfers_mismatch": audit.totals[asset].transfers_mismatch,
+                }
+                for asset in sorted(audit.totals)
+            ],
+        }
+
+    def _tax_years(self, tax_report: Dict[Year, TaxReportRecord]) -> List[Dict[str, Any]]:
+        tax_years = []
+        for tax_year in sorted(tax_report):
+            report_year = {
+                "tax_year": config.format_tax_year(tax_year),
+                "start": config.get_tax_year_start(tax_year),
+                "end": config.get_tax_year_end(tax_year),
+                "capital_gains": self._capital_gains(
+                    tax_year, tax_report[tax_year]["CapitalGains"]
+                ),
+            }
+
+            if "Income" in tax_report[tax_year]:
+                report_year["income"] = self._income(tax_year, tax_report[tax_year]["Income"])
+
+            if "MarginTrading" in tax_report[tax_year]:
+                report_year["margin_trading"] = self._margin_trading(
+                    tax_year, tax_report[tax_year]["MarginTrading"]
+                )
+
+            tax_years.append(report_year)
+        return tax_years
+
+    @staticmethod
+    def _capital_gains(tax_year: Year, cgains: CalculateCapitalGains) -> Dict[str, Any]:
+        capital_gains: Dict[str, Any] = {
+            "disposals": [
+                {
+                    "tax_year": config.format_tax_year(tax_year),
+                    "asset": te.asset,
+                    "date": te.date,
+                    "disposal_type": te.disposal_type,
+                    "acquisition_date": te.acquisition_date,
+                    "quantity": te.quantity,
+                    "cost": te.cost,
+                    "fees": te.fees,
+                    "proceeds": te.proceeds,
+                    "gain": te.gain,
+                }
+                for asset in sorted(cgains.assets)
+                for te in cgains.assets[asset]
+            ],
+            "totals": cgains.totals,
+            "summary": cgains.summary,
+            "cgt_estimate": cgains.cgt_estimate,
+            "ct_estimate": cgains.ct_estimate,
+        }
+
+        if cgains.split_date:
+            capital_gains["split_date"] = cgains.split_date
+            capital_gains["split_totals"] = cgains.split_totals
+            capital_gains["cgt_estimate_split"] = cgains.cgt_estimate_split
+        return capital_gains
+
+    @staticmethod
+    def _income(tax_year: Year, income: CalculateIncome) -> Dict[str, Any]:
+        return {
+            "events": [
+                {
+                    "tax_year": config.format_tax_year(tax_year),
+                    "asset": te.asset,
+                    "date": te.date,
+                    "income_type": te.type,
+                    "description": te.note,
+                    "quantity": te.quantity,
+                    "amount": te.amount,
+                    "fees": te.fees,
+                }
+                for asset in sorted(income.assets)
+                for te in income.assets[asset]
+            ],
+            "totals": income.totals,
+            "type_totals": {
+                i_type: income.type_totals[i_type] for i_type in sorted(income.type_totals)
+            },
+        }
+
+    @staticmethod
+    def _margin_trading(tax_year: Year, margin: CalculateMarginTrading) -> Dict[str, Any]:
+        return {
+            "contracts": [
+                {
+                    "tax_year": config.format_tax_year(tax_year),
+                    "wallet": wallet,
+                    "contract": note,
+                    **margin.contract_totals[(wallet, note)],
+                }
+                for wallet, note in sorted(
+                    margin.contract_totals, key=lambda key: (key[0].lower(), key[1].lower())
+                )
+            ],
+            "totals": margin.totals,
+        }
+
+    @staticmethod
+    def _price_data(
+        price_report: Dict[Year, Dict[AssetSymbol, Dict[Date, PriceDataRecord]]],
+    ) -> List[ReportRow]:
+        return [
+            {
+                "tax_year": config.format_tax_year(tax_year),
+                "asset": asset,
+                "name": price_report[tax_year][asset][date].name,
+                "data_source": price_report[tax_year][asset][date].data_source,
+                "url": price_report[tax_year][asset][date].url,
+                "date": date,
+                "price_ccy": price_report[tax_year][asset][date].price_ccy,
+                "price_btc": price_report[tax_year][asset][date].price_btc,
+            }
+            for tax_year in sorted(price_report)
+            for asset in sorted(price_report[tax_year])
+            for date in sorted(price_report[tax_year][asset])
+        ]
+
+    @staticmethod
+    def _holdings(holdings_report: HoldingsReportRecord) -> Dict[str, Any]:
+        return {
+            "holdings": [
+                {
+                    "asset": asset,
+                    "name": holdings_report["holdings"][asset]["name"],
+                    "quantity": holdings_report["holdings"][asset]["quantity"],
+                    "cost": holdings_report["holdings"][asset]["cost"],
+                    "value": holdings_report["holdings"][asset]["value"],
+                    "gain": holdings_report["holdings"][asset].get("gain"),
+                    "api_error": holdings_report["holdings"][asset].get("api_error", False),
+                }
+                for asset in sorted(holdings_report["holdings"])
+            ],
+            "totals": holdings_report["totals"],
+        }
+
+    @staticmethod
+    def to_value(value: Any) -> Any:
+        if isinstance(value, Decimal):
+            # Fixed-point, so no precision is lost, and there's no exponent
+            return f"{value:f}"
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.isoformat()
+        if isinstance(value, Enum):
+            return value.value
+        return value
+
+    @classmethod
+    def get_output_filename(cls, filename: str, default_filename: str) -> str:
+        if filename:
+            filepath, file_extension = os.path.splitext(filename)
+            if file_extension != "." + cls.FILE_EXTENSION:
+                filepath = filename
+        else:
+            filepath = default_filename
+
+        filename = filepath + "." + cls.FILE_EXTENSION
+        if not os.path.exists(filename):
+            return filename
+
+        i = 2
+        new_fname = f"{filepath}-{i}.{cls.FILE_EXTENSION}"
+        while os.path.exists(new_fname):
+            i += 1
+            new_fname = f"{filepath}-{i}.{cls.FILE_EXTENSION}"
+
+        return new_fname
+
+
+class ReportJson(ReportData):
+    FILE_EXTENSION = "json"
+
+    def write_json(self) -> None:
+        with open(self.filename, "w", encoding="utf-8") as json_file:
+            json.dump(self.report, json_file, indent=2, default=self.to_value)
+
+        sys.stdout.write(
+            f"{Fore.WHITE}JSON report created: {Fore.YELLOW}{os.path.abspath(self.filename)}\n"
+        )
+
+
+class ReportCsv(ReportData):
+    FILE_EXTENSION = "csv"
+
+    # Each table is written to a file of its own, which is named after it
+    TABLES: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+        "AuditWallets": (("audit", "wallets"), ("wallet", "asset", "balance", "staked")),
+        "AuditTotals": (("audit", "totals"), ("asset", "total", "transfers_mismatch")),
+        "CapitalGains": (
+            ("tax_years", "capital_gains", "disposals"),
+            (
+                "tax_year",
+                "asset",
+                "date",
+                "disposal_type",
+                "acquisition_date",
+                "quantity",
+                "cost",
+                "fees",
+                "proceeds",
+                "gain",
+            ),
+        ),
+        "CapitalGainsSummary": (
+            ("tax_years", "capital_gains"),
+            (
+                "tax_year",
+                "disposals",
+                "cost",
+                "fees",
+                "proceeds",
+                "gain",
+                "total_gain",
+                "total_loss",
+                "proceeds_limit",
+                "proceeds_warning",
+            ),
+        ),
+        "Income": (
+            ("tax_years", "income", "events"),
+            (
+                "tax_year",
+                "asset",
+                "date",
+                "income_type",
+                "description",
+                "quantity",
+                "amount",
+                "fees",
+            ),
+        ),
+        "MarginTrading": (
+            ("tax_years", "margin_trading", "contracts"),
+            ("tax_year", "wallet", "contract", "gains", "losses", "fees", "fee_rebates"),
+        ),
+        "PriceData": (
+            ("price_data",),
+            ("tax_year", "asset", "name", "data_source", "url", "date", "price_ccy", "price_btc"),
+        ),
+        "Holdings": (
+            ("holdings", "holdings"),
+            ("asset", "name", "quantity", "cost", "value", "gain", "api_error"),
+        ),
+    }
+
+    def write_csv(self) -> None:
+        filepath, file_extension = os.path.splitext(self.filename)
+
+        for table_name, (table_path, header) in self.TABLES.items():
+            rows = self._get_rows(table_path)
+            if rows is None:
+                continue
+
+            filename = f"{filepath}_{table_name}{file_extension}"
+            with open(filename, "w", newline="", encoding="utf-8") as csv_file:
+                writer = csv.writer(csv_file, lineterminator="\n")
+                writer.writerow(header)
+                for row in rows:
+                    writer.writerow(
+                        ["" if row[key] is None else self.to_value(row[key]) for key in header]
+                    )
+
+            sys.stdout.write(
+                f"{Fore.WHITE}CSV report created: {Fore.YELLOW}{os.path.abspath(filename)}\n"
+            )
+
+    def _get_rows(self, table_path: Tuple[str, ...]) -> Optional[List[ReportRow]]:
+        section = table_path[0]
+        if section not in self.report:
+            return None
+
+        if section != "tax_years":
+            rows = self.report[section]
+            for key in table_path[1:]:
+                rows = rows[key]
+            return rows
+
+        # The tax years are flattened into one table
+        rows = []
+        for report_year in self.report["tax_years"]:
+            if table_path[1] not in report_year:
+                return None
+
+            if len(table_path) > 2:
+                rows.extend(report_year[table_path[1]][table_path[2]])
+            else:
+                rows.append(self._capital_gains_summary(report_year))
+        return rows
+
+    @staticmethod
+    def _capital_gains_summary(report_year: Dict[str, Any]) -> ReportRow:
+        capital_gains = report_year["capital_gains"]
+        return {
+            "tax_year": report_year["tax_year"],
+            "disposals": capital_gains["summary"]["disposals"],
+            "cost": capital_gains["totals"]["cost"],
+            "fees": capital_gains["totals"]["fees"],
+            "proceeds": capital_gains["totals"]["proceeds"],
+            "gain": capital_gains["totals"]["gain"],
+            "total_gain": capital_gains["summary"]["total_gain"],
+            "total_loss": capital_gains["summary"]["total_loss"],
+            "proceeds_limit": capital_gains["summary"]["proceeds_limit"],
+            "proceeds_warning": capital_gains["summary"]["proceeds_warning"],
+        }
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+# Cache of tax calculation results, so a run with unchanged inputs is not repeated
+# (c) Nano Nano Ltd 2026
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from colorama import Fore
+
+from .audit import AuditRecords
+from .bt_types import AssetSymbol, DataSourceName, Date, Year
+from .config import config
+from .constants import CACHE_DIR
+from .price.datasource import DataSourceBase
+from .price.pricedata import PriceDataRecord, PricesUsed
+from .tax import HoldingsReportRecord, TaxReportRecord
+from .version import __version__
+
+RESULTS_DIR = os.path.join(CACHE_DIR, "results")
+
+
+@dataclass
+class CachedResult:
+    audit: AuditRecords
+    tax_report: Dict[Year, TaxReportRecord]
+    price_report: Dict[Year, Dict[AssetSymbol, Dict[Date, PriceDataRecord]]]
+    holdings_report: Optional[HoldingsReportRecord]
+    prices_used: PricesUsed
+
+
+class ResultCache:
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.filename = os.path.join(RESULTS_DIR, f"{self._get_key(args)}.pickle")
+
+    @staticmethod
+    def _get_key(args: argparse.Namespace) -> str:
+        key = hashlib.sha256()
+        with open(args.filename, "rb") as records_file:
+            for chunk in iter(lambda: records_file.read(1024 * 1024), b""):
+                key.update(chunk)
+
+        key.update(
+            json.dumps(
+                {
+                    "version": __version__,
+                    "config": config.config,
+                    "tax_rules": args.tax_rules.name,
+                    "tax_year": args.tax_year,
+                    "skip_integrity": args.skip_integrity,
+                    "summary_only": args.summary_only,
+                    "nopdf": args.nopdf,
+                    "report_format": args.report_format,
+                },
+                sort_keys=True,
+                default=str,
+            ).encode("utf-8")
+        )
+        return key.hexdigest()
+
+    def load(self) -> Optional[CachedResult]:
+        try:
+            with open(self.filename, "rb") as result_file:
+                result = pickle.load(result_file)
+        except FileNotFoundError:
+            return None
+        except (IOError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            if config.debug:
+                print(f"{Fore.YELLOW}result cache: {self.filename} could not be read")
+            return None
+
+        if not isinstance(result, CachedResult):
+            return None
+
+        if not self._prices_unchanged(result.prices_used):
+            if config.debug:
+                print(f"{Fore.YELLOW}result cache: prices have changed since {self.filename}")
+            return None
+
+        return result
+
+    def save(self, result: CachedResult) -> None:
+        if not os.path.exists(RESULTS_DIR):
+            os.makedirs(RESULTS_DIR, exist_ok=True)
+
+        # Written to a temporary file first, so other processes never read a partial result
+        with open(f"{self.filename}.{os.getpid()}.tmp", "wb") as result_file:
+            pickle.dump(result, result_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(f"{self.filename}.{os.getpid()}.tmp", self.filename)
+
+        if config.debug:
+            print(f"{Fore.YELLOW}result cache: saved {self.filename}")
+
+    @staticmethod
+    def _prices_unchanged(prices_used: PricesUsed) -> bool:
+        # Each price used is compared with the price cache of its data source, only the data
+        #  sources used are read
+        json_prices: Dict[DataSourceName, Dict[str, Any]] = {}
+        for (data_source, pair, asset_id, date), price in prices_used.items():
+            if data_source not in json_prices:
+                try:
+                    with open(
+                        os.path.join(CACHE_DIR, f"{data_source}.json"), "r", encoding="utf-8"
+                    ) as price_cache:
+                        json_prices[data_source] = json.load(price_cache)
+                except (IOError, ValueError):
+                    json_prices[data_source] = {}
+
+            try:
+                cached_price = DataSourceBase.str_to_decimal(
+                    json_prices[data_source][pair][asset_id]["prices"][f"{date:%Y-%m-%d}"]["price"]
+                )
+            except (KeyError, TypeError):
+                cached_price = None
+
+            # A price of zero is saved to the price cache as no price
+            if (cached_price or None) != (price or None):
+                return False
+        return True
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# (c) Nano Nano Ltd 2026
+
+import copy
+from contextvars import ContextVar, Token
+from types import TracebackType
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Type
+
+from .config import Config, default_config, session_config
+
+if TYPE_CHECKING:
+    from .conv.datafile import DataFile
+    from .conv.output_csv import OutputCsvStream
+
+
+# The state of a job, so that jobs can run concurrently in the same process. Code running inside
+#  "with session:" uses the session's config and state, each thread has its own current session.
+class Session:
+    def __init__(self, session_cfg: Optional[Config] = None) -> None:
+        # Starts with a copy of the process config, so any changes stay with the session
+        self.config = copy.deepcopy(default_config) if session_cfg is None else session_cfg
+        self.tid_cnt = 0
+        self.remove_duplicates = False
+        self.output_stream: Optional["OutputCsvStream"] = None
+        self.parsed_files: Optional[List["DataFile"]] = None
+        self.data_files: Dict["DataFile", "DataFile"] = {}
+        self.data_files_ordered: List["DataFile"] = []
+        self._tokens: List[Tuple[Token["Session"], Token[Config]]] = []
+
+    def __enter__(self) -> "Session":
+        self._tokens.append((_current_session.set(self), session_config.set(self.config)))
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        exc_traceback: Optional[TracebackType],
+    ) -> None:
+        session_token, config_token = self._tokens.pop()
+        session_config.reset(config_token)
+        _current_session.reset(session_token)
+
+
+_current_session: ContextVar[Session] = ContextVar(
+    "current_session", default=Session(default_config)
+)
+
+
+def current_session() -> Session:
+    return _current_session.get()
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 # (c) Nano Nano Ltd 2019
 
+import functools
 from decimal import Decimal
 from typing import TYPE_CHECKING, List, Optional
 
@@ -8,18 +9,20 @@ import dateutil.tz
 
 from .bt_types import Note, Timestamp, TrType, Wallet
 from .config import config
+from .session import current_session
 
 if TYPE_CHECKING:
     from .t_row import TransactionRow
     from .transactions import Buy, Sell
 
-TZ_LOCAL = dateutil.tz.gettz(config.local_timezone)
+
+@functools.lru_cache(maxsize=None)
+def get_tz(tz_name: str) -> Optional[dateutil.tz.tzfile]:
+    return dateutil.tz.gettz(tz_name)
 
 
 # pylint: disable=too-few-public-methods, too-many-instance-attributes
 class TransactionRecord:
-    cnt = 0
-
     def __init__(
         self,
         t_type: TrType,
@@ -41,26 +44,30 @@ class TransactionRecord:
         self.note = note
         self.t_row = t_row
 
+        # The same local timestamp is shared, converting the timezone is relatively slow
+        local_timestamp = Timestamp(self.timestamp.astimezone(get_tz(config.local_timezone)))
+
         if self.buy:
             self.buy.t_record = self
-            self.buy.timestamp = Timestamp(self.timestamp.astimezone(TZ_LOCAL))
+            self.buy.timestamp = local_timestamp
             self.buy.wallet = self.wallet
             self.buy.note = self.note
         if self.sell:
             self.sell.t_record = self
-            self.sell.timestamp = Timestamp(self.timestamp.astimezone(TZ_LOCAL))
+            self.sell.timestamp = local_timestamp
             self.sell.wallet = self.wallet
             self.sell.note = self.note
         if self.fee:
             self.fee.t_record = self
-            self.fee.timestamp = Timestamp(self.timestamp.astimezone(TZ_LOCAL))
+            self.fee.timestamp = local_timestamp
             self.fee.wallet = self.wallet
             self.fee.note = self.note
 
     def set_tid(self) -> List[int]:
         if self.tid is None:
-            TransactionRecord.cnt += 1
-            self.tid = [TransactionRecord.cnt, 0]
+            session = current_session()
+            session.tid_cnt += 1
+            self.tid = [session.tid_cnt, 0]
         else:
             self.tid[1] += 1
 
@@ -4,14 +4,14 @@
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation
 from enum import Enum
-from typing import Dict, List, NamedTuple, Optional
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
 
-import dateutil.parser
 from colorama import Back, Fore
 
 from .bt_types import TRANSFER_TYPES, AssetSymbol, Note, Timestamp, TrType, Wallet
 from .config import config
 from .constants import TZ_UTC
+from .conv.timestamp_parser import TimestampParser
 from .exceptions import (
     DataValueError,
     MissingDataError,
@@ -44,6 +44,27 @@ class FieldValidation(NamedTuple):
     fee_value: FieldRequired
 
 
+class ValidationStep(NamedTuple):
+    pos: int
+    header: str
+    validate: Callable[["TransactionRow", str, FieldRequired], Union[Optional[Decimal], str]]
+    required: FieldRequired
+
+
+class ParsedRow(NamedTuple):
+    t_type: TrType
+    buy_quantity: Optional[Decimal]
+    buy_asset: AssetSymbol
+    buy_value: Optional[Decimal]
+    sell_quantity: Optional[Decimal]
+    sell_asset: AssetSymbol
+    sell_value: Optional[Decimal]
+    fee_quantity: Optional[Decimal]
+    fee_asset: AssetSymbol
+    fee_value: Optional[Decimal]
+    timestamp: Timestamp
+
+
 @dataclass
 class TxRaw:
     tx_hash: str = ""
@@ -419,6 +440,18 @@ class TransactionRow:
         ),
     }
 
+    BUY_QUANTITY = HEADER.index("Buy Quantity")
+    BUY_ASSET = HEADER.index("Buy Asset")
+    BUY_VALUE = HEADER.index("Buy Value")
+    SELL_QUANTITY = HEADER.index("Sell Quantity")
+    SELL_ASSET = HEADER.index("Sell Asset")
+    SELL_VALUE = HEADER.index("Sell Value")
+    FEE_QUANTITY = HEADER.index("Fee Quantity")
+    FEE_ASSET = HEADER.index("Fee Asset")
+    FEE_VALUE = HEADER.index("Fee Value")
+
+    VALIDATION_PLANS: Dict[TrType, Tuple[ValidationStep, ...]] = {}
+
     def __init__(
         self,
         row: List[str],
@@ -436,9 +469,15 @@ class TransactionRow:
         self.failure: Optional[TransactionParserError] = None
 
     def parse(self) -> None:
-        if all(not self.row[i] for i in range(len(self.row))):
+        parsed_row = self.validate()
+        if parsed_row:
+            self.build(parsed_row)
+
+    def validate(self) -> Optional[ParsedRow]:
+        # Validation only depends upon the row, so it can be done in a separate process
+        if not any(self.row):
             # Skip empty rows
-            return
+            return None
 
         try:
             t_type = TrType(self.row_dict["Type"])
@@ -447,30 +486,23 @@ class TransactionRow:
                 self.HEADER.index("Type"), "Type", self.row_dict["Type"]
             ) from e
 
-        buy_quantity = sell_quantity = fee_quantity = None
-        buy_asset = sell_asset = fee_asset = AssetSymbol("")
-        buy_value = sell_value = fee_value = None
-        buy = sell = fee = None
-
-        for pos, required in enumerate(self.TYPE_VALIDATION[t_type]):
-            if pos == self.HEADER.index("Buy Quantity"):
-                buy_quantity = self.validate_quantity("Buy Quantity", required)
-            elif pos == self.HEADER.index("Buy Asset"):
-                buy_asset = self.validate_asset("Buy Asset", required)
-            elif pos == self.HEADER.index("Buy Value"):
-                buy_value = self.validate_value("Buy Value", required)
-            elif pos == self.HEADER.index("Sell Quantity"):
-                sell_quantity = self.validate_quantity("Sell Quantity", required)
-            elif pos == self.HEADER.index("Sell Asset"):
-                sell_asset = self.validate_asset("Sell Asset", required)
-            elif pos == self.HEADER.index("Sell Value"):
-                sell_value = self.validate_value("Sell Value", required)
-            elif pos == self.HEADER.index("Fee Quantity"):
-                fee_quantity = self.validate_quantity("Fee Quantity", required)
-            elif pos == self.HEADER.index("Fee Asset"):
-                fee_asset = self.validate_asset("Fee Asset", required)
-            elif pos == self.HEADER.index("Fee Value"):
-                fee_value = self.validate_value("Fee Value", required)
+        # Fields which are empty and not mandatory keep their default, without validation
+        fields: Dict[int, Union[Optional[Decimal], str]] = {}
+        for pos, header, validate, required in self.VALIDATION_PLANS[t_type]:
+            if self.row_dict[header]:
+                fields[pos] = validate(self, header, required)
+            elif required is FieldRequired.MANDATORY:
+                raise MissingDataError(pos, header)
+
+        buy_quantity = self._decimal(fields.get(self.BUY_QUANTITY))
+        buy_asset = AssetSymbol(str(fields.get(self.BUY_ASSET, "")))
+        buy_value = self._decimal(fields.get(self.BUY_VALUE))
+        sell_quantity = self._decimal(fields.get(self.SELL_QUANTITY))
+        sell_asset = AssetSymbol(str(fields.get(self.SELL_ASSET, "")))
+        sell_value = self._decimal(fields.get(self.SELL_VALUE))
+        fee_quantity = self._decimal(fields.get(self.FEE_QUANTITY))
+        fee_asset = AssetSymbol(str(fields.get(self.FEE_ASSET, "")))
+        fee_value = self._decimal(fields.get(self.FEE_VALUE))
 
         if buy_value and buy_asset == config.ccy and buy_value != buy_quantity:
             raise DataValueError(self.HEADER.index("Buy Value"), "Buy Value", buy_value)
@@ -487,6 +519,36 @@ class TransactionRow:
         if fee_quantity is None and fee_asset:
             raise MissingDataError(self.HEADER.index("Fee Quantity"), "Fee Quantity")
 
+        return ParsedRow(
+            t_type,
+            buy_quantity,
+            buy_asset,
+            buy_value,
+            sell_quantity,
+            sell_asset,
+            sell_value,
+            fee_quantity,
+            fee_asset,
+            fee_value,
+            self.parse_timestamp(),
+        )
+
+    def build(self, parsed_row: ParsedRow) -> None:
+        (
+            t_type,
+            buy_quantity,
+            buy_asset,
+            buy_value,
+            sell_quantity,
+            sell_asset,
+            sell_value,
+            fee_quantity,
+            fee_asset,
+            fee_value,
+            timestamp,
+        ) = parsed_row
+        buy = sell = fee = None
+
         if buy_asset:
             if buy_quantity is None:
                 raise RuntimeError("Missing buy_quantity")
@@ -534,14 +596,20 @@ class TransactionRow:
             sell,
             fee,
             Wallet(self.row_dict["Wallet"]),
-            self.parse_timestamp(),
+            timestamp,
             Note(self.row_dict["Note"]),
             self,
         )
 
+    @staticmethod
+    def _decimal(field: Union[Optional[Decimal], str]) -> Optional[Decimal]:
+        if isinstance(field, str):
+            raise RuntimeError("Unexpected field type")
+        return field
+
     def parse_timestamp(self) -> Timestamp:
         try:
-            timestamp = dateutil.parser.parse(self.row_dict["Timestamp"])
+            timestamp = TimestampParser.parse(self.row_dict["Timestamp"])
         except ValueError as e:
             raise TimestampParserError(
                 self.HEADER.index("Timestamp"), "Timestamp", self.row_dict["Timestamp"]
@@ -647,3 +715,34 @@ class TransactionRow:
         )
 
         return f"{worksheet_str}row[{self.row_num}] [{row_str}]{tid_str}"
+
+
+def _compile_validation_plans() -> Dict[TrType, Tuple[ValidationStep, ...]]:
+    # Resolve the column position and validator of each field once, rather than for every row
+    validators: Dict[
+        str, Callable[[TransactionRow, str, FieldRequired], Union[Optional[Decimal], str]]
+    ] = {
+        "Buy Quantity": TransactionRow.validate_quantity,
+        "Buy Asset": TransactionRow.validate_asset,
+        "Buy Value": TransactionRow.validate_value,
+        "Sell Quantity": TransactionRow.validate_quantity,
+        "Sell Asset": TransactionRow.validate_asset,
+        "Sell Value": TransactionRow.validate_value,
+        "Fee Quantity": TransactionRow.validate_quantity,
+        "Fee Asset": TransactionRow.validate_asset,
+        "Fee Value": TransactionRow.validate_value,
+    }
+
+    return {
+        t_type: tuple(
+            ValidationStep(
+                pos, TransactionRow.HEADER[pos], validators[TransactionRow.HEADER[pos]], required
+            )
+            for pos, required in enumerate(field_validation)
+            if TransactionRow.HEADER[pos] in validators
+        )
+        for t_type, field_validation in TransactionRow.TYPE_VALIDATION.items()
+    }
+
+
+TransactionRow.VALIDATION_PLANS = _compile_validation_plans()
@@ -167,6 +167,21 @@ class TaxCalculator:  # pylint: disable=too-many-instance-attributes
         self.tax_report: Dict[Year, TaxReportRecord] = {}
         self.holdings_report: Optional[HoldingsReportRecord] = None
 
+    @classmethod
+    def value_needed(cls, t: Union[Buy, Sell]) -> bool:
+        # Whether the value of a buy or sell, which is not part of a trade, is used by the tax
+        #  calculation, otherwise it does not need a price
+        if isinstance(t, Sell) and t.t_type in cls.NO_GAIN_NO_LOSS_TYPES:
+            # Proceeds are replaced by the cost, so the disposal balances
+            return False
+
+        if not t.is_crypto():
+            # Fiat is not pooled, so is only needed for income or margin trading
+            if t.t_type in cls.MARGIN_TYPES:
+                return True
+            return isinstance(t, Buy) and t.t_type in cls.INCOME_TYPES and config.fiat_income
+        return True
+
     def pool_same_day(self) -> None:
         transactions = copy.deepcopy(self.transactions)
         buy_transactions: Dict[Tuple[AssetSymbol, Date], Buy] = {}
@@ -491,12 +506,12 @@ class TaxCalculator:  # pylint: disable=too-many-instance-attributes
             if config.transfers_include and not skip_integrity_check:
                 self.holdings[t.asset].check_transfer_mismatch()
 
-    def process_income(self) -> None:
+    def process_income(self, tax_year: Optional[Year] = None) -> None:
         if config.debug:
             print(f"{Fore.CYAN}process income")
 
         for t in tqdm(
-            self.transactions,
+            self._transactions_in_year(tax_year),
             unit="t",
             desc=f"{Fore.CYAN}process income{Fore.GREEN}",
             disable=disable_tqdm(),
@@ -509,12 +524,12 @@ class TaxCalculator:  # pylint: disable=too-many-instance-attributes
                 tax_event = TaxEventIncome(t)
                 self.tax_events[self._which_tax_year(tax_event.date)].append(tax_event)
 
-    def process_margin_trades(self) -> None:
+    def process_margin_trades(self, tax_year: Optional[Year] = None) -> None:
         if config.debug:
             print(f"{Fore.CYAN}process margin trades")
 
         for t in tqdm(
-            self.transactions,
+            self._transactions_in_year(tax_year),
             unit="t",
             desc=f"{Fore.CYAN}process margin trades{Fore.GREEN}",
             disable=disable_tqdm(),
@@ -523,6 +538,14 @@ class TaxCalculator:  # pylint: disable=too-many-instance-attributes
                 tax_event = TaxEventMarginTrade(t)
                 self.tax_events[self._which_tax_year(tax_event.date)].append(tax_event)
 
+    def _transactions_in_year(self, tax_year: Optional[Year]) -> List[Union[Buy, Sell]]:
+        if tax_year is None:
+            return self.transactions
+
+        start = config.get_tax_year_start(tax_year)
+        end = config.get_tax_year_end(tax_year)
+        return [t for t in self.transactions if start <= t.date() <= end]
+
     def _all_transactions(self) -> List[Union[Buy, Sell]]:
         return self.buys_ordered + self.sells_ordered + self.other_transactions
 
@@ -564,6 +587,20 @@ class TaxCalculator:  # pylint: disable=too-many-instance-attributes
         return calc_margin_trading
 
     def calculate_holdings(self, value_asset: ValueAsset) -> None:
+        self.holdings_report = self.value_holdings(
+            {
+                h: (holding.quantity, (holding.cost + holding.fees).quantize(PRECISION))
+                for h, holding in self.holdings.items()
+                if holding.quantity > 0 or config.show_empty_wallets
+            },
+            value_asset,
+        )
+
+    @staticmethod
+    def value_holdings(
+        holdings_cost: Dict[AssetSymbol, Tuple[Decimal, Decimal]], value_asset: ValueAsset
+    ) -> HoldingsReportRecord:
+        # Values the quantity of each asset held at the latest price, against its cost
         holdings: Dict[AssetSymbol, HoldingsReportAsset] = {}
         totals: HoldingsReportTotal = {"cost": Decimal(0), "value": Decimal(0), "gain": Decimal(0)}
 
@@ -571,55 +608,49 @@ class TaxCalculator:  # pylint: disable=too-many-instance-attributes
             print(f"{Fore.CYAN}calculating holdings")
 
         with tqdm(
-            self.holdings,
+            holdings_cost,
             unit="h",
             desc=f"{Fore.CYAN}calculating holdings{Fore.GREEN}",
             disable=disable_tqdm(),
         ) as progress_bar:
             value_asset.price_data.progress_bar = progress_bar
             for h in progress_bar:
-                if self.holdings[h].quantity > 0 or config.show_empty_wallets:
-                    api_error = False
-                    try:
-                        value, name, _ = value_asset.get_current_value(
-                            self.holdings[h].asset, self.holdings[h].quantity
-                        )
-                    except DataSourceApiError as e:
-                        bt_tqdm_write(
-                            f"{WARNING} Skipping valuation of {self.holdings[h].asset} "
-                            f"due to API failure: {e}"
-                        )
-                        value = None
-                        name = AssetName("")
-                        api_error = True
-
-                    value = value.quantize(PRECISION) if value is not None else None
-                    cost = (self.holdings[h].cost + self.holdings[h].fees).quantize(PRECISION)
-
-                    if value is not None:
-                        holdings[h] = {
-                            "name": name,
-                            "quantity": self.holdings[h].quantity,
-                            "cost": cost,
-                            "value": value,
-                            "gain": value - cost,
-                        }
-
-                        totals["value"] += value
-                        totals["gain"] += value - cost
-                    else:
-                        holdings[h] = {
-                            "name": name,
-                            "quantity": self.holdings[h].quantity,
-                            "cost": cost,
-                            "value": None,
-                        }
-                        if api_error:
-                            holdings[h]["api_error"] = True
-
-                    totals["cost"] += holdings[h]["cost"]
-
-        self.holdings_report = {"holdings": holdings, "totals": totals}
+                quantity, cost = holdings_cost[h]
+                api_error = False
+                try:
+                    value, name, _ = value_asset.get_current_value(h, quantity)
+                except DataSourceApiError as e:
+                    bt_tqdm_write(f"{WARNING} Skipping valuation of {h} due to API failure: {e}")
+                    value = None
+                    name = AssetName("")
+                    api_error = True
+
+                value = value.quantize(PRECISION) if value is not None else None
+
+                if value is not None:
+                    holdings[h] = {
+                        "name": name,
+                        "quantity": quantity,
+                        "cost": cost,
+                        "value": value,
+                        "gain": value - cost,
+                    }
+
+                    totals["value"] += value
+                    totals["gain"] += value - cost
+                else:
+                    holdings[h] = {
+                        "name": name,
+                        "quantity": quantity,
+                        "cost": cost,
+                        "value": None,
+                    }
+                    if api_error:
+                        holdings[h]["api_error"] = True
+
+                totals["cost"] += holdings[h]["cost"]
+
+        return {"holdings": holdings, "totals": totals}
 
     def _which_tax_year(self, date: Date) -> Year:
         if date > config.get_tax_year_end(date.year):
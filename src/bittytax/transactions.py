@@ -4,7 +4,7 @@
 import copy
 import re
 from decimal import Decimal
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 from colorama import Fore, Style
 from tqdm import tqdm
@@ -18,9 +18,13 @@ from .utils import disable_tqdm
 
 class TransactionHistory:
     def __init__(
-        self, transaction_records: List[TransactionRecord], value_asset: ValueAsset
+        self,
+        transaction_records: List[TransactionRecord],
+        value_asset: ValueAsset,
+        value_needed: Optional[Callable[[Union["Buy", "Sell"]], bool]] = None,
     ) -> None:
         self.value_asset = value_asset
+        self.value_needed = value_needed
         self.transactions: List[Union[Buy, Sell]] = []
 
         if config.debug:
@@ -126,13 +130,13 @@ class TransactionHistory:
         if tr.buy and tr.buy.acquisition and tr.buy.cost is None:
             if tr.sell:
                 tr.buy.cost, tr.buy.cost_origin = self.which_asset_value(tr.buy, tr.sell)
-            else:
+            elif self._is_value_needed(tr.buy):
                 tr.buy.cost, tr.buy.cost_origin = self.value_asset.get_value(tr.buy)
 
         if tr.sell and tr.sell.disposal and tr.sell.proceeds is None:
             if tr.buy:
                 tr.sell.proceeds, tr.sell.proceeds_origin = tr.buy.cost, tr.buy.cost_origin
-            else:
+            elif self._is_value_needed(tr.sell):
                 tr.sell.proceeds, tr.sell.proceeds_origin = self.value_asset.get_value(tr.sell)
 
         if tr.fee and tr.fee.disposal and tr.fee.proceeds is None:
@@ -179,6 +183,16 @@ class TransactionHistory:
                 # Fee paid in fiat
                 tr.fee.proceeds, tr.fee.proceeds_origin = self.value_asset.get_value(tr.fee)
 
+    def _is_value_needed(self, t: Union["Buy", "Sell"]) -> bool:
+        if self.value_needed is None:
+            return True
+
+        if not self.value_needed(t):
+            if config.debug:
+                print(f"{Fore.BLUE}split:   {t} <- value not needed")
+            return False
+        return True
+
     def which_asset_value(self, buy: "Buy", sell: "Sell") -> Tuple[Decimal, ValueOrigin]:
         if config.trade_asset_type == config.TRADE_ASSET_TYPE_BUY:
             if buy.cost is None:
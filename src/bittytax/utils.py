@@ -1,5 +1,6 @@
+import contextlib
 import sys
-from typing import Any, Optional, TextIO
+from typing import Any, Iterator, Optional, TextIO
 
 from tqdm import tqdm
 
@@ -40,3 +41,33 @@ def bt_print(
 
 def is_compiled() -> bool:
     return "__compiled__" in globals()
+
+
+@contextlib.contextmanager
+def file_lock(filename: str) -> Iterator[None]:
+    # Held by one process at a time, other processes wait until it's released
+    with open(f"{filename}.lock", "a+b") as lock_file:
+        if sys.platform == "win32":
+            import msvcrt  # pylint: disable=import-outside-toplevel,import-error
+
+            lock_file.seek(0)
+            while True:
+                try:
+                    # Only retries for 10 seconds before raising an error
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl  # pylint: disable=import-outside-toplevel
+
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
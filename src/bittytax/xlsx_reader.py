@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+# (c) Nano Nano Ltd 2026
+
+import functools
+import posixpath
+import zipfile
+from typing import IO, Dict, Iterator, List, Optional, Set, Tuple, Union
+from xml.etree import ElementTree
+
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.cell import column_index_from_string, get_column_letter, range_boundaries
+from openpyxl.utils.datetime import (
+    CALENDAR_MAC_1904,
+    CALENDAR_WINDOWS_1900,
+    from_excel,
+    from_ISO8601,
+)
+
+SHEET_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+ROW_TAG = f"{{{SHEET_MAIN_NS}}}row"
+CELL_TAG = f"{{{SHEET_MAIN_NS}}}c"
+VALUE_TAG = f"{{{SHEET_MAIN_NS}}}v"
+INLINE_STRING_TAG = f"{{{SHEET_MAIN_NS}}}is"
+TEXT_TAG = f"{{{SHEET_MAIN_NS}}}t"
+RICH_TEXT_TAG = f"{{{SHEET_MAIN_NS}}}r"
+STRING_TAG = f"{{{SHEET_MAIN_NS}}}si"
+DIMENSION_TAG = f"{{{SHEET_MAIN_NS}}}dimension"
+DATA_TAG = f"{{{SHEET_MAIN_NS}}}sheetData"
+
+# Row values, and the font colour (aRGB) of each non-empty cell
+XlsxRow = Tuple[List[str], List[Optional[str]]]
+
+
+class XlsxReaderError(Exception):
+    pass
+
+
+class XlsxWorkbook:
+    """Streaming reader for xlsx files which yields rows of plain strings.
+
+    Values are converted the same way as openpyxl (read_only and data_only), i.e. str(cell.value),
+    but without creating a cell object for every value. Any workbook structure which isn't
+    supported raises XlsxReaderError, so the caller can fall back to using openpyxl.
+    """
+
+    def __init__(self, file: Union[str, IO[bytes]]) -> None:
+        try:
+            self.archive = zipfile.ZipFile(file)  # pylint: disable=consider-using-with
+        except (zipfile.BadZipFile, OSError) as e:
+            raise XlsxReaderError(str(e)) from e
+
+        try:
+            self._read_workbook()
+        except (KeyError, ValueError, ElementTree.ParseError) as e:
+            self.archive.close()
+            raise XlsxReaderError(str(e)) from e
+
+    def __enter__(self) -> "XlsxWorkbook":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.archive.close()
+
+    def _read_workbook(self) -> None:
+        workbook_path = self._get_rel_targets("_rels/.rels", "")["officeDocument"][0]
+        workbook = ElementTree.fromstring(self.archive.read(workbook_path))
+        if workbook.tag != f"{{{SHEET_MAIN_NS}}}workbook":
+            raise XlsxReaderError(f"Unsupported workbook: {workbook.tag}")
+
+        workbook_dir = posixpath.dirname(workbook_path)
+        rels_path = posixpath.join(
+            workbook_dir, "_rels", posixpath.basename(workbook_path) + ".rels"
+        )
+        rel_targets = self._get_rel_targets(rels_path, workbook_dir)
+        rel_ids = self._get_rel_ids(rels_path, workbook_dir)
+
+        self.epoch = CALENDAR_WINDOWS_1900
+        workbook_pr = workbook.find(f"{{{SHEET_MAIN_NS}}}workbookPr")
+        if workbook_pr is not None and workbook_pr.get("date1904") in ("1", "true"):
+            self.epoch = CALENDAR_MAC_1904
+
+        self.sheets: List[Tuple[str, str]] = []
+        for sheet in workbook.iter(f"{{{SHEET_MAIN_NS}}}sheet"):
+            sheet_type, sheet_path = rel_ids[sheet.attrib[f"{{{REL_NS}}}id"]]
+            if sheet_type != "worksheet":
+                raise XlsxReaderError(f"Unsupported sheet type: {sheet_type}")
+            self.sheets.append((sheet.attrib["name"], sheet_path))
+
+        self.shared_strings: List[str] = []
+        if "sharedStrings" in rel_targets:
+            self.shared_strings = self._read_shared_strings(rel_targets["sharedStrings"][0])
+
+        self.date_formats: Set[int] = set()
+        self.timedelta_formats: Set[int] = set()
+        self.font_colors: List[Optional[str]] = []
+        if "styles" in rel_targets:
+            self._read_styles(rel_targets["styles"][0])
+
+    def _get_rel_ids(self, rels_path: str, base_dir: str) -> Dict[str, Tuple[str, str]]:
+        rels = ElementTree.fromstring(self.archive.read(rels_path))
+        rel_ids = {}
+        for rel in rels.iter(f"{{{PKG_REL_NS}}}Relationship"):
+            target = rel.attrib["Target"]
+            if target.startswith("/"):
+                path = target.lstrip("/")
+            else:
+                path = posixpath.normpath(posixpath.join(base_dir, target))
+            rel_ids[rel.attrib["Id"]] = (rel.attrib["Type"].rsplit("/", 1)[-1], path)
+        return rel_ids
+
+    def _get_rel_targets(self, rels_path: str, base_dir: str) -> Dict[str, List[str]]:
+        rel_targets: Dict[str, List[str]] = {}
+        for rel_type, path in self._get_rel_ids(rels_path, base_dir).values():
+            rel_targets.setdefault(rel_type, []).append(path)
+        return rel_targets
+
+    def _read_shared_strings(self, path: str) -> List[str]:
+        shared_strings = []
+        with self.archive.open(path) as source:
+            for _, element in ElementTree.iterparse(source):
+                if element.tag == STRING_TAG:
+                    shared_strings.append(self.get_text(element).replace("x005F_", ""))
+                    element.clear()
+        return shared_strings
+
+    def _read_styles(self, path: str) -> None:
+        styles = ElementTree.fromstring(self.archive.read(path))
+
+        custom_formats = {}
+        num_fmts = styles.find(f"{{{SHEET_MAIN_NS}}}numFmts")
+        if num_fmts is not None:
+            for num_fmt in num_fmts:
+                custom_formats[int(num_fmt.attrib["numFmtId"])] = num_fmt.get("formatCode")
+
+        font_colors: List[Optional[str]] = []
+        fonts = styles.find(f"{{{SHEET_MAIN_NS}}}fonts")
+        if fonts is not None:
+            for font in fonts:
+                font_colors.append(self._get_font_color(font))
+
+        cell_xfs = styles.find(f"{{{SHEET_MAIN_NS}}}cellXfs")
+        if cell_xfs is None:
+            return
+
+        for idx, xf in enumerate(cell_xfs):
+            num_fmt_id = int(xf.get("numFmtId", 0))
+            fmt = custom_formats.get(num_fmt_id, BUILTIN_FORMATS.get(num_fmt_id))
+            if is_date_format(fmt):
+                self.date_formats.add(idx)
+            if is_timedelta_format(fmt):
+                self.timedelta_formats.add(idx)
+
+            font_id = int(xf.get("fontId", 0))
+            self.font_colors.append(font_colors[font_id] if font_id < len(font_colors) else None)
+
+    @staticmethod
+    def _get_font_color(font: ElementTree.Element) -> Optional[str]:
+        color = font.find(f"{{{SHEET_MAIN_NS}}}color")
+        if color is None or any(attr in color.attrib for attr in ("indexed", "theme", "auto")):
+            return None
+
+        rgb = color.get("rgb")
+        if rgb and len(rgb) == 6:
+            return "00" + rgb
+        return rgb
+
+    @staticmethod
+    def get_text(element: ElementTree.Element) -> str:
+        # Plain text, or the text of each rich text run, phonetic text is ignored
+        snippets = []
+        plain = element.find(TEXT_TAG)
+        if plain is not None and plain.text is not None:
+            snippets.append(plain.text)
+
+        for run in element.findall(RICH_TEXT_TAG):
+            text = run.find(TEXT_TAG)
+            if text is not None and text.text is not None:
+                snippets.append(text.text)
+
+        return "".join(snippets)
+
+    @property
+    def sheetnames(self) -> List[str]:
+        return [name for name, _ in self.sheets]
+
+    def worksheets(self) -> Iterator["XlsxWorksheet"]:
+        for name, path in self.sheets:
+            yield XlsxWorksheet(self, name, path)
+
+
+class XlsxWorksheet:
+    def __init__(self, workbook: XlsxWorkbook, title: str, path: str) -> None:
+        self.workbook = workbook
+        self.title = title
+        self.path = path
+        self.max_row: Optional[int] = None
+        self.max_column: Optional[int] = None
+        self._read_dimensions()
+
+    def _read_dimensions(self) -> None:
+        with self.workbook.archive.open(self.path) as source:
+            for _, element in ElementTree.iterparse(source):
+                if element.tag == DIMENSION_TAG:
+                    self._set_dimensions(element.get("ref", ""))
+                    return
+                if element.tag in (ROW_TAG, DATA_TAG):
+                    # Dimensions missing
+                    return
+
+    def _set_dimensions(self, ref: str) -> None:
+        try:
+            min_col, min_row, max_col, max_row = range_boundaries(ref)
+        except (ValueError, TypeError):
+            return
+
+        if not all([max_col, max_row]):
+            return
+
+        # Dimensions are often incorrect, in which case they are ignored
+        dimensions = f"{get_column_letter(min_col)}{min_row}:{get_column_letter(max_col)}{max_row}"
+        if dimensions == "A1:A1" or dimensions.endswith("1048576"):
+            return
+
+        self.max_row = max_row
+        self.max_column = max_col
+
+    def rows(self) -> Iterator[List[str]]:
+        for values, _ in self.rows_with_font_colors():
+            yield values
+
+    def rows_with_font_colors(self) -> Iterator[XlsxRow]:
+        # Missing rows and cells are filled in, the same as openpyxl
+        empty_row: XlsxRow = ([], [])
+        if self.max_column is not None:
+            empty_row = ([""] * self.max_column, [None] * self.max_column)
+
+        counter = 1
+        idx = 1
+        for idx, cells in self._parse_rows():
+            if self.max_row is not None and idx > self.max_row:
+                break
+
+            for _ in range(counter, idx):
+                counter += 1
+                yield list(empty_row[0]), list(empty_row[1])
+
+            if counter <= idx:
+                counter += 1
+                yield self._get_row(cells)
+
+        if self.max_row is not None and self.max_row < idx:
+            for _ in range(counter, self.max_row + 1):
+                yield list(empty_row[0]), list(empty_row[1])
+
+    def _get_row(self, cells: List[Tuple[int, str, Optional[str]]]) -> XlsxRow:
+        if not cells and not self.max_column:
+            return [], []
+
+        max_col = self.max_column or cells[-1][0]
+        values = [""] * max_col
+        font_colors: List[Optional[str]] = [None] * max_col
+
+        for column, value, font_color in cells:
+            if 1 <= column <= max_col:
+                values[column - 1] = value
+                font_colors[column - 1] = font_color
+
+        return values, font_colors
+
+    def _parse_rows(self) -> Iterator[Tuple[int, List[Tuple[int, str, Optional[str]]]]]:
+        font_colors = self.workbook.font_colors
+        row_counter = 0
+        sheet_data = None
+
+        with self.workbook.archive.open(self.path) as source:
+            for event, element in ElementTree.iterparse(source, events=("start", "end")):
+                if event == "start":
+                    if element.tag == DATA_TAG:
+                        sheet_data = element
+                    continue
+
+                if element.tag != ROW_TAG:
+                    continue
+
+                row_num = element.get("r")
+                if row_num:
+                    row_counter = int(float(row_num))
+                else:
+                    row_counter += 1
+
+                cells = []
+                col_counter = 0
+                for cell in element.findall(CELL_TAG):
+                    coordinate = cell.get("r")
+                    if coordinate:
+                        col_counter = self._get_column_index(coordinate)
+                    else:
+                        col_counter += 1
+
+                    style_id = int(cell.get("s", 0))
+                    value = self._get_value(cell, style_id)
+                    if value and style_id < len(font_colors):
+                        cells.append((col_counter, value, font_colors[style_id]))
+                    else:
+                        cells.append((col_counter, value, None))
+
+                if sheet_data is not None:
+                    # Rows already read are removed, not just emptied, so they aren't kept
+                    sheet_data.clear()
+                else:
+                    element.clear()
+                yield row_counter, cells
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _column_index(column: str) -> int:
+        return column_index_from_string(column)
+
+    def _get_column_index(self, coordinate: str) -> int:
+        return self._column_index(coordinate.rstrip("0123456789"))
+
+    def _get_value(  # pylint: disable=too-many-return-statements
+        self, cell: ElementTree.Element, style_id: int
+    ) -> str:
+        data_type = cell.get("t", "n")
+
+        if data_type == "inlineStr":
+            inline_string = cell.find(INLINE_STRING_TAG)
+            if inline_string is not None:
+                return XlsxWorkbook.get_text(inline_string)
+            return ""
+
+        value = cell.findtext(VALUE_TAG)
+        if not value:
+            return ""
+
+        if data_type == "n":
+            number = float(value) if "." in value or "E" in value or "e" in value else int(value)
+            if style_id in self.workbook.date_formats:
+                try:
+                    return str(
+                        from_excel(
+                            number,
+                            self.workbook.epoch,
+                            timedelta=style_id in self.workbook.timedelta_formats,
+                        )
+                    )
+                except (OverflowError, ValueError):
+                    return "#VALUE!"
+            return str(number)
+        if data_type == "s":
+            return self.workbook.shared_strings[int(value)]
+        if data_type == "b":
+            return str(bool(int(value)))
+        if data_type == "d":
+            return str(from_ISO8601(value))
+
+        # Includes "str" (formula string) and "e" (error)
+        return value
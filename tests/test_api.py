@@ -0,0 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from bittytax.api import Session, TaxReports, calculate, convert
+from bittytax.bt_types import TaxRules
+from bittytax.config import config
+
+CSV_DATA = (
+    "Type,Buy Quantity,Buy Asset,Buy Value in GBP,Sell Quantity,Sell Asset,Sell Value in GBP,"
+    "Fee Quantity,Fee Asset,Fee Value in GBP,Wallet,Timestamp,Note,Raw Data\n"
+    "Trade,1,BTC,1000,1000,GBP,,,,,Wallet,2022-03-01T10:00:00 UTC,,\n"
+    "Trade,2000,GBP,,1,BTC,2000,,,,Wallet,2022-05-01T10:00:00 UTC,,\n"
+)
+
+
+def _job(filename: str, tax_rules: TaxRules) -> TaxReports:
+    with Session() as session:
+        transaction_records = convert([filename], session=session)
+        return calculate(transaction_records, tax_rules, summary_only=True, session=session)
+
+
+def test_session_config() -> None:
+    with Session() as session:
+        config.start_of_year_month = 1
+        assert session.config.start_of_year_month == 1
+
+    assert config.start_of_year_month == 4
+
+
+def test_concurrent_jobs(tmp_path: Path) -> None:
+    filename = str(tmp_path / "records.csv")
+    with open(filename, "w", encoding="utf-8") as csv_file:
+        csv_file.write(CSV_DATA)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        individual, company = executor.map(
+            _job, [filename] * 2, [TaxRules.UK_INDIVIDUAL, TaxRules.UK_COMPANY_JAN]
+        )
+
+    # Each job has its own start of the tax year, and transaction IDs
+    assert list(individual.tax_report) == [2023]
+    assert list(company.tax_report) == [2022]
+    assert individual.audit.totals == company.audit.totals
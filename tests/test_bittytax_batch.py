@@ -0,0 +1,51 @@
+import datetime
+from pathlib import Path
+
+import pytest
+
+from bittytax.api import load_records
+from bittytax.bittytax_batch import BatchClient, read_manifest, run_batch
+from bittytax.bt_types import AssetSymbol
+from bittytax.price.valueasset import PriceDemand
+from bittytax.transactions import TransactionHistory
+
+CSV_DATA = (
+    "Type,Buy Quantity,Buy Asset,Buy Value,Sell Quantity,Sell Asset,Sell Value,"
+    "Fee Quantity,Fee Asset,Fee Value,Wallet,Timestamp,Note\n"
+    "Income,0.5,BTC,,,,,,,,Wallet,2022-03-01T10:00:00,\n"
+    "Trade,1,ETH,,1000,GBP,,,,,Wallet,2022-03-01T12:00:00,\n"
+    "Trade,1,BTC,20000,1,ETH,,,,,Wallet,2022-05-01T10:00:00,\n"
+)
+
+
+def test_price_demand(tmp_path: Path) -> None:
+    (tmp_path / "records.csv").write_text(CSV_DATA, encoding="utf-8")
+    price_demand = PriceDemand()
+
+    TransactionHistory(load_records(str(tmp_path / "records.csv")), price_demand)
+
+    # Only the income has no value, the trades are valued by the other asset
+    assert list(price_demand.demand) == [(AssetSymbol("BTC"), datetime.date(2022, 3, 1))]
+
+
+def test_read_manifest_invalid(tmp_path: Path) -> None:
+    (tmp_path / "manifest.json").write_text('[{"filename": "records.csv"}]', encoding="utf-8")
+
+    with pytest.raises(ValueError, match="client 1 is missing the output"):
+        read_manifest(str(tmp_path / "manifest.json"))
+
+
+def test_batch_results(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "records.csv").write_text(CSV_DATA, encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+
+    results = run_batch(
+        [
+            BatchClient("records.csv", "client1", ["--audit", "--report-format", "json"]),
+            BatchClient("missing.csv", "client2", ["--audit"]),
+        ]
+    )
+
+    assert [result.success for result in results] == [True, False]
+    assert (tmp_path / "client1.json").exists()
+    assert "File could not be read: missing.csv" in results[1].reason()
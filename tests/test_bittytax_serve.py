@@ -0,0 +1,62 @@
+import functools
+import http.server
+import json
+import multiprocessing
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from bittytax.bittytax_serve import JobRequestHandler, JobRunner
+from bittytax.config import config
+
+CSV_DATA = (
+    "Type,Buy Quantity,Buy Asset,Buy Value,Sell Quantity,Sell Asset,Sell Value,"
+    "Fee Quantity,Fee Asset,Fee Value,Wallet,Timestamp,Note\n"
+    "Deposit,1.5,BTC,,,,,,,,Wallet,2022-05-20T22:32:11,\n"
+)
+
+pytestmark = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="requires fork"
+)
+
+
+def test_job_is_isolated(tmp_path: Path) -> None:
+    (tmp_path / "records.csv").write_text(CSV_DATA, encoding="utf-8")
+    start_of_year_month = config.start_of_year_month
+
+    result = JobRunner(1).run_job(
+        "tax", ["records.csv", "--audit", "--nopdf", "--taxrules", "UK_COMPANY_JAN"], str(tmp_path)
+    )
+
+    assert result["exit_code"] == 0
+    assert "import successful (success=1, failure=0)" in result["stdout"]
+    # The company tax rules only changed the config of the job's process
+    assert config.start_of_year_month == start_of_year_month
+
+
+def test_job_usage_error(tmp_path: Path) -> None:
+    result = JobRunner(1).run_job("conv", ["--bogus"], str(tmp_path))
+
+    assert result["exit_code"] == 2
+    assert "bittytax_conv: error:" in result["stderr"]
+
+
+def test_port_requires_token() -> None:
+    handler = functools.partial(JobRequestHandler, runner=JobRunner(1), token="secret")
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/status"
+
+    try:
+        with pytest.raises(urllib.error.HTTPError, match="401"):
+            urllib.request.urlopen(url)  # pylint: disable=consider-using-with
+
+        request = urllib.request.Request(url, headers={"Authorization": "Bearer secret"})
+        with urllib.request.urlopen(request) as response:
+            assert json.load(response)["jobs"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
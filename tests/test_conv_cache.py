@@ -0,0 +1,73 @@
+import argparse
+import pickle
+import sys
+from pathlib import Path
+
+import pytest
+
+from bittytax.conv import bittytax_conv
+from bittytax.conv.conv_cache import ConvCache
+from bittytax.conv.dataparser import DataParser
+from bittytax.conv.exceptions import DataFileWorkerError
+
+ARGS = argparse.Namespace(unconfirmed=False, cryptoasset="")
+
+
+class _ParseError(Exception):
+    # Can't be unpickled, as its arguments are not passed to Exception
+    def __init__(self, row: int, reason: str) -> None:
+        super().__init__(f"row {row}: {reason}")
+
+
+def test_parser_pickled_by_id(monkeypatch: pytest.MonkeyPatch) -> None:
+    parser = next(p for p in DataParser.parsers if p.row_handler)
+    pickled = pickle.dumps(parser)
+
+    # The same parser is found, even if the parsers are registered in a different order
+    monkeypatch.setattr(DataParser, "parsers", list(reversed(DataParser.parsers)))
+    unpickled = pickle.loads(pickled)
+    assert unpickled.parser_id == parser.parser_id
+    assert unpickled.row_handler is parser.row_handler
+    assert unpickled.header is parser.header
+
+    monkeypatch.setattr(
+        DataParser, "parsers", [p for p in DataParser.parsers if p.parser_id != parser.parser_id]
+    )
+    with pytest.raises(ValueError):
+        pickle.loads(pickled)
+
+
+def test_worker_error_unpicklable(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def read_file(*_args: object) -> None:
+        raise _ParseError(2, "bad row")
+
+    monkeypatch.setattr(bittytax_conv, "_do_read_file", read_file)
+    (tmp_path / "data.csv").write_text("Header\n", encoding="utf-8")
+
+    # The error is returned by the worker as one which can be unpickled by the parent
+    result = bittytax_conv._read_file_job(  # pylint: disable=protected-access
+        str(tmp_path / "data.csv"), ARGS, None
+    )
+    error = pickle.loads(pickle.dumps(result.error))
+    assert isinstance(error, DataFileWorkerError)
+    assert str(error).endswith("_ParseError: row 2: bad row")
+
+
+def test_serial_messages_not_captured(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture
+) -> None:
+    def read_file(*_args: object) -> None:
+        sys.stderr.write("warning\n")
+
+    monkeypatch.setattr(bittytax_conv, "_do_read_file", read_file)
+    monkeypatch.setattr(ConvCache, "CONV_CACHE_DIR", str(tmp_path / "conv"))
+    (tmp_path / "data.csv").write_text("Header\n", encoding="utf-8")
+    conv_cache = ConvCache(ARGS)
+
+    # Written as the file is parsed, and saved to the cache so a cache hit writes them again
+    result = bittytax_conv._parse_file(  # pylint: disable=protected-access
+        "", "hash", str(tmp_path / "data.csv"), ARGS, conv_cache, capture=False
+    )
+    assert capsys.readouterr().err == "warning\n"
+    assert result.messages == ""
+    assert conv_cache.load(str(tmp_path / "data.csv"), "hash") == ([], "warning\n")
@@ -0,0 +1,42 @@
+import io
+from pathlib import Path
+from typing import List, Tuple
+
+from bittytax.config import config
+from bittytax.import_records import ImportRecords
+
+config.ccy = "GBP"
+
+CSV_DATA = (
+    "Type,Buy Quantity,Buy Asset,Buy Value,Sell Quantity,Sell Asset,Sell Value,"
+    "Fee Quantity,Fee Asset,Fee Value,Wallet,Timestamp,Note\n"
+    "Deposit,1.5,BTC,,,,,,,,Wallet,2022-05-20T22:32:11,\n"
+    "Trade,10,ETH,,0.5,BTC,,0.01,ETH,,Wallet,2022-05-21T10:00:00,\n"
+    "Withdrawal,,,,0.5,BTC,,,,,Wallet,2022-05-19T09:00:00,\n"
+    "Deposit,abc,ETH,,,,,,,,Wallet,2022-05-20T22:32:11,\n"
+    ",,,,,,,,,,,,\n"
+    "Trade,1,ETH,,,,,,,,Wallet,2022-05-20T22:32:11,\n"
+    "Withdrawal,,,,2,ETH,,,,,Wallet,2022-05-18T09:00:00,\n"
+)
+
+
+def _import(filename: str, jobs: int) -> Tuple[List[str], List[int], int, int]:
+    import_records = ImportRecords(jobs)
+    import_records.CHUNK_ROWS = 2
+    with io.open(filename, newline="", encoding="utf-8") as csv_file:
+        import_records.import_csv(csv_file, filename)
+
+    t_rows = [str(t_row) for t_row in import_records.t_rows]
+    # Transaction IDs are allocated in this order
+    row_nums = [t_record.t_row.row_num for t_record in import_records.get_records()]
+    return t_rows, row_nums, import_records.success_cnt, import_records.failure_cnt
+
+
+def test_jobs_same_as_serial(tmp_path: Path) -> None:
+    filename = str(tmp_path / "records.csv")
+    with open(filename, "w", encoding="utf-8") as csv_file:
+        csv_file.write(CSV_DATA)
+
+    serial = _import(filename, 1)
+    assert serial[2:] == (4, 2)
+    assert _import(filename, 2) == serial
@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Cumulative import time of the accounting tool, in microseconds
+IMPORT_TIME_BUDGET = 500000
+
+# Only imported on the code paths which need them
+LAZY_MODULES = {
+    "jinja2",
+    "openpyxl",
+    "pypdf",
+    "requests",
+    "xhtml2pdf",
+    "xlrd",
+    "xlsxwriter",
+    "yaml",
+}
+
+
+def test_import_time(tmp_path: Path) -> None:
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import sys, bittytax.bittytax; print(' '.join(sys.modules))",
+        ],
+        capture_output=True,
+        check=True,
+        env={**os.environ, "BITTYTAX_DATA_DIR": str(tmp_path)},
+        text=True,
+    )
+
+    assert not LAZY_MODULES & set(result.stdout.split())
+    # The config file is only read when it's first needed
+    assert not (tmp_path / ".bittytax").exists()
+
+    import_time = next(
+        int(line.split("|")[1])
+        for line in result.stderr.splitlines()
+        if line.split("|")[-1].strip() == "bittytax.bittytax"
+    )
+    assert import_time < IMPORT_TIME_BUDGET
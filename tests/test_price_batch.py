@@ -0,0 +1,58 @@
+import datetime
+import io
+from decimal import Decimal
+from typing import List, Tuple
+
+import pytest
+
+from bittytax.bt_types import AssetName, AssetSymbol, DataSourceName, Date, Timestamp
+from bittytax.config import config
+from bittytax.price.pricebatch import PriceQuery, price_queries, read_queries
+from bittytax.price.pricedata import PriceDataRecord
+from bittytax.price.valueasset import ValueAsset
+from bittytax.session import Session
+
+QUERIES = 'Asset,Date,Quantity\neth,2022-03-02,2\nETH,01/03/2022,\nUSD,,"1,000"\n'
+
+
+class FixedPrice(ValueAsset):
+    def __init__(self) -> None:  # pylint: disable=super-init-not-called
+        self.lookups: List[Tuple[AssetSymbol, str]] = []
+
+    def get_historical_price(self, asset: AssetSymbol, timestamp: Timestamp) -> PriceDataRecord:
+        self.lookups.append((asset, f"{timestamp:%Y-%m-%d}"))
+        return PriceDataRecord(AssetName(asset), DataSourceName("Test"), price_ccy=Decimal(2))
+
+    def get_latest_price(self, asset: AssetSymbol) -> PriceDataRecord:
+        self.lookups.append((asset, "latest"))
+        return PriceDataRecord(AssetName(asset), DataSourceName("Test"), price_ccy=Decimal(3))
+
+
+def test_read_queries() -> None:
+    assert read_queries(io.StringIO(QUERIES)) == [
+        PriceQuery(AssetSymbol("ETH"), Date(datetime.date(2022, 3, 2)), Decimal(2)),
+        PriceQuery(AssetSymbol("ETH"), Date(datetime.date(2022, 3, 1))),
+        PriceQuery(AssetSymbol("USD"), None, Decimal(1000)),
+    ]
+
+    with pytest.raises(ValueError, match="row 2 date format is not valid"):
+        read_queries(io.StringIO("Asset,Date\nBTC,1st March\n"))
+
+
+def test_price_queries() -> None:
+    value_asset = FixedPrice()
+    with Session():
+        config.config["price_via_btc"] = True
+        results = list(price_queries(read_queries(io.StringIO(QUERIES)), value_asset, jobs=2))
+
+    assert [(r["asset"], r["price"], r["value"]) for r in results] == [
+        ("ETH", Decimal(2), Decimal(4)),
+        ("ETH", Decimal(2), None),
+        ("USD", Decimal(3), Decimal(3000)),
+    ]
+    # The BTC prices are needed first, then each asset is priced once per date, in date order
+    assert value_asset.lookups[:2] == [("BTC", "2022-03-01"), ("BTC", "2022-03-02")]
+    assert [lookup for lookup in value_asset.lookups if lookup[0] == "ETH"] == [
+        ("ETH", "2022-03-01"),
+        ("ETH", "2022-03-02"),
+    ]
@@ -0,0 +1,104 @@
+import datetime
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from decimal import Decimal
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from bittytax.bt_types import AssetId, Date, SourceUrl, Timestamp, TradingPair
+from bittytax.price import datasource
+from bittytax.price.datasource import DataSourceBase
+
+PAIR = TradingPair("BTC/GBP")
+
+
+def _data_source(day: int, price: str) -> DataSourceBase:
+    data_source = DataSourceBase()
+    data_source.prices = {
+        PAIR: {
+            AssetId("bitcoin"): {
+                Date(datetime.date(2022, 3, day)): {"price": Decimal(price), "url": SourceUrl("")}
+            }
+        }
+    }
+    data_source._prices_dirty = True  # pylint: disable=protected-access
+    return data_source
+
+
+def test_save_prices_merged(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(datasource, "CACHE_DIR", str(tmp_path))
+
+    # Both loaded before either saved, the prices saved first are not lost
+    first = _data_source(1, "30000")
+    second = _data_source(2, "31000")
+    first.save_prices()
+    second.save_prices()
+
+    with open(tmp_path / "DataSourceBase.json", "r", encoding="utf-8") as price_cache:
+        prices = json.load(price_cache)[PAIR]["bitcoin"]["prices"]
+    assert prices == {
+        "2022-03-01": {"price": "30000", "url": ""},
+        "2022-03-02": {"price": "31000", "url": ""},
+    }
+    assert list(second.prices[PAIR][AssetId("bitcoin")]) == [
+        datetime.date(2022, 3, 2),
+        datetime.date(2022, 3, 1),
+    ]
+
+
+def _fetch_and_save(day: int) -> None:
+    # Runs in a forked worker, with its own copy of the data source, like a batch client
+    data_source = _shared_data_sources[0]
+    data_source.prices[PAIR][AssetId("bitcoin")][Date(datetime.date(2022, 3, day))] = {
+        "price": Decimal(day),
+        "url": SourceUrl(""),
+    }
+    data_source._prices_dirty = True  # pylint: disable=protected-access
+    data_source.save_prices()
+
+
+_shared_data_sources: List[DataSourceBase] = []
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="requires fork")
+def test_save_prices_forked(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(datasource, "CACHE_DIR", str(tmp_path))
+    parent = _data_source(1, "30000")
+    parent.save_prices()
+    _shared_data_sources[:] = [parent]
+
+    with ProcessPoolExecutor(
+        max_workers=4, mp_context=multiprocessing.get_context("fork")
+    ) as executor:
+        list(executor.map(_fetch_and_save, range(2, 21)))
+
+    # The prices saved by the parent, and every worker, are kept
+    with open(tmp_path / "DataSourceBase.json", "r", encoding="utf-8") as price_cache:
+        assert len(json.load(price_cache)[PAIR]["bitcoin"]["prices"]) == 20
+
+
+def test_shared_data_source_threads(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(datasource, "CACHE_DIR", str(tmp_path))
+    data_source = DataSourceBase()
+
+    def fetch(day: int) -> None:
+        date = datetime.datetime(2022, 1, 1, tzinfo=datetime.timezone.utc) + datetime.timedelta(
+            days=day
+        )
+        data_source._update_prices(  # pylint: disable=protected-access
+            PAIR,
+            AssetId("bitcoin"),
+            {Date(date.date()): {"price": Decimal(day), "url": SourceUrl("")}},
+            Timestamp(date),
+        )
+        data_source.save_prices()
+
+    # Prices are added by some threads while others are saving them
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(fetch, range(1, 201)))
+
+    with open(tmp_path / "DataSourceBase.json", "r", encoding="utf-8") as price_cache:
+        assert len(json.load(price_cache)[PAIR]["bitcoin"]["prices"]) == 200
@@ -0,0 +1,91 @@
+import datetime
+import os
+from pathlib import Path
+
+import pytest
+
+from bittytax.bt_types import AssetId, AssetName, AssetSymbol
+from bittytax.price import assetindex
+from bittytax.price.assetdata import AssetData
+from bittytax.price.assetindex import AssetIndex
+from bittytax.price.datasource import DataSourceBase
+
+IDS = {
+    "bitcoin": ("BTC", "Bitcoin"),
+    "wrapped-bitcoin": ("WBTC", "Wrapped Bitcoin"),
+    "bitcoin-cash": ("BCH", "Bitcoin Cash"),
+    "batcoin": ("BTC", "BatCoin"),
+    "ethereum": ("ETH", "Ethereum"),
+}
+
+
+def _data_source() -> DataSourceBase:
+    data_source = DataSourceBase()
+    data_source.ids = {
+        AssetId(k): {"symbol": AssetSymbol(v[0]), "name": AssetName(v[1])} for k, v in IDS.items()
+    }
+    data_source.assets = {
+        AssetSymbol("BTC"): {"asset_id": AssetId("bitcoin"), "name": AssetName("Bitcoin")},
+        AssetSymbol("WBTC"): {"asset_id": AssetId("wrapped-bitcoin"), "name": AssetName("WBTC")},
+        AssetSymbol("BCH"): {
+            "asset_id": AssetId("bitcoin-cash"),
+            "name": AssetName("Bitcoin Cash"),
+        },
+        AssetSymbol("ETH"): {"asset_id": AssetId("ethereum"), "name": AssetName("Ethereum")},
+    }
+    return data_source
+
+
+@pytest.mark.parametrize(
+    "req_symbol, search_terms",
+    [("", ["bitcoin"]), ("", ["COIN", "b"]), ("", ["tc"]), ("BTC", []), ("BTC", ["bat"]), ("", [])],
+)
+def test_find(req_symbol: str, search_terms: list, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(assetindex, "ASSET_INDEX_DIR", "")
+    data_source = _data_source()
+    ds_index = assetindex.DsIndex.build(data_source)
+
+    # The same assets are found as a search of every asset
+    assert ds_index.find(AssetSymbol(req_symbol), search_terms) == [
+        (symbol, asset_id["name"], asset_id["asset_id"])
+        for symbol, asset_ids in data_source.get_list().items()
+        if not req_symbol or symbol == req_symbol
+        for asset_id in asset_ids
+        if AssetData.do_search(symbol, asset_id["name"], search_terms, asset_id["asset_id"])
+    ]
+
+
+def test_index_rebuilt(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(assetindex, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(assetindex, "ASSET_INDEX_DIR", str(tmp_path / "asset_index"))
+    ids_cache = tmp_path / "DataSourceBase_ids.json"
+    ids_cache.write_text("{}", encoding="utf-8")
+
+    data_source = _data_source()
+    AssetIndex.build({"DATASOURCEBASE": data_source})
+    assert os.path.exists(tmp_path / "asset_index" / "DataSourceBase.pickle")
+
+    # The saved index is used until the ids cache is updated
+    del data_source.ids[AssetId("batcoin")]
+    asset_index = AssetIndex.build({"DATASOURCEBASE": data_source})
+    assert len(asset_index.ds_indexes["DATASOURCEBASE"].find(AssetSymbol("BTC"), [])) == 2
+
+    os.utime(ids_cache, (0, 0))
+    asset_index = AssetIndex.build({"DATASOURCEBASE": data_source})
+    assert len(asset_index.ds_indexes["DATASOURCEBASE"].find(AssetSymbol("BTC"), [])) == 1
+
+
+def test_index_expired(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(assetindex, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(assetindex, "ASSET_INDEX_DIR", str(tmp_path / "asset_index"))
+
+    # Without an ids or assets cache, the saved index is used until it expires
+    data_source = _data_source()
+    AssetIndex.build({"DATASOURCEBASE": data_source})
+    del data_source.ids[AssetId("batcoin")]
+    asset_index = AssetIndex.build({"DATASOURCEBASE": data_source})
+    assert len(asset_index.ds_indexes["DATASOURCEBASE"].find(AssetSymbol("BTC"), [])) == 2
+
+    monkeypatch.setattr(DataSourceBase, "IDS_TTL", datetime.timedelta(0))
+    asset_index = AssetIndex.build({"DATASOURCEBASE": data_source})
+    assert len(asset_index.ds_indexes["DATASOURCEBASE"].find(AssetSymbol("BTC"), [])) == 1
@@ -0,0 +1,76 @@
+# pylint: disable=protected-access
+import threading
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+
+from bittytax.price import datasource
+from bittytax.price.datasource import DataSourceBase
+from bittytax.price.exceptions import DataSourceApiError
+from bittytax.price.replay import StandInServer, save_response
+
+URL = "https://api.frankfurter.app/2022-03-01?from=USD&to=GBP"
+
+
+def test_replay(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    save_response(str(tmp_path), URL, {"rates": {"GBP": 0.75}})
+    monkeypatch.setattr(datasource, "PRICE_REPLAY_DIR", str(tmp_path))
+
+    assert DataSourceBase()._get_json(URL) == {"rates": {"GBP": 0.75}}
+    with pytest.raises(DataSourceApiError, match="no recorded response"):
+        DataSourceBase()._get_json(URL.replace("2022", "2023"))
+
+
+def _start_server(recording_dir: Path, **kwargs: Any) -> StandInServer:
+    server = StandInServer(("127.0.0.1", 0), str(recording_dir), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_stand_in_server_errors(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    save_response(str(tmp_path), URL, {"rates": {"GBP": 0.75}})
+    server = _start_server(tmp_path, error_every=2, error_status=HTTPStatus.BAD_GATEWAY)
+    monkeypatch.setattr(datasource, "PRICE_SERVER_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(DataSourceBase, "BACKOFF_FACTOR", 0)
+    monkeypatch.setattr(DataSourceBase, "RATE_LIMIT", 1000)
+
+    try:
+        data_source = DataSourceBase()
+        # Requests 2 and 4 are server errors, which are retried
+        for _ in range(3):
+            assert data_source._get_json(URL) == {"rates": {"GBP": 0.75}}
+        assert server.request_cnt == 5
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_stand_in_server_rate_limit(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    save_response(str(tmp_path), URL, {"rates": {"GBP": 0.75}})
+    server = _start_server(tmp_path, rate_limit=1, retry_after=0)
+    monkeypatch.setattr(datasource, "PRICE_SERVER_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(DataSourceBase, "BACKOFF_FACTOR", 0)
+    monkeypatch.setattr(DataSourceBase, "RATE_LIMIT", 1000)
+
+    try:
+        data_source = DataSourceBase()
+        assert data_source._get_json(URL) == {"rates": {"GBP": 0.75}}
+        with pytest.raises(DataSourceApiError, match="HTTP 429"):
+            data_source._get_json(URL)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_rate_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    waits: List[float] = []
+    monkeypatch.setattr(datasource.time, "sleep", waits.append)
+    monkeypatch.setattr(datasource.config, "debug", False)
+
+    # Each request waits for the rate limit, even without debug logging
+    data_source = DataSourceBase()
+    data_source._rate_limit()
+    data_source._rate_limit()
+    assert waits and 0 < waits[0] <= 1 / DataSourceBase.RATE_LIMIT + 0.05
@@ -0,0 +1,83 @@
+import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Set, Tuple
+
+import pytest
+
+from bittytax.api import calculate, load_records, price_demand
+from bittytax.bt_types import (
+    AssetName,
+    AssetSymbol,
+    DataSourceName,
+    Date,
+    QuoteSymbol,
+    Timestamp,
+)
+from bittytax.price import valueasset
+from bittytax.price.pricedata import PriceDataRecord
+from bittytax.price.warmcache import find_records, records_demand
+
+CSV_DATA = (
+    "Type,Buy Quantity,Buy Asset,Buy Value,Sell Quantity,Sell Asset,Sell Value,"
+    "Fee Quantity,Fee Asset,Fee Value,Wallet,Timestamp,Note\n"
+    "Trade,1,BTC,,1000,USD,,,,,Wallet,2022-03-01T10:00:00,\n"
+    "Trade,1,ETH,500,0.05,BTC,,,,,Wallet,2022-03-02T10:00:00,\n"
+)
+
+
+def test_records_demand(tmp_path: Path) -> None:
+    (tmp_path / "client1").mkdir()
+    (tmp_path / "client1" / "records.csv").write_text(CSV_DATA, encoding="utf-8")
+    (tmp_path / "client2.csv").write_text(CSV_DATA, encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("", encoding="utf-8")
+
+    filenames = find_records([str(tmp_path)])
+    assert filenames == [str(tmp_path / "client2.csv"), str(tmp_path / "client1" / "records.csv")]
+
+    # The second trade already has a value, so only the USD price is needed
+    assert records_demand(filenames) == {(AssetSymbol("USD"), datetime.date(2022, 3, 1))}
+
+
+# A crypto fee on a fiat trade, a crypto trade with a fee, a fiat fee and a disposal
+DEMAND_CSV_DATA = (
+    "Type,Buy Quantity,Buy Asset,Buy Value,Sell Quantity,Sell Asset,Sell Value,"
+    "Fee Quantity,Fee Asset,Fee Value,Wallet,Timestamp,Note\n"
+    "Trade,1,BTC,,20000,GBP,,0.001,BTC,,Wallet,2022-03-01T10:00:00,\n"
+    "Trade,10,ETH,,0.5,BTC,,0.01,ETH,,Wallet,2022-03-02T10:00:00,\n"
+    "Trade,1000,USD,,0.02,BTC,,5,USD,,Wallet,2022-03-03T10:00:00,\n"
+    "Spend,,,,0.1,BTC,,,,,Wallet,2022-03-04T10:00:00,\n"
+)
+
+
+def test_demand_matches_lookups(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    lookups: Set[Tuple[AssetSymbol, Date]] = set()
+
+    class _PriceData:
+        def __init__(self, *_args: Any) -> None:
+            self.progress_bar = None
+
+        @staticmethod
+        def get_historical(
+            asset: AssetSymbol, _quote: QuoteSymbol, timestamp: Timestamp
+        ) -> PriceDataRecord:
+            lookups.add((asset, Date(timestamp.date())))
+            return PriceDataRecord(AssetName(""), DataSourceName(""), price_ccy=Decimal(2))
+
+        @staticmethod
+        def get_latest(_asset: AssetSymbol, _quote: QuoteSymbol) -> PriceDataRecord:
+            return PriceDataRecord(AssetName(""), DataSourceName(""))
+
+    monkeypatch.setattr(valueasset, "PriceData", _PriceData)
+    filename = str(tmp_path / "records.csv")
+    (tmp_path / "records.csv").write_text(DEMAND_CSV_DATA, encoding="utf-8")
+
+    # Only the prices which the tax calculation looks up are demanded
+    demand = price_demand(load_records(filename))
+    calculate(load_records(filename), skip_integrity=True)
+    assert set(demand) == lookups
+    assert lookups == {
+        (AssetSymbol("BTC"), datetime.date(2022, 3, 2)),
+        (AssetSymbol("USD"), datetime.date(2022, 3, 3)),
+        (AssetSymbol("BTC"), datetime.date(2022, 3, 4)),
+    }
@@ -0,0 +1,377 @@
+import argparse
+import csv
+import io
+import json
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import pytest
+from pypdf import PdfReader
+
+from bittytax.api import TaxReports, calculate, load_records
+from bittytax.audit import AuditRecords
+from bittytax.bt_types import (
+    AssetName,
+    AssetSymbol,
+    DataSourceName,
+    QuoteSymbol,
+    SourceUrl,
+    TaxRules,
+    Timestamp,
+)
+from bittytax.config import config
+from bittytax.import_records import ImportRecords
+from bittytax.price import valueasset
+from bittytax.price.pricedata import PriceDataRecord
+from bittytax.report import ReportPdf
+from bittytax.report_data import ReportCsv, ReportJson
+
+config.ccy = "GBP"
+
+CSV_DATA = (
+    "Type,Buy Quantity,Buy Asset,Buy Value,Sell Quantity,Sell Asset,Sell Value,"
+    "Fee Quantity,Fee Asset,Fee Value,Wallet,Timestamp,Note\n"
+    "Deposit,1.5,BTC,,,,,,,,Wallet,2022-05-20T22:32:11,\n"
+    "Withdrawal,,,,0.25,BTC,,,,,Wallet,2022-05-21T09:00:00,\n"
+)
+
+# Disposals either side of the split date of the 2024/25 tax year, income and a margin contract
+FULL_CSV_DATA = (
+    "Type,Buy Quantity,Buy Asset,Buy Value,Sell Quantity,Sell Asset,Sell Value,"
+    "Fee Quantity,Fee Asset,Fee Value,Wallet,Timestamp,Note\n"
+    "Trade,1,BTC,,20000,GBP,,,,,Wallet,2023-06-01T10:00:00,\n"
+    "Staking-Reward,2,ETH,,,,,,,,Wallet,2023-07-01T10:00:00,\n"
+    "Trade,15000,GBP,,0.25,BTC,,,,,Wallet,2024-01-10T10:00:00,\n"
+    "Margin-Gain,100,GBP,,,,,,,,Wallet,2024-02-01T10:00:00,BTC/GBP\n"
+    "Spend,,,,0.25,BTC,,,,,Wallet,2024-06-01T10:00:00,\n"
+    "Spend,,,,0.25,BTC,,,,,Wallet,2024-12-01T10:00:00,\n"
+)
+
+PRICES = {"BTC": Decimal(50000), "ETH": Decimal(2000)}
+
+
+def _audit(tmp_path: Path) -> AuditRecords:
+    filename = str(tmp_path / "records.csv")
+    with open(filename, "w", encoding="utf-8") as csv_file:
+        csv_file.write(CSV_DATA)
+
+    import_records = ImportRecords()
+    with io.open(filename, newline="", encoding="utf-8") as csv_file:
+        import_records.import_csv(csv_file, filename)
+    return AuditRecords(import_records.get_records())
+
+
+def _args(output_filename: str, audit_only: bool = True) -> argparse.Namespace:
+    return argparse.Namespace(
+        audit_only=audit_only,
+        summary_only=False,
+        tax_rules=TaxRules.UK_INDIVIDUAL,
+        output_filename=output_filename,
+    )
+
+
+class _PriceData:
+    # Every price is from the same data source, without looking it up
+    def __init__(self, *_args: Any) -> None:
+        self.progress_bar = None
+
+    @staticmethod
+    def get_historical(
+        asset: AssetSymbol, _quote: QuoteSymbol, _timestamp: Timestamp
+    ) -> PriceDataRecord:
+        return PriceDataRecord(
+            AssetName(asset.lower()),
+            DataSourceName("CoinGecko"),
+            SourceUrl(f"https://prices/{asset}"),
+            PRICES[asset],
+            PRICES[asset] / PRICES["BTC"],
+        )
+
+    @staticmethod
+    def get_latest(asset: AssetSymbol, _quote: QuoteSymbol) -> PriceDataRecord:
+        return PriceDataRecord(
+            AssetName(asset.lower()), DataSourceName("CoinGecko"), price_ccy=PRICES[asset] * 2
+        )
+
+
+def _tax_reports(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> TaxReports:
+    monkeypatch.setattr(valueasset, "PriceData", _PriceData)
+    filename = str(tmp_path / "records.csv")
+    with open(filename, "w", encoding="utf-8") as csv_file:
+        csv_file.write(FULL_CSV_DATA)
+
+    return calculate(load_records(filename))
+
+
+def _read_csv(filename: Path) -> List[Dict[str, str]]:
+    with open(filename, encoding="utf-8") as csv_file:
+        return list(csv.DictReader(csv_file))
+
+
+def _outline_titles(outline: List[Any]) -> List[Tuple[str, List[Any]]]:
+    # Each heading with the headings nested under it
+    titles: List[Tuple[str, List[Any]]] = []
+    for item in outline:
+        if isinstance(item, list):
+            titles[-1] = (titles[-1][0], _outline_titles(item))
+        else:
+            titles.append((item.title, []))
+    return titles
+
+
+def test_audit_json(tmp_path: Path) -> None:
+    report = ReportJson("bittytax", _args(str(tmp_path / "report")), _audit(tmp_path))
+    report.write_json()
+
+    assert report.filename == str(tmp_path / "report.json")
+    with open(report.filename, encoding="utf-8") as json_file:
+        data = json.load(json_file)
+
+    assert data["tax_rules"] == "UK_INDIVIDUAL"
+    assert data["audit"]["wallets"] == [
+        {"wallet": "Wallet", "asset": "BTC", "balance": "1.25", "staked": "0"}
+    ]
+    assert "tax_years" not in data
+
+
+def test_audit_csv(tmp_path: Path) -> None:
+    ReportCsv("bittytax", _args(str(tmp_path / "report.csv")), _audit(tmp_path)).write_csv()
+
+    assert sorted(path.name for path in tmp_path.glob("report*")) == [
+        "report_AuditTotals.csv",
+        "report_AuditWallets.csv",
+    ]
+    with open(tmp_path / "report_AuditTotals.csv", encoding="utf-8") as csv_file:
+        assert list(csv.reader(csv_file)) == [
+            ["asset", "total", "transfers_mismatch"],
+            ["BTC", "1.25", "1.25"],
+        ]
+
+
+def test_full_json(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    reports = _tax_reports(tmp_path, monkeypatch)
+    report = ReportJson(
+        "bittytax",
+        _args(str(tmp_path / "report"), audit_only=False),
+        reports.audit,
+        reports.tax_report,
+        reports.price_report,
+        reports.holdings_report,
+    )
+    report.write_json()
+
+    with open(report.filename, encoding="utf-8") as json_file:
+        data = json.load(json_file)
+
+    assert [tax_year["tax_year"] for tax_year in data["tax_years"]] == ["2023/24", "2024/25"]
+    tax_year_2024, tax_year_2025 = data["tax_years"]
+    assert tax_year_2024["start"] == "2023-04-06"
+    assert tax_year_2024["capital_gains"]["disposals"] == [
+        {
+            "tax_year": "2023/24",
+            "asset": "BTC",
+            "date": "2024-01-10",
+            "disposal_type": "Section 104",
+            "acquisition_date": None,
+            "quantity": "0.25",
+            "cost": "5000.00",
+            "fees": "0.00",
+            "proceeds": "15000.00",
+            "gain": "10000.00",
+        }
+    ]
+    assert "split_date" not in tax_year_2024["capital_gains"]
+    assert tax_year_2024["income"]["events"] == [
+        {
+            "tax_year": "2023/24",
+            "asset": "ETH",
+            "date": "2023-07-01",
+            "income_type": "Staking-Reward",
+            "description": "",
+            "quantity": "2",
+            "amount": "4000.00",
+            "fees": "0",
+        }
+    ]
+    assert tax_year_2024["income"]["type_totals"]["Staking-Reward"]["amount"] == "4000.00"
+    assert tax_year_2024["margin_trading"]["contracts"] == [
+        {
+            "tax_year": "2023/24",
+            "wallet": "Wallet",
+            "contract": "BTC/GBP",
+            "gains": "100.00",
+            "losses": "0",
+            "fees": "0",
+            "fee_rebates": "0",
+        }
+    ]
+
+    # Gains either side of the split date are totalled, and estimated, separately
+    capital_gains = tax_year_2025["capital_gains"]
+    assert [disposal["proceeds"] for disposal in capital_gains["disposals"]] == [
+        "12500.00",
+        "12500.00",
+    ]
+    assert capital_gains["split_date"] == "2024-10-30"
+    assert capital_gains["split_totals"] == {"gain_before": "7500.00", "gain_after": "7500.00"}
+    assert capital_gains["cgt_estimate_split"]["cgt_higher_rate"] == "24"
+    assert capital_gains["cgt_estimate"]["cgt_higher_rate"] == "20"
+
+    assert data["price_data"] == [
+        {
+            "tax_year": tax_year,
+            "asset": asset,
+            "name": asset.lower(),
+            "data_source": "CoinGecko",
+            "url": f"https://prices/{asset}",
+            "date": date,
+            "price_ccy": price_ccy,
+            "price_btc": price_btc,
+        }
+        for tax_year, asset, date, price_ccy, price_btc in [
+            ("2023/24", "ETH", "2023-07-01", "2000", "0.04"),
+            ("2024/25", "BTC", "2024-06-01", "50000", "1"),
+            ("2024/25", "BTC", "2024-12-01", "50000", "1"),
+        ]
+    ]
+    assert data["holdings"]["holdings"] == [
+        {
+            "asset": "BTC",
+            "name": "btc",
+            "quantity": "0.25",
+            "cost": "5000.00",
+            "value": "25000.00",
+            "gain": "20000.00",
+            "api_error": False,
+        },
+        {
+            "asset": "ETH",
+            "name": "eth",
+            "quantity": "2",
+            "cost": "4000.00",
+            "value": "8000.00",
+            "gain": "4000.00",
+            "api_error": False,
+        },
+    ]
+
+
+def test_full_csv(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    reports = _tax_reports(tmp_path, monkeypatch)
+    ReportCsv(
+        "bittytax",
+        _args(str(tmp_path / "report.csv"), audit_only=False),
+        reports.audit,
+        reports.tax_report,
+        reports.price_report,
+        reports.holdings_report,
+    ).write_csv()
+
+    assert sorted(path.name for path in tmp_path.glob("report*")) == [
+        f"report_{table_name}.csv" for table_name in sorted(ReportCsv.TABLES)
+    ]
+
+    # The tax years are flattened into one table, each row has its tax year
+    assert [
+        (row["tax_year"], row["date"], row["gain"])
+        for row in _read_csv(tmp_path / "report_CapitalGains.csv")
+    ] == [
+        ("2023/24", "2024-01-10", "10000.00"),
+        ("2024/25", "2024-06-01", "7500.00"),
+        ("2024/25", "2024-12-01", "7500.00"),
+    ]
+    assert _read_csv(tmp_path / "report_CapitalGainsSummary.csv") == [
+        {
+            "tax_year": "2023/24",
+            "disposals": "1",
+            "cost": "5000.00",
+            "fees": "0.00",
+            "proceeds": "15000.00",
+            "gain": "10000.00",
+            "total_gain": "10000.00",
+            "total_loss": "0",
+            "proceeds_limit": "50000",
+            "proceeds_warning": "False",
+        },
+        {
+            "tax_year": "2024/25",
+            "disposals": "2",
+            "cost": "10000.00",
+            "fees": "0.00",
+            "proceeds": "25000.00",
+            "gain": "15000.00",
+            "total_gain": "15000.00",
+            "total_loss": "0",
+            "proceeds_limit": "50000",
+            "proceeds_warning": "False",
+        },
+    ]
+    assert [row["income_type"] for row in _read_csv(tmp_path / "report_Income.csv")] == [
+        "Staking-Reward"
+    ]
+    assert [row["contract"] for row in _read_csv(tmp_path / "report_MarginTrading.csv")] == [
+        "BTC/GBP"
+    ]
+    assert [
+        (row["tax_year"], row["asset"], row["date"], row["price_ccy"])
+        for row in _read_csv(tmp_path / "report_PriceData.csv")
+    ] == [
+        ("2023/24", "ETH", "2023-07-01", "2000"),
+        ("2024/25", "BTC", "2024-06-01", "50000"),
+        ("2024/25", "BTC", "2024-12-01", "50000"),
+    ]
+    assert [
+        (row["asset"], row["value"]) for row in _read_csv(tmp_path / "report_Holdings.csv")
+    ] == [
+        ("BTC", "25000.00"),
+        ("ETH", "8000.00"),
+    ]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_full_pdf_outline(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, jobs: int) -> None:
+    reports = _tax_reports(tmp_path, monkeypatch)
+    args = _args(str(tmp_path / "report.pdf"), audit_only=False)
+    args.jobs = jobs
+    ReportPdf(
+        "bittytax",
+        args,
+        reports.audit,
+        reports.tax_report,
+        reports.price_report,
+        reports.holdings_report,
+    )
+
+    reader = PdfReader(tmp_path / "report.pdf")
+    outline = _outline_titles(reader.outline)
+    assert [title for title, _ in outline] == [
+        "Audit",
+        "Tax Year - 2023/24",
+        "Tax Year - 2024/25",
+        "Appendix",
+    ]
+
+    # Sections without a heading of their own are merged under the previous one
+    assert outline[-1][1] == [
+        ("Price Data - 2023/24", []),
+        ("Price Data - 2024/25", []),
+        ("Current Holdings", []),
+    ]
+    for item in reader.outline[-1]:
+        if not isinstance(item, list):
+            page_number = reader.get_destination_page_number(item)
+            assert page_number is not None
+            assert str(item.title) in reader.pages[page_number].extract_text()
+
+
+def test_unnamed_outline() -> None:
+    unnamed = argparse.Namespace(title="Price Data - 2024/25")
+    price_data = argparse.Namespace(title="Price Data - 2024/25")
+    appendix = argparse.Namespace(title="Appendix")
+    unnamed_outline = ReportPdf._unnamed_outline  # pylint: disable=protected-access
+
+    assert unnamed_outline([unnamed, [price_data]]) == [price_data]
+    # A section with a heading of its own is added as it is
+    assert unnamed_outline([appendix, [price_data]]) is None
+    assert unnamed_outline([price_data]) is None
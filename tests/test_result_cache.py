@@ -0,0 +1,57 @@
+import argparse
+import datetime
+import json
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from bittytax import result_cache
+from bittytax.audit import AuditRecords
+from bittytax.bt_types import AssetId, DataSourceName, Date, TaxRules, TradingPair
+from bittytax.price.pricedata import PricesUsed
+from bittytax.result_cache import CachedResult, ResultCache
+
+
+def _write_prices(cache_dir: Path, price: str) -> None:
+    prices = {"2022-03-01": {"price": price, "url": ""}}
+    (cache_dir / "CoinGecko.json").write_text(
+        json.dumps({"BTC/GBP": {"bitcoin": {"name": "Bitcoin", "prices": prices}}}),
+        encoding="utf-8",
+    )
+
+
+def test_result_cache_prices_changed(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(result_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(result_cache, "RESULTS_DIR", str(tmp_path / "results"))
+    (tmp_path / "records.csv").write_text("Type,Buy Quantity\n", encoding="utf-8")
+    _write_prices(tmp_path, "30000.5")
+
+    args = argparse.Namespace(
+        filename=str(tmp_path / "records.csv"),
+        tax_rules=TaxRules.UK_INDIVIDUAL,
+        tax_year=None,
+        skip_integrity=False,
+        summary_only=False,
+        nopdf=False,
+        report_format="json",
+    )
+    cache = ResultCache(args)
+    assert cache.load() is None
+
+    prices_used: PricesUsed = {
+        (
+            DataSourceName("CoinGecko"),
+            TradingPair("BTC/GBP"),
+            AssetId("bitcoin"),
+            Date(datetime.date(2022, 3, 1)),
+        ): Decimal("30000.5")
+    }
+    cache.save(CachedResult(AuditRecords([]), {}, {}, None, prices_used))
+    assert cache.load() is not None
+
+    args.tax_year = 2022
+    assert ResultCache(args).load() is None
+
+    _write_prices(tmp_path, "31000")
+    assert cache.load() is None
@@ -0,0 +1,32 @@
+from decimal import Decimal
+
+from bittytax.bt_types import AssetSymbol, TrType
+from bittytax.tax import TaxCalculator
+from bittytax.transactions import Buy, Sell
+
+
+def test_value_needed() -> None:
+    assert TaxCalculator.value_needed(
+        Sell(TrType.SPEND, sell_quantity=Decimal(1), sell_asset=AssetSymbol("BTC"), sell_value=None)
+    )
+    assert TaxCalculator.value_needed(
+        Buy(TrType.INCOME, buy_quantity=Decimal(10), buy_asset=AssetSymbol("USD"), buy_value=None)
+    )
+
+
+def test_value_not_needed() -> None:
+    # Proceeds of a no gain/no loss disposal are replaced by the cost
+    assert not TaxCalculator.value_needed(
+        Sell(
+            TrType.GIFT_SPOUSE,
+            sell_quantity=Decimal(1),
+            sell_asset=AssetSymbol("BTC"),
+            sell_value=None,
+        )
+    )
+    # Fiat is not pooled
+    assert not TaxCalculator.value_needed(
+        Sell(
+            TrType.SPEND, sell_quantity=Decimal(10), sell_asset=AssetSymbol("USD"), sell_value=None
+        )
+    )
@@ -0,0 +1,55 @@
+from datetime import datetime
+from typing import Union
+
+import dateutil.parser
+import pytest
+
+from bittytax.conv.timestamp_parser import TimestampParser
+
+TIMESTAMPS = [
+    "2023-01-02 10:00:00",
+    "2023-01-13T10:00:00Z",
+    "2023-01-02T10:00:00.123+01:00",
+    "2023-01-02 10:00:00+0000",
+    "2023-01-02 10:00:00 UTC",
+    "2023-01-02 12:00:00 AM",
+    "2023-13-01 10:00:00",
+    "2023-02-30 10:00:00",
+    "02/01/2023 10:00",
+    "13/01/2023 10:00:00",
+    "01/13/2023 10:00:00",
+    "1/2/2023 1:02:03 PM",
+    "Jan 2, 2023 10:00:00 PM",
+    "02 Jan 2023",
+    "Tue Jan 03 2023 10:00:00 GMT",
+    "2023-01-02T10:00:00.1234567Z",
+]
+
+
+def _parse(parser: str, timestamp_str: str, dayfirst: bool) -> Union[datetime, type]:
+    try:
+        if parser == "dateutil":
+            return dateutil.parser.parse(timestamp_str, dayfirst=dayfirst)
+        return TimestampParser.parse(timestamp_str, dayfirst=dayfirst)
+    except ValueError as e:
+        return type(e)
+
+
+@pytest.mark.parametrize("dayfirst", [False, True])
+def test_same_as_dateutil(dayfirst: bool) -> None:
+    # Parse twice, the second time uses the learnt formats
+    for _ in range(2):
+        for timestamp_str in TIMESTAMPS:
+            expected = _parse("dateutil", timestamp_str, dayfirst)
+            timestamp = _parse("fast", timestamp_str, dayfirst)
+
+            assert timestamp == expected
+            if isinstance(timestamp, datetime) and isinstance(expected, datetime):
+                assert timestamp.utcoffset() == expected.utcoffset()
+
+
+def test_ambiguous_day_month() -> None:
+    assert TimestampParser.parse("01/02/2023", dayfirst=True) == datetime(2023, 2, 1)
+    assert TimestampParser.parse("03/04/2023", dayfirst=True) == datetime(2023, 4, 3)
+    assert TimestampParser.parse("01/02/2023", dayfirst=False) == datetime(2023, 1, 2)
+    assert TimestampParser.parse("03/04/2023", dayfirst=False) == datetime(2023, 3, 4)
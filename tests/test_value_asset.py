@@ -0,0 +1,40 @@
+import datetime
+from decimal import Decimal
+
+from bittytax.bt_types import AssetName, AssetSymbol, DataSourceName, Timestamp, TrType, Year
+from bittytax.config import config
+from bittytax.constants import TZ_UTC
+from bittytax.price.pricedata import PriceDataRecord
+from bittytax.price.valueasset import PriceDemand, ValueAsset, ValueOrigin
+from bittytax.session import Session
+from bittytax.transactions import Buy
+
+
+def test_rebuild_price_report() -> None:
+    value_asset = PriceDemand()
+    price_record = PriceDataRecord(AssetName("Bitcoin"), DataSourceName("CoinGecko"))
+    value_asset.price_report_cache(
+        AssetSymbol("BTC"), Timestamp(datetime.datetime(2022, 4, 20, tzinfo=TZ_UTC)), price_record
+    )
+    assert list(value_asset.price_report) == [2023]
+
+    with Session():
+        config.start_of_year_month = 1
+        config.start_of_year_day = 1
+        value_asset.rebuild_price_report()
+
+    assert value_asset.price_report == {
+        2022: {AssetSymbol("BTC"): {datetime.date(2022, 4, 20): price_record}}
+    }
+
+
+def test_value_until_tax_year() -> None:
+    value_asset = ValueAsset(tax_year=Year(2022))
+    buy = Buy(TrType.TRADE, buy_quantity=Decimal(1), buy_asset=AssetSymbol("BTC"), buy_value=None)
+
+    # The last day a buy-back could be matched with a disposal in the 2021/22 tax year
+    assert value_asset.value_until == datetime.date(2022, 5, 5)
+
+    buy.timestamp = Timestamp(datetime.datetime(2022, 5, 6, tzinfo=TZ_UTC))
+    assert value_asset.get_value(buy) == (Decimal(0), ValueOrigin(buy))
+    assert not value_asset.price_report
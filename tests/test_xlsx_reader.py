@@ -0,0 +1,92 @@
+import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from xml.etree import ElementTree
+
+import openpyxl
+import pytest
+import xlsxwriter
+
+from bittytax.constants import FONT_COLOR_TX_HASH
+from bittytax.import_records import ImportRecords
+from bittytax.xlsx_reader import DATA_TAG, XlsxWorkbook
+
+
+def _write_workbook(filename: str) -> None:
+    workbook = xlsxwriter.Workbook(filename)
+    worksheet = workbook.add_worksheet("Data")
+    date_format = workbook.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"})
+    time_format = workbook.add_format({"num_format": "hh:mm"})
+    tx_hash_format = workbook.add_format({"font_color": f"#{FONT_COLOR_TX_HASH}"})
+
+    worksheet.write_row(0, 0, ["Type", "Quantity", "Timestamp", "Flag", "Note"])
+    worksheet.write_string(1, 0, "Deposit")
+    worksheet.write_number(1, 1, 1.5)
+    worksheet.write_datetime(1, 2, datetime.datetime(2022, 5, 20, 22, 32, 11), date_format)
+    worksheet.write_boolean(1, 3, True)
+    worksheet.write_string(1, 6, "0x1234", tx_hash_format)
+    worksheet.write_number(3, 1, 100)
+    worksheet.write_datetime(3, 2, datetime.time(12, 30), time_format)
+    worksheet.write_formula(4, 1, "=B2*2", None, 3)
+    worksheet.write_rich_string(4, 4, "a", tx_hash_format, "b")
+    workbook.add_worksheet("Empty")
+    workbook.close()
+
+
+def _read_openpyxl(filename: str) -> Dict[str, List[Tuple[List[str], List[Optional[str]]]]]:
+    workbook = openpyxl.load_workbook(filename, read_only=True, data_only=True)
+    sheets = {}
+    for sheet_name in workbook.sheetnames:
+        worksheet = workbook[sheet_name]
+        try:
+            dimensions = worksheet.calculate_dimension()
+        except ValueError:
+            worksheet.reset_dimensions()
+        else:
+            if dimensions == "A1:A1" or dimensions.endswith("1048576"):
+                worksheet.reset_dimensions()
+
+        sheets[sheet_name] = [ImportRecords.convert_row_xlsx(row) for row in worksheet.rows]
+    workbook.close()
+    return sheets
+
+
+def test_same_as_openpyxl(tmp_path: Path) -> None:
+    filename = str(tmp_path / "test.xlsx")
+    _write_workbook(filename)
+
+    with XlsxWorkbook(filename) as workbook:
+        sheets = {ws.title: list(ws.rows_with_font_colors()) for ws in workbook.worksheets()}
+
+    assert sheets == _read_openpyxl(filename)
+    assert sheets["Data"][1][0][:4] == ["Deposit", "1.5", "2022-05-20 22:32:11", "True"]
+    assert sheets["Data"][1][1][6] == f"FF{FONT_COLOR_TX_HASH}"
+
+
+def test_rows_not_kept(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    filename = str(tmp_path / "test.xlsx")
+    workbook = xlsxwriter.Workbook(filename)
+    worksheet = workbook.add_worksheet("Data")
+    for row in range(100):
+        worksheet.write_row(row, 0, ["Deposit", row])
+    workbook.close()
+
+    sheet_data: List[ElementTree.Element] = []
+    iterparse = ElementTree.iterparse
+
+    def _iterparse(*args: Any, **kwargs: Any) -> Iterator[Tuple[str, Any]]:
+        for event, element in iterparse(*args, **kwargs):
+            if event == "start" and element.tag == DATA_TAG:
+                sheet_data.append(element)
+            yield event, element
+
+    monkeypatch.setattr(ElementTree, "iterparse", _iterparse)
+    rows = 0
+    with XlsxWorkbook(filename) as workbook:
+        for worksheet in workbook.worksheets():
+            for _ in worksheet.rows_with_font_colors():
+                # Rows already read are removed from the sheet
+                assert [len(element) for element in sheet_data] == [0]
+                rows += 1
+
+    assert rows == 100